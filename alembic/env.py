@@ -43,11 +43,13 @@ def include_object(object, name, type_, reflected, compare_to):
       - idx_embeddings_vector_ivfflat
       - ix_embeddings_content_trgm
       - ix_embeddings_embedding_ivfflat
+      - ix_embeddings_embedding_hnsw
     """
     if type_ == "index" and name in (
         "idx_embeddings_vector_ivfflat",
         "ix_embeddings_content_trgm",
         "ix_embeddings_embedding_ivfflat",
+        "ix_embeddings_embedding_hnsw",
     ):
         # Don't treat these as schema diffs (keep them as-is in the DB)
         return False
@@ -0,0 +1,57 @@
+"""add ingest jobs queue
+
+Revision ID: 3f1c2d9a7b64
+Revises: c6f9a6538720
+Create Date: 2026-10-18 09:12:04.518233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2d9a7b64'
+down_revision: Union[str, Sequence[str], None] = 'c6f9a6538720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "ingest_jobs",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("status", sa.String(), nullable=False, server_default="queued"),
+        sa.Column("source_filename", sa.Text(), nullable=False),
+        sa.Column("upload_path", sa.Text(), nullable=False),
+        sa.Column("document_id", sa.String(), nullable=True),
+        sa.Column(
+            "events",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'[]'::jsonb"),
+        ),
+        sa.Column("message", sa.Text(), nullable=True),
+        sa.Column("artifacts", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("worker_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "idx_ingest_jobs_status_created",
+        "ingest_jobs",
+        ["status", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_ingest_jobs_status_created", table_name="ingest_jobs")
+    op.drop_table("ingest_jobs")
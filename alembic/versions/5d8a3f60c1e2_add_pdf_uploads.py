@@ -0,0 +1,39 @@
+"""add pdf upload file-id cache
+
+Revision ID: 5d8a3f60c1e2
+Revises: c41a9e07d2b3
+Create Date: 2026-10-18 15:12:09.447130
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8a3f60c1e2'
+down_revision: Union[str, Sequence[str], None] = 'c41a9e07d2b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "pdf_uploads",
+        sa.Column("pdf_sha256", sa.String(length=64), nullable=False),
+        sa.Column("provider", sa.String(length=32), nullable=False),
+        sa.Column("file_id", sa.String(), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("pdf_sha256", "provider"),
+    )
+    op.create_index("ix_pdf_uploads_expires_at", "pdf_uploads", ["expires_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_pdf_uploads_expires_at", table_name="pdf_uploads")
+    op.drop_table("pdf_uploads")
@@ -0,0 +1,35 @@
+"""add embedding cache
+
+Revision ID: 7b2e4c81d0a5
+Revises: 3f1c2d9a7b64
+Create Date: 2026-10-18 11:40:27.301954
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e4c81d0a5'
+down_revision: Union[str, Sequence[str], None] = '3f1c2d9a7b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "embedding_cache",
+        sa.Column("cache_key", sa.String(length=64), primary_key=True),
+        sa.Column("model_name", sa.String(), nullable=False),
+        sa.Column("embedding", Vector(1536), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("embedding_cache")
@@ -0,0 +1,36 @@
+"""add ingest_jobs.force_resummarize
+
+Revision ID: 9a4e6b2f7c13
+Revises: 5d8a3f60c1e2
+Create Date: 2026-10-18 16:02:44.815520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e6b2f7c13'
+down_revision: Union[str, Sequence[str], None] = '5d8a3f60c1e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "ingest_jobs",
+        sa.Column(
+            "force_resummarize",
+            sa.Boolean(),
+            nullable=False,
+            server_default=sa.text("false"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("ingest_jobs", "force_resummarize")
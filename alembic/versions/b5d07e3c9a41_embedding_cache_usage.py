@@ -0,0 +1,52 @@
+"""embedding cache last use and shared hit counters
+
+Revision ID: b5d07e3c9a41
+Revises: f17c2a9d4e86
+Create Date: 2026-10-19 09:26:14.118630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d07e3c9a41'
+down_revision: Union[str, Sequence[str], None] = 'f17c2a9d4e86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "embedding_cache",
+        sa.Column(
+            "last_used_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index(
+        "ix_embedding_cache_model_last_used",
+        "embedding_cache",
+        ["model_name", "last_used_at"],
+    )
+
+    op.create_table(
+        "embedding_cache_counters",
+        sa.Column("model_name", sa.String(), primary_key=True),
+        sa.Column("memory_hits", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("db_hits", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("misses", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("embedding_cache_counters")
+    op.drop_index("ix_embedding_cache_model_last_used", table_name="embedding_cache")
+    op.drop_column("embedding_cache", "last_used_at")
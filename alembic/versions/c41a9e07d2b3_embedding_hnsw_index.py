@@ -0,0 +1,59 @@
+"""embeddings ANN index: ivfflat (lists = 100) -> hnsw (m = 16, ef_construction = 64)
+
+Revision ID: c41a9e07d2b3
+Revises: 7b2e4c81d0a5
+Create Date: 2026-10-18 13:05:52.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a9e07d2b3'
+down_revision: Union[str, Sequence[str], None] = '7b2e4c81d0a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Index from 14eb431e90a9 (ivfflat, lists = 100)
+IVFFLAT_INDEX = "ix_embeddings_embedding_ivfflat"
+HNSW_INDEX = "ix_embeddings_embedding_hnsw"
+
+
+def upgrade() -> None:
+    """
+    Replace the ivfflat index with HNSW (pgvector defaults m = 16,
+    ef_construction = 64).
+
+    The DDL is fixed so every environment ends up with the same index. To
+    switch kind or retune parameters afterwards, use
+    `python -m app.cli.rebuild_ann_index`.
+
+    Building the index on a large table takes a while and holds a lock;
+    raise maintenance_work_mem for the session running the upgrade.
+    """
+    op.execute(f"DROP INDEX IF EXISTS {IVFFLAT_INDEX};")
+    op.execute(
+        f"""
+        CREATE INDEX IF NOT EXISTS {HNSW_INDEX}
+        ON embeddings
+        USING hnsw (embedding vector_cosine_ops)
+        WITH (m = 16, ef_construction = 64);
+        """
+    )
+
+
+def downgrade() -> None:
+    """Back to the original ivfflat (lists = 100) index."""
+    op.execute(f"DROP INDEX IF EXISTS {HNSW_INDEX};")
+    op.execute(f"DROP INDEX IF EXISTS {IVFFLAT_INDEX};")
+    op.execute(
+        f"""
+        CREATE INDEX IF NOT EXISTS {IVFFLAT_INDEX}
+        ON embeddings
+        USING ivfflat (embedding vector_cosine_ops)
+        WITH (lists = 100);
+        """
+    )
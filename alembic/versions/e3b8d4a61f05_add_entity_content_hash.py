@@ -0,0 +1,32 @@
+"""add content_hash to dimensions and notes
+
+Revision ID: e3b8d4a61f05
+Revises: 9a4e6b2f7c13
+Create Date: 2026-10-18 19:41:07.302918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8d4a61f05'
+down_revision: Union[str, Sequence[str], None] = '9a4e6b2f7c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable: rows ingested before this revision simply never match and
+    # are re-embedded on the next revision ingest.
+    op.add_column("dimensions", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.add_column("notes", sa.Column("content_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("notes", "content_hash")
+    op.drop_column("dimensions", "content_hash")
@@ -0,0 +1,74 @@
+"""drawing_versions.state and partial unique indexes
+
+Revision ID: f17c2a9d4e86
+Revises: e3b8d4a61f05
+Create Date: 2026-10-18 21:12:39.580114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f17c2a9d4e86'
+down_revision: Union[str, Sequence[str], None] = 'e3b8d4a61f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "drawing_versions",
+        sa.Column(
+            "state",
+            sa.String(length=16),
+            nullable=False,
+            server_default=sa.text("'ready'"),
+        ),
+    )
+
+    # (drawing_id, is_active) also allowed only one *inactive* version per
+    # drawing; only the active one has to be unique.
+    op.drop_constraint("uq_drawing_versions_active", "drawing_versions", type_="unique")
+    op.create_index(
+        "uq_drawing_versions_active",
+        "drawing_versions",
+        ["drawing_id"],
+        unique=True,
+        postgresql_where=sa.text("is_active"),
+    )
+
+    # A re-ingest stages a second version with the same hash; only one may be ready.
+    op.drop_constraint("drawing_versions_dwg_sha256_key", "drawing_versions", type_="unique")
+    op.create_index(
+        "uq_drawing_versions_ready_sha",
+        "drawing_versions",
+        ["dwg_sha256"],
+        unique=True,
+        postgresql_where=sa.text("state = 'ready'"),
+    )
+
+    op.create_index(
+        "ix_drawing_versions_not_ready",
+        "drawing_versions",
+        ["state"],
+        postgresql_where=sa.text("state <> 'ready'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fails if non-ready versions still share a hash; purge them first.
+    op.drop_index("ix_drawing_versions_not_ready", table_name="drawing_versions")
+    op.drop_index("uq_drawing_versions_ready_sha", table_name="drawing_versions")
+    op.create_unique_constraint(
+        "drawing_versions_dwg_sha256_key", "drawing_versions", ["dwg_sha256"]
+    )
+    op.drop_index("uq_drawing_versions_active", table_name="drawing_versions")
+    op.create_unique_constraint(
+        "uq_drawing_versions_active", "drawing_versions", ["drawing_id", "is_active"]
+    )
+    op.drop_column("drawing_versions", "state")
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.logging_config import configure_logging
 from app.config import get_settings
+from app.services.http_clients import shutdown_http_clients, startup_http_clients
 
 from app.api.routers import ingest
 from app.api.routers import drawings
@@ -33,10 +36,22 @@ logger = logging.getLogger(__name__)
 configure_logging()
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Open the shared HTTP clients for the app's lifetime."""
+    await startup_http_clients()
+    try:
+        yield
+    finally:
+        await shutdown_http_clients()
+
+
 app = FastAPI(
     title="CadSentinel DWG Pipeline",
     version="0.1.0",
     description="DWG → DXF/PDF/PNG/JSON → embeddings pipeline for CadSentinel.",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -70,6 +85,7 @@ app.include_router(advanced_routes.router, prefix="/api/v1")
 app.include_router(customers_router.router, prefix="/api/v1")
 app.include_router(standards_router.router, prefix="/api/v1")
 
+
 @app.get("/health", tags=["system"])
 async def health_check() -> dict:
     """
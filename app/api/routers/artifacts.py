@@ -36,6 +36,8 @@ def get_pdf(drawing_version_id: str):
 
 @router.get("/{drawing_version_id}/json", summary="DWG-to-JSON output")
 def get_json_artifact(drawing_version_id: str):
+    # Streamed as bytes by FileResponse; nothing is parsed here, so the
+    # entity sidecar (app.ingestion.entity_sidecar) has nothing to speed up.
     return _serve_artifact(
         drawing_version_id, "json", media_type="application/json"
     )
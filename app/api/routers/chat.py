@@ -1,12 +1,16 @@
 # app/api/routers/chat.py
 from __future__ import annotations
 
+import json
+from typing import AsyncIterator, Tuple
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.api.schemas import ChatDrawingRequest, ChatDrawingResponse
-from app.services.chat_drawing import chat_with_drawing
+from app.services.chat_drawing import chat_with_drawing, prepare_chat, stream_chat_events
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -28,3 +32,38 @@ async def chat_drawing(
     except ValueError as e:
         # invalid drawing_version_id or unknown document_id
         raise HTTPException(status_code=404, detail=str(e))
+
+
+async def _sse(events: AsyncIterator[Tuple[str, dict]]) -> AsyncIterator[str]:
+    async for event, data in events:
+        yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/drawing/stream")
+async def chat_drawing_stream(
+    payload: ChatDrawingRequest,
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Streaming variant of /chat/drawing as Server-Sent Events.
+
+    Events, in order:
+      - contexts: retrieved chunks (sent before the model is called)
+      - token:    {"text": "..."} per generated delta
+      - done:     {"assistant_reply": "<full text>"}
+    or an error event ({"detail": "..."}) if the model fails mid-stream.
+    """
+    try:
+        # All DB work happens here, before the response starts.
+        prepared = await prepare_chat(db, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return StreamingResponse(
+        _sse(stream_chat_events(prepared)),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # don't let nginx buffer the stream
+        },
+    )
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 from typing import Literal
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
 
+from app.db.session import get_db
+from app.services.embedding_cache import flush_cache_stats, get_cache_stats
 from app.services.security_mode import (
     get_security_mode,
     set_security_mode,
@@ -22,6 +25,14 @@ class SecurityModeUpdate(BaseModel):
     mode: SecurityMode
 
 
+class EmbeddingCacheStats(BaseModel):
+    memory_hits: int
+    db_hits: int
+    misses: int
+    lookups: int
+    memory_entries: int
+
+
 @router.get("/security-mode", response_model=SecurityModeStatus)
 async def get_security_mode_endpoint() -> SecurityModeStatus:
     """
@@ -40,3 +51,14 @@ async def set_security_mode_endpoint(payload: SecurityModeUpdate) -> SecurityMod
     """
     new_mode = set_security_mode(payload.mode)
     return SecurityModeStatus(mode=new_mode)
+
+
+@router.get("/embedding-cache", response_model=EmbeddingCacheStats)
+def get_embedding_cache_stats(db: Session = Depends(get_db)) -> EmbeddingCacheStats:
+    """
+    Cumulative embedding cache hit/miss counters for all processes (API and
+    ingest workers), as flushed to embedding_cache_counters. Workers flush
+    after every job; memory_entries is this API process's LRU size.
+    """
+    flush_cache_stats()
+    return EmbeddingCacheStats(**get_cache_stats(db))
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from pathlib import Path
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -138,15 +139,15 @@ def get_drawings_by_customer(
         "Uses the configured provider (OpenAI/Ollama) under the hood."
     ),
 )
-async def summarize_drawing_endpoint(
+def summarize_drawing_endpoint(
     payload: SummarizeDrawingRequest,
 ) -> SummarizeDrawingResponse:
     """
     Summarize a drawing using the LLM pipeline.
 
-    The request payload should include the identifiers / context the
-    `summarize_drawing_with_llm` service expects (e.g., document_id,
-    drawing_version_id, paths, or other metadata).
+    `summarize_drawing_with_llm` makes blocking OpenAI calls, so this is a
+    plain `def` endpoint: FastAPI runs it in its threadpool and the event
+    loop keeps serving other requests while the summary is in progress.
 
     Returns a structured summary, a long-form description, and optional
     raw model output for debugging.
@@ -157,15 +158,20 @@ async def summarize_drawing_endpoint(
             getattr(payload, "document_id", None),
         )
 
-        # summary_data is expected to be a dict-like object from the service:
+        # summary_data is a dict from the service:
         # {
-        #   "structured": ...,
-        #   "long_form": ...,
+        #   "structured_summary": ...,
+        #   "long_form_description": ...,
         #   "raw_model_output": ...
         # }
-        summary_data = await summarize_drawing_with_llm(payload)
+        summary_data = summarize_drawing_with_llm(
+            document_id=payload.document_id,
+            json_path=Path(payload.json_path),
+            pdf_path=Path(payload.pdf_path),
+        )
 
-        structured, long_form = parse_structured_summary(summary_data)
+        structured = parse_structured_summary(summary_data)
+        long_form = summary_data.get("long_form_description") or ""
 
         return SummarizeDrawingResponse(
             document_id=payload.document_id,  # field assumed from your existing schema
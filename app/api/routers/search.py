@@ -36,6 +36,7 @@ from app.db.models import (
     Dimension,
     Note,
 )
+from app.services.drawing_versions import hidden_version_ids
 # New: structured search schemas + services
 from app.api.schemas import (
     VectorSearchRequest,
@@ -69,6 +70,7 @@ def metadata_search(
     """
 
     search_str = f"%{q.lower()}%"
+    hidden = hidden_version_ids(db)
 
     # Drawings by metadata
     drawings = (
@@ -88,7 +90,10 @@ def metadata_search(
     # Notes
     note_hits = (
         db.query(Note)
-        .filter(func.lower(Note.text).like(search_str))
+        .filter(
+            func.lower(Note.text).like(search_str),
+            Note.drawing_version_id.not_in(hidden),
+        )
         .limit(limit)
         .all()
     )
@@ -101,7 +106,8 @@ def metadata_search(
                 func.lower(Dimension.dim_text).like(search_str),
                 # cast numeric dim_value to text so we can LIKE it
                 func.cast(Dimension.dim_value, String).like(search_str.replace("%", "")),
-            )
+            ),
+            Dimension.drawing_version_id.not_in(hidden),
         )
         .limit(limit)
         .all()
@@ -166,8 +172,10 @@ async def search_hybrid(
       - vector similarity (pgvector cosine)
       - keyword/trigram similarity on content (pg_trgm)
 
-    Uses a fused score:
-        fused = alpha * vector_score + (1 - alpha) * keyword_score
+    Candidates come from an ANN top-N and a trigram `%` top-N, merged with
+    payload.fusion:
+        weighted: fused = alpha * vector_score + (1 - alpha) * keyword_score
+        rrf:      reciprocal-rank fusion, weighted by alpha
     """
     try:
         return await hybrid_search_embeddings(db, payload)
@@ -35,6 +35,10 @@ class PipelineEvent(BaseModel):
         ...,
         description="Human-readable message for the UI.",
     )
+    duration_ms: Optional[float] = Field(
+        None,
+        description="Wall-clock duration of the step, set on stage completion events.",
+    )
 
 
 class IngestArtifacts(BaseModel):
@@ -77,6 +81,44 @@ class IngestResponse(BaseModel):
     )
 
 
+IngestJobState = Literal["queued", "running", "succeeded", "failed"]
+
+
+class IngestJobAccepted(BaseModel):
+    """
+    Returned immediately by POST /ingest/dwg once the upload is stored
+    and the job is queued. Poll status_url for progress.
+    """
+    job_id: int
+    status: IngestJobState
+    document_id: Optional[str] = Field(
+        None,
+        description="SHA256 document_id of the uploaded DWG.",
+    )
+    status_url: str
+
+
+class IngestJobStatus(BaseModel):
+    """
+    Response for GET /ingest/jobs/{job_id}: job state plus the pipeline
+    events accumulated so far.
+    """
+    job_id: int
+    status: IngestJobState
+    source_filename: str
+    document_id: Optional[str] = None
+    message: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    events: List[PipelineEvent] = Field(
+        default_factory=list,
+        description="Timeline of pipeline events for the UI.",
+    )
+    artifacts: Optional[IngestArtifacts] = None
+
+
 # ---------------------------------------------------------------------------
 # Drawing Summarization Schemas
 # ---------------------------------------------------------------------------
@@ -149,6 +191,18 @@ class VectorSearchRequest(BaseModel):
         ge=-1.0,
         le=1.0,
     )
+    ef_search: int | None = Field(
+        None,
+        ge=1,
+        le=1000,
+        description="hnsw.ef_search for this query (higher = better recall, slower).",
+    )
+    probes: int | None = Field(
+        None,
+        ge=1,
+        le=10000,
+        description="ivfflat.probes for this query (higher = better recall, slower).",
+    )
 
 
 class HybridSearchRequest(BaseModel):
@@ -156,7 +210,8 @@ class HybridSearchRequest(BaseModel):
     Request body for POST /search/hybrid
 
     alpha controls fusion:
-        fused = alpha * vector_score + (1 - alpha) * keyword_score
+        weighted: fused = alpha * vector_score + (1 - alpha) * keyword_score
+        rrf:      fused ∝ alpha / (k + vector_rank) + (1 - alpha) / (k + keyword_rank)
     """
     query_text: str = Field(..., min_length=1)
     filters: ChunkSearchFilters | None = None
@@ -173,6 +228,32 @@ class HybridSearchRequest(BaseModel):
         le=1.0,
         description="Weight for vector vs keyword similarity (alpha * vector + (1-alpha) * keyword).",
     )
+    fusion: Literal["weighted", "rrf"] = Field(
+        "weighted",
+        description=(
+            "How the vector and keyword candidate lists are merged: 'weighted' "
+            "score fusion, or reciprocal-rank fusion ('rrf', weighted by alpha "
+            "and normalized to 0..1)."
+        ),
+    )
+    rrf_k: int = Field(
+        60,
+        ge=1,
+        le=1000,
+        description="Rank offset k for reciprocal-rank fusion: 1 / (k + rank).",
+    )
+    ef_search: int | None = Field(
+        None,
+        ge=1,
+        le=1000,
+        description="hnsw.ef_search for this query (higher = better recall, slower).",
+    )
+    probes: int | None = Field(
+        None,
+        ge=1,
+        le=10000,
+        description="ivfflat.probes for this query (higher = better recall, slower).",
+    )
 
 
 class ChunkSearchResult(BaseModel):
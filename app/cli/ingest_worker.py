@@ -0,0 +1,307 @@
+# app/cli/ingest_worker.py
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+from pathlib import Path
+from typing import List
+
+from app.api.schemas import IngestResponse, PipelineEvent
+from app.config import Settings, get_settings
+from app.db.session import SessionLocal
+from app.ingestion.stage_graph import shutdown_process_pool
+from app.logging_config import configure_logging
+from app.services.ingest_jobs import (
+    append_job_events,
+    claim_next_ingest_job,
+    finish_ingest_job,
+    heartbeat_ingest_job,
+    requeue_stale_ingest_jobs,
+)
+from app.services.drawing_versions import purge_retired_versions
+from app.services.embedding_cache import flush_cache_stats, purge_embedding_cache
+from app.services.http_clients import shutdown_http_clients
+from app.services.pdf_upload_cache import purge_expired_uploads
+from app.services.ingest_pipeline import run_ingest_pipeline
+
+logger = logging.getLogger(__name__)
+
+
+def _beat(job_id: int, worker_id: str) -> bool:
+    with SessionLocal() as db:
+        return heartbeat_ingest_job(db, job_id, worker_id=worker_id)
+
+
+async def _heartbeat(job_id: int, worker_id: str, interval: float) -> None:
+    """
+    Refresh the job heartbeat every `interval` seconds for as long as the
+    pipeline runs. Long stages (converters, LLM summary, embeddings) emit no
+    events, so event commits alone cannot keep the job from looking stale.
+
+    Returns only when the claim was lost.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            owned = await asyncio.to_thread(_beat, job_id, worker_id)
+        except Exception:
+            logger.exception("Heartbeat failed for ingest job id=%s", job_id)
+            continue
+        if not owned:
+            return
+
+
+class _JobEventWriter:
+    """
+    Persists pipeline events without blocking the event loop.
+
+    The pipeline calls on_event() synchronously; events are queued and a
+    single flusher task appends them in order, in batches, from a worker
+    thread, on a session used by nothing else.
+    """
+
+    def __init__(self, job_id: int, worker_id: str) -> None:
+        self._job_id = job_id
+        self._worker_id = worker_id
+        self._db = SessionLocal()
+        self._pending: List[PipelineEvent] = []
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    def on_event(self, event: PipelineEvent) -> None:
+        self._pending.append(event)
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            batch, self._pending = self._pending, []
+            if batch:
+                try:
+                    await asyncio.to_thread(
+                        append_job_events,
+                        self._db,
+                        self._job_id,
+                        batch,
+                        worker_id=self._worker_id,
+                    )
+                except Exception:
+                    logger.exception("Failed to persist events for ingest job id=%s", self._job_id)
+            if self._closing and not self._pending:
+                return
+
+    async def aclose(self) -> None:
+        """Flush everything queued so far, then release the session."""
+        self._closing = True
+        self._wakeup.set()
+        try:
+            await self._task
+        finally:
+            self._db.close()
+
+
+async def _process_one_job(worker_id: str) -> bool:
+    """
+    Claim and run a single queued job. Returns False if the queue was empty.
+
+    Job bookkeeping never touches the pipeline session, so its commits
+    cannot interfere with the ETL transaction: claim / finish use jobs_db,
+    events their own session (_JobEventWriter), heartbeats a fresh one each.
+    """
+    settings = get_settings()
+    jobs_db = SessionLocal()
+    db = SessionLocal()
+    try:
+        job = claim_next_ingest_job(
+            jobs_db,
+            worker_id=worker_id,
+            max_attempts=settings.ingest_job_max_attempts,
+        )
+        if job is None:
+            return False
+
+        events = _JobEventWriter(job.id, worker_id)
+        pipeline = asyncio.create_task(
+            run_ingest_pipeline(
+                db=db,
+                settings=settings,
+                upload_path=Path(job.upload_path),
+                source_filename=job.source_filename,
+                on_event=events.on_event,
+                force_resummarize=job.force_resummarize,
+            )
+        )
+        heartbeat = asyncio.create_task(
+            _heartbeat(job.id, worker_id, settings.ingest_job_heartbeat_seconds)
+        )
+        try:
+            done, _ = await asyncio.wait(
+                {pipeline, heartbeat}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if pipeline not in done:
+                # The job was re-queued and may already run elsewhere: stop
+                # here rather than race the new owner.
+                logger.warning(
+                    "Worker %s lost its claim on ingest job id=%s; abandoning run",
+                    worker_id,
+                    job.id,
+                )
+                pipeline.cancel()
+                await asyncio.gather(pipeline, return_exceptions=True)
+                return True
+            try:
+                result = pipeline.result()
+            except Exception as exc:
+                logger.exception("Ingest job id=%s failed with an unhandled error", job.id)
+                result = IngestResponse(
+                    success=False,
+                    message=f"Ingestion failed due to internal error: {exc}",
+                )
+        finally:
+            heartbeat.cancel()
+            pipeline.cancel()
+            await events.aclose()
+
+        await asyncio.to_thread(
+            finish_ingest_job, jobs_db, job.id, result, worker_id=worker_id
+        )
+        return True
+    finally:
+        db.close()
+        jobs_db.close()
+
+
+async def run_worker(*, once: bool = False) -> None:
+    settings = get_settings()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stop = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # pragma: no cover - e.g. Windows
+            pass
+
+    logger.info("Ingest worker %s started", worker_id)
+
+    housekeeping = None if once else asyncio.create_task(_housekeeping_loop(settings, stop))
+    try:
+        await _poll_loop(worker_id, settings, stop, once)
+    finally:
+        if housekeeping is not None:
+            housekeeping.cancel()
+            await asyncio.gather(housekeeping, return_exceptions=True)
+        shutdown_process_pool()
+        await shutdown_http_clients()
+        await _flush_embedding_cache_stats()
+
+    logger.info("Ingest worker %s stopped", worker_id)
+
+
+async def _purge_expired_pdf_uploads() -> None:
+    try:
+        await asyncio.to_thread(purge_expired_uploads)
+    except Exception:
+        logger.exception("Failed to purge expired PDF uploads")
+
+
+async def _flush_embedding_cache_stats() -> None:
+    try:
+        await asyncio.to_thread(flush_cache_stats)
+    except Exception:
+        logger.exception("Failed to flush embedding cache stats")
+
+
+async def _purge_embedding_cache() -> None:
+    try:
+        await asyncio.to_thread(purge_embedding_cache)
+    except Exception:
+        logger.exception("Failed to evict expired embedding cache entries")
+
+
+async def _purge_retired_versions() -> None:
+    try:
+        await asyncio.to_thread(purge_retired_versions)
+    except Exception:
+        logger.exception("Failed to purge retired drawing versions")
+
+
+async def _housekeeping_loop(settings: Settings, stop: asyncio.Event) -> None:
+    """
+    Periodic cleanup, run next to the poll loop rather than only while the
+    worker is idle: during a burst of ingests retired drawing versions would
+    otherwise pile up (and every search would have to skip them) until the
+    queue drained. Each task runs in a thread, so it never blocks a job.
+    """
+    tasks = [
+        (_purge_retired_versions, settings.retired_version_purge_interval_seconds),
+        (_purge_expired_pdf_uploads, settings.pdf_upload_cleanup_interval_seconds),
+        (_purge_embedding_cache, settings.embedding_cache_purge_interval_seconds),
+    ]
+    next_run = [0.0] * len(tasks)
+    while not stop.is_set():
+        for i, (task, interval) in enumerate(tasks):
+            if time.monotonic() >= next_run[i]:
+                await task()
+                next_run[i] = time.monotonic() + interval
+        timeout = max(0.0, min(next_run) - time.monotonic())
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _poll_loop(worker_id: str, settings: Settings, stop: asyncio.Event, once: bool) -> None:
+    while not stop.is_set():
+        with SessionLocal() as db:
+            requeue_stale_ingest_jobs(
+                db, stale_after_seconds=settings.ingest_job_stale_seconds
+            )
+
+        try:
+            processed = await _process_one_job(worker_id)
+        except Exception:
+            logger.exception("Ingest worker %s failed while processing a job", worker_id)
+            processed = False
+
+        if processed:
+            # Make this job's cache hits / misses visible to the API.
+            await _flush_embedding_cache_stats()
+
+        if once:
+            break
+
+        if not processed:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.ingest_worker_poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="CadSentinel ingest worker: run queued DWG ingestion jobs."
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Process at most one job and exit (useful for cron / debugging).",
+    )
+
+    args = parser.parse_args()
+
+    configure_logging()
+    asyncio.run(run_worker(once=args.once))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# app/cli/rebuild_ann_index.py
+"""
+Rebuild the ANN index on embeddings.embedding with an explicit kind and
+parameters.
+
+Migrations build one fixed index (HNSW, m = 16, ef_construction = 64; see
+alembic revision c41a9e07d2b3). Switching to ivfflat or retuning HNSW is an
+operator action, not a setting:
+
+    python -m app.cli.rebuild_ann_index --kind hnsw --m 24 --ef-construction 128
+    python -m app.cli.rebuild_ann_index --kind ivfflat --lists 3000
+
+The new index is built with CREATE INDEX CONCURRENTLY under a temporary
+name, so searches keep using the old index until it is dropped; the new one
+is then renamed into place.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import text
+
+from app.db.session import engine
+from app.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+IVFFLAT_INDEX = "ix_embeddings_embedding_ivfflat"
+HNSW_INDEX = "ix_embeddings_embedding_hnsw"
+_BUILD_SUFFIX = "_rebuild"
+
+
+def _index_ddl(kind: str, name: str, args: argparse.Namespace) -> str:
+    if kind == "hnsw":
+        using = "hnsw (embedding vector_cosine_ops)"
+        params = f"m = {int(args.m)}, ef_construction = {int(args.ef_construction)}"
+    else:
+        using = "ivfflat (embedding vector_cosine_ops)"
+        params = f"lists = {int(args.lists)}"
+    return f"CREATE INDEX CONCURRENTLY {name} ON embeddings USING {using} WITH ({params})"
+
+
+def _ann_indexes(conn) -> List[Tuple[str, str]]:
+    return list(
+        conn.execute(
+            text(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE tablename = 'embeddings' AND indexname = ANY(:names)"
+            ),
+            {"names": [IVFFLAT_INDEX, HNSW_INDEX]},
+        )
+    )
+
+
+def rebuild_ann_index(args: argparse.Namespace) -> None:
+    target = HNSW_INDEX if args.kind == "hnsw" else IVFFLAT_INDEX
+    building = target + _BUILD_SUFFIX
+
+    # CONCURRENTLY cannot run inside a transaction block.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        before = _ann_indexes(conn)
+        for name, ddl in before:
+            logger.info("Current ANN index: %s", ddl)
+
+        if args.maintenance_work_mem:
+            conn.execute(
+                text("SELECT set_config('maintenance_work_mem', :v, false)"),
+                {"v": args.maintenance_work_mem},
+            )
+
+        # Leftover from an interrupted run (an INVALID index).
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {building}"))
+
+        ddl = _index_ddl(args.kind, building, args)
+        logger.info("Building: %s", ddl)
+        conn.execute(text(ddl))
+
+        for name, _ in before:
+            logger.info("Dropping %s", name)
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        conn.execute(text(f"ALTER INDEX {building} RENAME TO {target}"))
+
+        for _, ddl in _ann_indexes(conn):
+            logger.info("ANN index now: %s", ddl)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild the embeddings ANN index (hnsw or ivfflat) without blocking searches."
+    )
+    parser.add_argument("--kind", choices=("hnsw", "ivfflat"), required=True)
+    parser.add_argument("--m", type=int, default=16, help="HNSW max connections per layer.")
+    parser.add_argument(
+        "--ef-construction",
+        type=int,
+        default=64,
+        help="HNSW candidate list size while building.",
+    )
+    parser.add_argument(
+        "--lists",
+        type=int,
+        default=100,
+        help="ivfflat lists (rule of thumb: rows / 1000 up to 1M rows, sqrt(rows) beyond).",
+    )
+    parser.add_argument(
+        "--maintenance-work-mem",
+        default=None,
+        help="maintenance_work_mem for the build, e.g. 4GB.",
+    )
+
+    args = parser.parse_args()
+
+    configure_logging()
+    rebuild_ann_index(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -60,6 +60,78 @@ class Settings(BaseSettings):
         description="Chat model name for OpenAI provider (e.g., gpt-4.1, gpt-5.1).",
     )
 
+    openai_embed_batch_size: int = Field(
+        512,
+        alias="OPENAI_EMBED_BATCH_SIZE",
+        description="Maximum texts per OpenAI embeddings request (API limit 2048).",
+    )
+    openai_embed_max_batch_tokens: int = Field(
+        200_000,
+        alias="OPENAI_EMBED_MAX_BATCH_TOKENS",
+        description="Estimated-token budget per OpenAI embeddings request (API limit ~300k).",
+    )
+    openai_embed_concurrency: int = Field(
+        4,
+        alias="OPENAI_EMBED_CONCURRENCY",
+        description="Maximum number of in-flight OpenAI embeddings requests.",
+    )
+    openai_embed_max_retries: int = Field(
+        5,
+        alias="OPENAI_EMBED_MAX_RETRIES",
+        description="Retries per batch on 429 / transient errors, with exponential backoff.",
+    )
+
+    embedding_cache_enabled: bool = Field(
+        True,
+        alias="EMBEDDING_CACHE_ENABLED",
+        description="Serve repeated texts from the embedding cache instead of the provider.",
+    )
+    embedding_cache_memory_entries: int = Field(
+        10_000,
+        alias="EMBEDDING_CACHE_MEMORY_ENTRIES",
+        description="In-process LRU size for cached embeddings (about 6 KB each).",
+    )
+    embedding_cache_ttl_days: float = Field(
+        90.0,
+        alias="EMBEDDING_CACHE_TTL_DAYS",
+        description="Evict cached embeddings not used for this many days, per model (0 keeps them forever).",
+    )
+
+    query_embedding_cache_size: int = Field(
+        1024,
+        alias="QUERY_EMBEDDING_CACHE_SIZE",
+        description="Max cached query vectors for search / chat (0 disables).",
+    )
+    query_embedding_cache_ttl_seconds: float = Field(
+        600.0,
+        alias="QUERY_EMBEDDING_CACHE_TTL_SECONDS",
+        description="How long a cached query vector stays valid.",
+    )
+
+    summary_concurrency: int = Field(
+        4,
+        alias="SUMMARY_CONCURRENCY",
+        description="Maximum in-flight LLM requests during drawing summarization.",
+    )
+    summary_max_retries: int = Field(
+        5,
+        alias="SUMMARY_MAX_RETRIES",
+        description="Retries per summarization request on 429 / transient errors.",
+    )
+    pdf_upload_cache_ttl_hours: float = Field(
+        168.0,
+        alias="PDF_UPLOAD_CACHE_TTL_HOURS",
+        description="How long an uploaded drawing PDF's provider file_id is reused (0 disables).",
+    )
+    incremental_reingest_enabled: bool = Field(
+        True,
+        alias="INCREMENTAL_REINGEST_ENABLED",
+        description=(
+            "On a new DWG revision, carry unchanged dimensions / notes and their "
+            "embeddings forward from the previous version instead of re-embedding."
+        ),
+    )
+
     # Provider selection
     embedding_provider_name: str = Field(
         "openai",
@@ -99,6 +171,106 @@ class Settings(BaseSettings):
         alias="DWG2JSON_PATH",
         description="Path to compiled C++ dwg2json tool.",
     )
+    external_tool_timeout_seconds: float = Field(
+        900.0,
+        alias="EXTERNAL_TOOL_TIMEOUT_SECONDS",
+        description="Kill dwg2dxf / dwg2json if a single conversion runs longer than this.",
+    )
+    render_process_workers: int = Field(
+        2,
+        alias="RENDER_PROCESS_WORKERS",
+        description="Size of the process pool used for CPU-bound DXF rendering.",
+    )
+    external_tool_max_concurrency: int = Field(
+        4,
+        alias="EXTERNAL_TOOL_MAX_CONCURRENCY",
+        description="Maximum number of external converter processes running at once per process.",
+    )
+
+    # -------------------------
+    # Ingest job queue / workers
+    # -------------------------
+    ingest_worker_poll_seconds: float = Field(
+        2.0,
+        alias="INGEST_WORKER_POLL_SECONDS",
+        description="How long an idle ingest worker sleeps before polling the job queue again.",
+    )
+    ingest_job_heartbeat_seconds: float = Field(
+        60.0,
+        alias="INGEST_JOB_HEARTBEAT_SECONDS",
+        description="How often a worker refreshes the heartbeat of the job it is running. Must stay well below INGEST_JOB_STALE_SECONDS.",
+    )
+    ingest_job_stale_seconds: int = Field(
+        1800,
+        alias="INGEST_JOB_STALE_SECONDS",
+        description="A running job with no heartbeat for this long is considered abandoned and re-queued.",
+    )
+    ingest_job_max_attempts: int = Field(
+        3,
+        alias="INGEST_JOB_MAX_ATTEMPTS",
+        description="Maximum number of times a job is claimed before it is marked failed.",
+    )
+    pdf_upload_cleanup_interval_seconds: float = Field(
+        3600.0,
+        alias="PDF_UPLOAD_CLEANUP_INTERVAL_SECONDS",
+        description="How often an ingest worker deletes expired PDF uploads from the provider.",
+    )
+    embedding_cache_purge_interval_seconds: float = Field(
+        3600.0,
+        alias="EMBEDDING_CACHE_PURGE_INTERVAL_SECONDS",
+        description="How often an ingest worker evicts embedding cache entries past EMBEDDING_CACHE_TTL_DAYS.",
+    )
+    retired_version_purge_interval_seconds: float = Field(
+        30.0,
+        alias="RETIRED_VERSION_PURGE_INTERVAL_SECONDS",
+        description="How often an ingest worker deletes retired drawing versions (runs alongside jobs).",
+    )
+    retired_version_purge_batch_size: int = Field(
+        5000,
+        alias="RETIRED_VERSION_PURGE_BATCH_SIZE",
+        description="Rows deleted per transaction when purging a retired drawing version.",
+    )
+    stale_staging_version_hours: float = Field(
+        24.0,
+        alias="STALE_STAGING_VERSION_HOURS",
+        description="Staging versions older than this are treated as abandoned and purged.",
+    )
+
+    # -------------------------
+    # Search / retrieval
+    # -------------------------
+    hybrid_candidate_multiplier: int = Field(
+        4,
+        alias="HYBRID_CANDIDATE_MULTIPLIER",
+        description="Each hybrid-search leg (vector ANN, trigram) returns top_k * this many candidates.",
+    )
+
+    hnsw_ef_search: Optional[int] = Field(
+        None,
+        alias="HNSW_EF_SEARCH",
+        description="Default hnsw.ef_search per query (None keeps the server default of 40).",
+    )
+    ivfflat_probes: Optional[int] = Field(
+        None,
+        alias="IVFFLAT_PROBES",
+        description="Default ivfflat.probes per query (None keeps the server default of 1).",
+    )
+
+    ann_exact_scan_max_rows: int = Field(
+        20_000,
+        alias="ANN_EXACT_SCAN_MAX_ROWS",
+        description="Filtered searches over at most this many rows use an exact scan instead of the ANN index.",
+    )
+    ann_overfetch_factor: int = Field(
+        4,
+        alias="ANN_OVERFETCH_FACTOR",
+        description="Initial ANN fetch is k * this for filtered searches; doubled until k rows pass the filter.",
+    )
+    ann_max_fetch: int = Field(
+        1000,
+        alias="ANN_MAX_FETCH",
+        description="Largest ANN over-fetch before falling back to an exact scan (HNSW caps at ef_search <= 1000).",
+    )
 
     # -------------------------
     # Logging
@@ -136,6 +308,50 @@ class Settings(BaseSettings):
         alias="OLLAMA_CHAT_MODEL",
         description="Chat model name for Ollama provider.",
     )
+    ollama_embed_concurrency: int = Field(
+        4,
+        alias="OLLAMA_EMBED_CONCURRENCY",
+        description="Maximum number of in-flight Ollama embedding requests.",
+    )
+    ollama_embed_batch_size: int = Field(
+        64,
+        alias="OLLAMA_EMBED_BATCH_SIZE",
+        description="Texts per /api/embed request.",
+    )
+    ollama_timeout_seconds: float = Field(
+        120.0,
+        alias="OLLAMA_TIMEOUT_SECONDS",
+        description="Read timeout for Ollama HTTP requests.",
+    )
+
+    # -------------------------
+    # Shared HTTP clients (app/services/http_clients.py)
+    # -------------------------
+    http_client_max_connections: int = Field(
+        20,
+        alias="HTTP_CLIENT_MAX_CONNECTIONS",
+        description="Connection pool size per shared provider HTTP client.",
+    )
+    http_client_max_keepalive_connections: int = Field(
+        10,
+        alias="HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS",
+        description="Idle keep-alive connections kept open per shared client.",
+    )
+    http_client_keepalive_expiry_seconds: float = Field(
+        30.0,
+        alias="HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS",
+        description="Seconds an idle keep-alive connection is kept before closing.",
+    )
+    http_client_connect_timeout_seconds: float = Field(
+        10.0,
+        alias="HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS",
+        description="Connect timeout for shared provider HTTP clients.",
+    )
+    http_client_http2: bool = Field(
+        False,
+        alias="HTTP_CLIENT_HTTP2",
+        description="Use HTTP/2 for shared clients (requires the 'h2' package).",
+    )
 
     # -------------------------
     # Pydantic Settings Config
@@ -24,6 +24,7 @@ from .issues import DrawingIssue
 from .standards import StandardDocument
 from .associations import drawing_projects, drawing_customers
 from .drawing_chunk import DrawingTextChunk
+from .ingest_jobs import IngestJob
 
 __all__ = [
     "Base",
@@ -47,3 +48,13 @@ __all__ = [
 ]
 
 __all__.append("DrawingTextChunk")
+__all__.append("IngestJob")
+
+from .embedding_cache import EmbeddingCacheCounter, EmbeddingCacheEntry
+
+__all__.append("EmbeddingCacheEntry")
+__all__.append("EmbeddingCacheCounter")
+
+from .pdf_uploads import PdfUpload
+
+__all__.append("PdfUpload")
@@ -15,6 +15,7 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    text,
     UniqueConstraint,
     Index,
 )
@@ -72,8 +73,9 @@ class DrawingVersion(Base):
 
     revision_label: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
-    # Hash of specific DWG bytes
-    dwg_sha256: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    # Hash of specific DWG bytes (unique among "ready" versions; a re-ingest
+    # builds a staging version with the same hash, see app.services.drawing_versions)
+    dwg_sha256: Mapped[str] = mapped_column(String, nullable=False)
 
     source_filename: Mapped[str] = mapped_column(Text, nullable=False)
 
@@ -86,6 +88,9 @@ class DrawingVersion(Base):
 
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
 
+    # "staging" | "ready" | "retired"; only "ready" versions are visible to search
+    state: Mapped[str] = mapped_column(String(16), nullable=False, default="ready")
+
     # Relationships
     drawing: Mapped["Drawing"] = relationship(
         "Drawing",
@@ -137,13 +142,24 @@ class DrawingVersion(Base):
     )
 
     __table_args__ = (
-        # Only one active version per drawing
-        UniqueConstraint(
+        # Only one active version per drawing (any number of inactive ones)
+        Index(
+            "uq_drawing_versions_active",
             "drawing_id",
-            "is_active",
-            name="uq_drawing_versions_active",
-            deferrable=False,
-            initially="IMMEDIATE",
+            unique=True,
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "uq_drawing_versions_ready_sha",
+            "dwg_sha256",
+            unique=True,
+            postgresql_where=text("state = 'ready'"),
+        ),
+        # hidden_version_ids() / purge lookups
+        Index(
+            "ix_drawing_versions_not_ready",
+            "state",
+            postgresql_where=text("state <> 'ready'"),
         ),
     )
 
@@ -259,6 +275,10 @@ class Dimension(Base):
 
     geometry: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
 
+    # sha256 of the entity content; incremental re-ingest matches on
+    # (handle, content_hash) to carry rows and embeddings forward
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
@@ -307,6 +327,9 @@ class Note(Base):
 
     geometry: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
 
+    # see Dimension.content_hash
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
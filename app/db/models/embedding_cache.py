@@ -0,0 +1,77 @@
+# app/db/models/embedding_cache.py
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import BigInteger, DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+# =========================================================
+# Content-addressed embedding cache
+# =========================================================
+
+class EmbeddingCacheEntry(Base):
+    """
+    One cached embedding vector.
+
+    cache_key is sha256(model_name + normalized text), so identical strings
+    ("BREAK ALL SHARP EDGES", "= 0.25 in", ...) are embedded once per model
+    across all drawings and re-ingests. See app.services.embedding_cache.
+
+    last_used_at is refreshed (coarsely) on cache hits; entries unused for
+    EMBEDDING_CACHE_TTL_DAYS are evicted per model.
+    """
+    __tablename__ = "embedding_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    model_name: Mapped[str] = mapped_column(String, nullable=False)
+
+    embedding: Mapped[list[float]] = mapped_column(
+        Vector(1536),
+        nullable=False,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
+
+Index(
+    "ix_embedding_cache_model_last_used",
+    EmbeddingCacheEntry.model_name,
+    EmbeddingCacheEntry.last_used_at,
+)
+
+
+class EmbeddingCacheCounter(Base):
+    """
+    Cumulative embedding cache hit / miss counts per model, shared by the
+    API and every ingest worker process (each flushes its own deltas).
+    """
+    __tablename__ = "embedding_cache_counters"
+
+    model_name: Mapped[str] = mapped_column(String, primary_key=True)
+
+    memory_hits: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    db_hits: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    misses: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
@@ -0,0 +1,80 @@
+# app/db/models/ingest_jobs.py
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional, List
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Integer,
+    String,
+    Text,
+    Index,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+# =========================================================
+# Persistent ingestion job queue
+# =========================================================
+
+class IngestJob(Base):
+    """
+    One queued DWG ingestion.
+
+    The /ingest/dwg endpoint only stores the upload and inserts a row here;
+    ingest worker processes (app.cli.ingest_worker) claim queued rows with
+    SELECT ... FOR UPDATE SKIP LOCKED and run the full pipeline.
+    """
+    __tablename__ = "ingest_jobs"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    # "queued" | "running" | "succeeded" | "failed"
+    status: Mapped[str] = mapped_column(String, nullable=False, default="queued")
+
+    source_filename: Mapped[str] = mapped_column(Text, nullable=False)
+    upload_path: Mapped[str] = mapped_column(Text, nullable=False)
+
+    # SHA256 of the uploaded bytes (computed while streaming the upload)
+    document_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    # Regenerate the LLM summary even if a matching one is stored
+    force_resummarize: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+    # Accumulated PipelineEvent dicts, in emission order
+    events: Mapped[List[dict]] = mapped_column(JSONB, nullable=False, default=list)
+
+    # Final IngestResponse fields once the job finishes
+    message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    artifacts: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    worker_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+
+Index("idx_ingest_jobs_status_created", IngestJob.status, IngestJob.created_at)
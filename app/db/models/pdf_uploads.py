@@ -0,0 +1,52 @@
+# app/db/models/pdf_uploads.py
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+# =========================================================
+# Provider file-id cache for drawing PDFs
+# =========================================================
+
+class PdfUpload(Base):
+    """
+    A drawing PDF already uploaded to an LLM provider's files API.
+
+    Keyed by (pdf_sha256, provider), so re-ingests and repeat
+    /drawings/summarize calls for the same PDF reuse the provider file_id
+    instead of uploading it again. Rows past expires_at are ignored and
+    the ingest worker deletes them, together with the remote file.
+    See app.services.pdf_upload_cache.
+    """
+    __tablename__ = "pdf_uploads"
+
+    pdf_sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    # "openai" | ...
+    provider: Mapped[str] = mapped_column(String(32), primary_key=True)
+
+    file_id: Mapped[str] = mapped_column(String, nullable=False)
+
+    size_bytes: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_pdf_uploads_expires_at", "expires_at"),
+    )
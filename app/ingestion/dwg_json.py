@@ -1,14 +1,22 @@
 # app/ingestion/dwg_json.py
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 import shutil
 import subprocess
 from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import ijson
+
+from app.ingestion.subprocess_async import ExternalToolTimeout, run_tool
 
 logger = logging.getLogger(__name__)
 
+# Top-level members every dwg_to_json document is expected to have.
+REQUIRED_KEYS = ("file", "schema_version", "header", "layers", "entities")
+
 
 class DwgToJsonError(RuntimeError):
     """Raised when dwg_to_json fails to produce valid JSON."""
@@ -19,25 +27,7 @@ def _extract_document_id_from_path(ingested_dwg_path: Path) -> str:
     return ingested_dwg_path.stem
 
 
-def run_dwg_to_json(
-    ingested_dwg_path: Path,
-    derived_dir: Path,
-    dwg_to_json_path: str,
-) -> Path:
-    """
-    Call the C++ dwg_to_json tool and save its JSON output to
-    derived/<document_id>.json.
-
-    Assumes dwg_to_json emits valid CadSentinel DWG JSON to stdout.
-    """
-    if not ingested_dwg_path.is_file():
-        raise FileNotFoundError(f"Ingested DWG does not exist: { ingested_dwg_path }")
-
-    derived_dir.mkdir(parents=True, exist_ok=True)
-
-    document_id = _extract_document_id_from_path(ingested_dwg_path)
-    json_path = derived_dir / f"{document_id}.json"
-
+def _resolve_executable(dwg_to_json_path: str) -> Path:
     # Resolve dwg_to_json_path: it may be absolute, relative, or just a name on PATH
     exe = Path(dwg_to_json_path)
 
@@ -57,6 +47,24 @@ def run_dwg_to_json(
             )
         exe = Path(resolved)
 
+    return exe
+
+
+def _prepare(
+    ingested_dwg_path: Path,
+    derived_dir: Path,
+    dwg_to_json_path: str,
+) -> tuple[list[str], Path]:
+    if not ingested_dwg_path.is_file():
+        raise FileNotFoundError(f"Ingested DWG does not exist: { ingested_dwg_path }")
+
+    derived_dir.mkdir(parents=True, exist_ok=True)
+
+    document_id = _extract_document_id_from_path(ingested_dwg_path)
+    json_path = derived_dir / f"{document_id}.json"
+
+    exe = _resolve_executable(dwg_to_json_path)
+
     logger.info(
         "Running dwg_to_json: exe=%s, input=%s, output=%s",
         exe,
@@ -68,55 +76,189 @@ def run_dwg_to_json(
         str(exe),
         str(ingested_dwg_path),
     ]
+    return cmd, json_path
 
-    result = subprocess.run(
-        cmd,
-        cwd=derived_dir,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-
-    stdout = (result.stdout or b"").decode("utf-8", errors="replace")
-    stderr = (result.stderr or b"").decode("utf-8", errors="replace")
 
-    if result.returncode != 0:
+def _raise_on_failure(ingested_dwg_path: Path, returncode: int, stderr: str) -> None:
+    if returncode != 0:
         logger.error(
             "dwg_to_json failed for %s (code=%s). Stderr:\n%s",
             ingested_dwg_path,
-            result.returncode,
+            returncode,
             stderr,
         )
         raise DwgToJsonError(
-            f"dwg_to_json failed for {ingested_dwg_path} with code {result.returncode}. "
+            f"dwg_to_json failed for {ingested_dwg_path} with code {returncode}. "
             f"Stderr: {stderr}"
         )
 
-    # Validate JSON
+
+def read_dwg_json_header(json_path: Path) -> Dict[str, Any]:
+    """
+    Return every top-level member of a dwg_to_json file except `entities`
+    (file, schema_version, header, layers, ...), without materializing the
+    entity list.
+
+    dwg_to_json writes `entities` last, so this normally stops as soon as it
+    reaches that key; members after it are still collected if present.
+    """
+    meta: Dict[str, Any] = {}
     try:
-        data = json.loads(stdout)
-    except json.JSONDecodeError as exc:
-        logger.error("Invalid JSON emitted by dwg_to_json: %s", exc)
-        raise DwgToJsonError(f"dwg_to_json emitted invalid JSON: {exc}") from exc
-
-    # Optional: sanity checks on expected keys
-    required_keys = ["file", "schema_version", "header", "layers", "entities"]
-    missing = [k for k in required_keys if k not in data]
+        with json_path.open("rb") as f:
+            events = ijson.parse(f, use_float=True)
+            for prefix, event, value in events:
+                if prefix != "" or event != "map_key":
+                    continue
+                if value == "entities":
+                    meta["entities"] = None
+                    if all(k in meta for k in REQUIRED_KEYS):
+                        break
+                    _skip_value(events)
+                    continue
+                meta[value] = _build_value(events)
+    except ijson.JSONError as exc:
+        raise DwgToJsonError(f"Invalid dwg_to_json output {json_path}: {exc}") from exc
+
+    missing = [k for k in REQUIRED_KEYS if k not in meta]
     if missing:
         logger.warning(
-            "dwg_to_json output is missing expected keys %s for %s",
+            "dwg_to_json output is missing expected keys %s in %s",
             missing,
-            ingested_dwg_path,
+            json_path,
         )
+    meta.pop("entities", None)
+    return meta
+
 
-    # Write to disk
-    json_text = json.dumps(data, indent=2)
-    json_path.write_text(json_text, encoding="utf-8")
+def iter_dwg_entities(json_path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Stream `entities[]` from a dwg_to_json file one dict at a time.
+
+    This is also the validation pass: malformed or truncated JSON raises
+    DwgToJsonError when the parser reaches it. Peak memory is one entity,
+    regardless of drawing size. Numbers are returned as int / float.
+    """
+    try:
+        with json_path.open("rb") as f:
+            yield from ijson.items(f, "entities.item", use_float=True)
+    except ijson.JSONError as exc:
+        raise DwgToJsonError(f"Invalid dwg_to_json output {json_path}: {exc}") from exc
+
+
+def _build_value(events: Iterator[Tuple[str, str, Any]]) -> Any:
+    # Assemble the value that starts at the next event.
+    builder = ijson.ObjectBuilder()
+    depth = 0
+    for _, event, value in events:
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            break
+    return builder.value
+
+
+def _skip_value(events: Iterator[Tuple[str, str, Any]]) -> None:
+    depth = 0
+    for _, event, _ in events:
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            break
+
+
+def _finalize_output(partial_path: Path, json_path: Path) -> Path:
+    """
+    Check the streamed output's top-level structure and move it into
+    place. The file is kept exactly as dwg_to_json wrote it (no re-parse
+    and pretty-print round trip); entity-level validation happens while
+    the ETL streams it with iter_dwg_entities().
+    """
+    if partial_path.stat().st_size == 0:
+        raise DwgToJsonError("dwg_to_json produced no output")
+
+    read_dwg_json_header(partial_path)
+    partial_path.replace(json_path)
 
     logger.info(
         "DWG→JSON completed: %s (%.1f KB)",
         json_path,
         json_path.stat().st_size / 1024.0,
     )
-
     return json_path
 
+
+def run_dwg_to_json(
+    ingested_dwg_path: Path,
+    derived_dir: Path,
+    dwg_to_json_path: str,
+) -> Path:
+    """
+    Call the C++ dwg_to_json tool and save its JSON output to
+    derived/<document_id>.json.
+
+    Assumes dwg_to_json emits valid CadSentinel DWG JSON to stdout; stdout
+    goes straight to disk.
+
+    Blocking; async callers should use run_dwg_to_json_async().
+    """
+    cmd, json_path = _prepare(ingested_dwg_path, derived_dir, dwg_to_json_path)
+    partial_path = json_path.with_name(json_path.name + ".partial")
+
+    try:
+        with partial_path.open("wb") as out:
+            result = subprocess.run(
+                cmd,
+                cwd=derived_dir,
+                stdout=out,
+                stderr=subprocess.PIPE,
+            )
+
+        stderr = (result.stderr or b"").decode("utf-8", errors="replace")
+        _raise_on_failure(ingested_dwg_path, result.returncode, stderr)
+
+        return _finalize_output(partial_path, json_path)
+    finally:
+        partial_path.unlink(missing_ok=True)
+
+
+async def run_dwg_to_json_async(
+    ingested_dwg_path: Path,
+    derived_dir: Path,
+    dwg_to_json_path: str,
+    timeout: Optional[float] = None,
+) -> Path:
+    """
+    Event-loop friendly run_dwg_to_json().
+
+    dwg_to_json's stdout is streamed chunk by chunk into
+    <document_id>.json.partial instead of being buffered in memory; the
+    process runs under the global converter semaphore and is killed on
+    timeout or cancellation. The top-level check runs in a worker thread.
+    """
+    cmd, json_path = _prepare(ingested_dwg_path, derived_dir, dwg_to_json_path)
+    partial_path = json_path.with_name(json_path.name + ".partial")
+
+    try:
+        with partial_path.open("wb") as out:
+            try:
+                result = await run_tool(
+                    cmd,
+                    cwd=derived_dir,
+                    timeout=timeout,
+                    stdout_sink=out.write,
+                )
+            except ExternalToolTimeout as exc:
+                raise DwgToJsonError(
+                    f"dwg_to_json timed out for {ingested_dwg_path}: {exc}"
+                ) from exc
+
+        _raise_on_failure(ingested_dwg_path, result.returncode, result.stderr)
+
+        return await asyncio.to_thread(_finalize_output, partial_path, json_path)
+    finally:
+        partial_path.unlink(missing_ok=True)
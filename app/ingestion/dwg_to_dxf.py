@@ -3,6 +3,9 @@ from __future__ import annotations
 import logging
 import subprocess
 from pathlib import Path
+from typing import Optional
+
+from app.ingestion.subprocess_async import ExternalToolTimeout, run_tool
 
 logger = logging.getLogger(__name__)
 
@@ -15,19 +18,9 @@ def _extract_document_id_from_path(ingested_dwg_path: Path) -> str:
     return ingested_dwg_path.stem
 
 
-def convert_dwg_to_dxf(
-    ingested_dwg_path: Path,
-    derived_dir: Path,
-    dwg2dxf_path: str,
-) -> Path:
+def _prepare_dxf_output(ingested_dwg_path: Path, derived_dir: Path) -> Path:
     """
-    Run dwg2dxf to convert the DWG file to DXF, returning the DXF path.
-
-    Mirrors the working CLI invocation:
-
-        dwg2dxf -v3 -y <input.dwg> -o <output.dxf>
-
-    Uses derived_dir as cwd and <document_id>.dxf as output filename.
+    Validate the input and clear any stale <document_id>.dxf in derived_dir.
     """
     if not ingested_dwg_path.is_file():
         raise FileNotFoundError(f"Ingested DWG does not exist: {ingested_dwg_path}")
@@ -35,8 +28,7 @@ def convert_dwg_to_dxf(
     derived_dir.mkdir(parents=True, exist_ok=True)
 
     document_id = _extract_document_id_from_path(ingested_dwg_path)
-    dxf_filename = f"{document_id}.dxf"
-    dxf_path = derived_dir / dxf_filename
+    dxf_path = derived_dir / f"{document_id}.dxf"
 
     if dxf_path.exists():
         logger.info("Existing DXF found; removing before re-creating: %s", dxf_path)
@@ -48,57 +40,64 @@ def convert_dwg_to_dxf(
                 f"Failed to remove existing DXF file before conversion: {dxf_path}"
             ) from exc
 
+    return dxf_path
+
+
+def _build_command(ingested_dwg_path: Path, dxf_path: Path, dwg2dxf_path: str) -> list[str]:
     logger.info(
         "Converting DWG to DXF via dwg2dxf: exe=%s, input=%s, output_dir=%s, output_name=%s",
         dwg2dxf_path,
         ingested_dwg_path,
-        derived_dir,
-        dxf_filename,
+        dxf_path.parent,
+        dxf_path.name,
     )
 
-    cmd = [
+    return [
         dwg2dxf_path,
         "-v3",
         "-y",
         str(ingested_dwg_path),
         "-o",
-        dxf_filename,  # name only; cwd = derived_dir
+        dxf_path.name,  # name only; cwd = derived_dir
     ]
 
-    # Capture as bytes to avoid UnicodeDecodeError, then decode with errors="replace"
-    result = subprocess.run(
-        cmd,
-        cwd=derived_dir,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-
-    stdout = (result.stdout or b"").decode("utf-8", errors="replace").strip()
-    stderr = (result.stderr or b"").decode("utf-8", errors="replace").strip()
 
+def _check_result(
+    *,
+    ingested_dwg_path: Path,
+    dxf_path: Path,
+    returncode: int,
+    stderr: str,
+    stdout: Optional[str] = None,
+) -> Path:
+    """
+    dwg2dxf frequently exits non-zero on recoverable warnings; accept the
+    output whenever a non-empty DXF was written.
+    """
     dxf_exists = dxf_path.is_file()
     dxf_size = dxf_path.stat().st_size if dxf_exists else 0
 
-    if result.returncode != 0:
+    if returncode != 0:
         if dxf_exists and dxf_size > 0:
             logger.warning(
                 "dwg2dxf exited with code %s for %s, but DXF file exists (%d bytes). "
                 "Proceeding with DXF; stderr:\n%s",
-                result.returncode,
+                returncode,
                 ingested_dwg_path,
                 dxf_size,
                 stderr,
             )
-            logger.debug("dwg2dxf stdout:\n%s", stdout)
+            if stdout is not None:
+                logger.debug("dwg2dxf stdout:\n%s", stdout)
         else:
             logger.error(
                 "dwg2dxf failed for %s (code=%s). No DXF produced.\nStderr:\n%s",
                 ingested_dwg_path,
-                result.returncode,
+                returncode,
                 stderr,
             )
             raise DwgToDxfError(
-                f"dwg2dxf failed for {ingested_dwg_path} with code {result.returncode}; "
+                f"dwg2dxf failed for {ingested_dwg_path} with code {returncode}; "
                 f"no DXF produced. Stderr: {stderr}"
             )
     else:
@@ -114,3 +113,77 @@ def convert_dwg_to_dxf(
     logger.info("DWG→DXF conversion complete: %s (%d bytes)", dxf_path, dxf_size)
     return dxf_path
 
+
+def convert_dwg_to_dxf(
+    ingested_dwg_path: Path,
+    derived_dir: Path,
+    dwg2dxf_path: str,
+) -> Path:
+    """
+    Run dwg2dxf to convert the DWG file to DXF, returning the DXF path.
+
+    Mirrors the working CLI invocation:
+
+        dwg2dxf -v3 -y <input.dwg> -o <output.dxf>
+
+    Uses derived_dir as cwd and <document_id>.dxf as output filename.
+
+    Blocking; async callers should use convert_dwg_to_dxf_async().
+    """
+    dxf_path = _prepare_dxf_output(ingested_dwg_path, derived_dir)
+    cmd = _build_command(ingested_dwg_path, dxf_path, dwg2dxf_path)
+
+    # Capture as bytes to avoid UnicodeDecodeError, then decode with errors="replace"
+    result = subprocess.run(
+        cmd,
+        cwd=derived_dir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+    stdout = (result.stdout or b"").decode("utf-8", errors="replace").strip()
+    stderr = (result.stderr or b"").decode("utf-8", errors="replace").strip()
+
+    return _check_result(
+        ingested_dwg_path=ingested_dwg_path,
+        dxf_path=dxf_path,
+        returncode=result.returncode,
+        stderr=stderr,
+        stdout=stdout,
+    )
+
+
+async def convert_dwg_to_dxf_async(
+    ingested_dwg_path: Path,
+    derived_dir: Path,
+    dwg2dxf_path: str,
+    timeout: Optional[float] = None,
+) -> Path:
+    """
+    Event-loop friendly convert_dwg_to_dxf(): runs dwg2dxf through
+    asyncio.create_subprocess_exec under the global converter semaphore,
+    streams its stdout to the debug log, and kills it on timeout or
+    cancellation.
+    """
+    dxf_path = _prepare_dxf_output(ingested_dwg_path, derived_dir)
+    cmd = _build_command(ingested_dwg_path, dxf_path, dwg2dxf_path)
+
+    def _log_stdout(chunk: bytes) -> None:
+        logger.debug("dwg2dxf: %s", chunk.decode("utf-8", errors="replace").rstrip())
+
+    try:
+        result = await run_tool(
+            cmd,
+            cwd=derived_dir,
+            timeout=timeout,
+            stdout_sink=_log_stdout,
+        )
+    except ExternalToolTimeout as exc:
+        raise DwgToDxfError(f"dwg2dxf timed out for {ingested_dwg_path}: {exc}") from exc
+
+    return _check_result(
+        ingested_dwg_path=ingested_dwg_path,
+        dxf_path=dxf_path,
+        returncode=result.returncode,
+        stderr=result.stderr.strip(),
+    )
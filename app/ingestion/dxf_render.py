@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import io
 import logging
+import math
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Optional
 
 import ezdxf
 from ezdxf.addons.drawing import Frontend, RenderContext, layout, pymupdf
@@ -108,6 +111,100 @@ def _render_to_backend(
     return doc, backend
 
 
+def _write_artifact(path: Path, data: bytes, label: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    logger.info("%s rendered: %s (%.1f KB)", label, path, len(data) / 1024.0)
+
+
+def _thumbnail_dpi(replay: pymupdf.PyMuPdfRenderBackend, max_size: int) -> int:
+    """
+    Smallest DPI at which the longest page edge still covers max_size pixels,
+    so the thumbnail pixmap is rasterized small instead of downscaled from
+    the full-resolution PNG.
+    """
+    longest_edge_in = max(replay.page_width_in_pt, replay.page_height_in_pt, 1) / 72.0
+    return max(1, math.ceil(max_size / longest_edge_in))
+
+
+@dataclass
+class RenderedArtifacts:
+    """
+    Result of render_all_artifacts(). A path is None when that particular
+    output failed; the reason is kept in errors[<"pdf" | "png" | "thumbnail">].
+    """
+    pdf_path: Optional[Path] = None
+    png_path: Optional[Path] = None
+    thumbnail_path: Optional[Path] = None
+    errors: dict[str, str] = field(default_factory=dict)
+
+
+def render_all_artifacts(
+    dxf_path: Path,
+    *,
+    pdf_path: Optional[Path] = None,
+    png_path: Optional[Path] = None,
+    thumbnail_path: Optional[Path] = None,
+    dpi: int = 300,
+    thumbnail_max_size: int = 512,
+) -> RenderedArtifacts:
+    """
+    Render PDF, full-size PNG and thumbnail from a single DXF parse and a
+    single Frontend.draw_layout() pass.
+
+    The recorded drawing is replayed once into a PyMuPdfRenderBackend, and
+    all three outputs are taken from that one page:
+      - PDF via get_pdf_bytes()
+      - PNG via a `dpi` pixmap
+      - thumbnail via a low-DPI pixmap sized for thumbnail_max_size
+
+    Failures of individual outputs are recorded in .errors and do not stop
+    the remaining ones; a DXF that cannot be loaded/drawn raises.
+    """
+    logger.info("Rendering all artifacts from DXF in one pass: %s", dxf_path)
+
+    _, backend = _render_to_backend(dxf_path)
+    page = _create_page()
+    settings = _create_settings(scale=1.0)
+
+    # get_replay() transforms the recordings in place, so it must run once.
+    replay = backend.get_replay(page, settings=settings)
+    result = RenderedArtifacts()
+
+    if pdf_path is not None:
+        try:
+            _write_artifact(pdf_path, replay.get_pdf_bytes(), "PDF")
+            result.pdf_path = pdf_path
+        except Exception as exc:
+            logger.exception("PDF output failed for %s", dxf_path)
+            result.errors["pdf"] = str(exc)
+
+    if png_path is not None:
+        try:
+            png_bytes = replay.get_pixmap(dpi=dpi, alpha=False).tobytes(output="png")
+            _write_artifact(png_path, png_bytes, "PNG")
+            result.png_path = png_path
+        except Exception as exc:
+            logger.exception("PNG output failed for %s", dxf_path)
+            result.errors["png"] = str(exc)
+
+    if thumbnail_path is not None:
+        try:
+            thumb_dpi = _thumbnail_dpi(replay, thumbnail_max_size)
+            small = replay.get_pixmap(dpi=thumb_dpi, alpha=False).tobytes(output="png")
+            with Image.open(io.BytesIO(small)) as img:
+                img.thumbnail((thumbnail_max_size, thumbnail_max_size))
+                buf = io.BytesIO()
+                img.save(buf, format="PNG")
+            _write_artifact(thumbnail_path, buf.getvalue(), "Thumbnail")
+            result.thumbnail_path = thumbnail_path
+        except Exception as exc:
+            logger.exception("Thumbnail output failed for %s", dxf_path)
+            result.errors["thumbnail"] = str(exc)
+
+    return result
+
+
 def render_dxf_to_pdf(dxf_path: Path, pdf_path: Path, dpi: int = 300) -> None:
     """
     Render DXF → vector PDF using ezdxf + PyMuPdfBackend.
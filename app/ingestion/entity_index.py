@@ -0,0 +1,139 @@
+# app/ingestion/entity_index.py
+"""
+Single-pass classification of dwg_to_json entities.
+
+build_entity_index(json_path) walks entities[] once and returns an
+EntityIndex with:
+
+  - num_entities, type_counts, layer_counts
+  - dimensions (DimensionEntity)  — types containing "dim"
+  - notes      (NoteEntity)       — other types containing "text"
+
+ETL builds it once per ingest and hands it to the summary provider, so the
+entity list is classified once instead of once per consumer. When the
+entity sidecar exists, counts come from its columns and only dimension /
+text entities are parsed from the raw JSON.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.ingestion.dwg_json import iter_dwg_entities
+from app.ingestion.entity_sidecar import open_entity_table
+
+
+def infer_note_type(text: Optional[str]) -> str:
+    t = (text or "").lower()
+    if any(tok in t for tok in ["±", "tolerance", "tol"]):
+        return "tolerance"
+    if any(tok in t for tok in ["⌀", "gd&t", "true position", "flatness"]):
+        return "gdandt"
+    return "general"
+
+
+def _is_dimension_type(type_lower: str) -> bool:
+    return "dim" in type_lower  # e.g. "DIMENSION_LINEAR"
+
+
+def _is_note_type(type_lower: str) -> bool:
+    return "text" in type_lower  # TEXT, MTEXT, ...
+
+
+class DimensionEntity:
+    __slots__ = (
+        "index", "type", "raw_type", "layer", "handle", "owner_handle",
+        "text", "value", "units", "geometry",
+    )
+
+    def __init__(self, ent: Dict[str, Any]) -> None:
+        self.index = ent.get("index")
+        self.type = ent.get("type")
+        self.raw_type = ent.get("raw_type")
+        self.layer = ent.get("layer")
+        self.handle = ent.get("handle")
+        self.owner_handle = ent.get("owner_handle")
+        self.text = ent.get("text")
+        self.value = ent.get("value")
+        self.units = ent.get("units")
+        self.geometry = ent.get("geometry")
+
+
+class NoteEntity:
+    __slots__ = ("index", "type", "layer", "handle", "note_type", "text", "geometry")
+
+    def __init__(self, ent: Dict[str, Any]) -> None:
+        self.index = ent.get("index")
+        self.type = ent.get("type")
+        self.layer = ent.get("layer")
+        self.handle = ent.get("handle")
+        self.text = ent.get("text") or ""
+        self.note_type = infer_note_type(self.text)
+        self.geometry = ent.get("geometry")
+
+
+class EntityIndex:
+    __slots__ = (
+        "num_entities", "type_counts", "layer_counts",
+        "dimensions", "notes", "sidecar_path",
+    )
+
+    def __init__(self) -> None:
+        self.num_entities = 0
+        self.type_counts: Dict[str, int] = {}   # stripped type -> count, first-seen order
+        self.layer_counts: Dict[str, int] = {}
+        self.dimensions: List[DimensionEntity] = []
+        self.notes: List[NoteEntity] = []
+        self.sidecar_path: Optional[Path] = None  # set when built from the sidecar
+
+    def _add(self, ent: Dict[str, Any]) -> None:
+        type_lower = (ent.get("type") or "").lower()
+        if _is_dimension_type(type_lower):
+            self.dimensions.append(DimensionEntity(ent))
+        elif _is_note_type(type_lower):
+            self.notes.append(NoteEntity(ent))
+
+
+def _index_from_stream(entities: Iterable[Dict[str, Any]]) -> EntityIndex:
+    index = EntityIndex()
+    type_counts = index.type_counts
+    layer_counts = index.layer_counts
+    n = 0
+    for ent in entities:
+        n += 1
+        etype = (ent.get("type") or "").strip()
+        if etype:
+            type_counts[etype] = type_counts.get(etype, 0) + 1
+        layer = ent.get("layer")
+        if layer:
+            layer_counts[layer] = layer_counts.get(layer, 0) + 1
+        index._add(ent)
+    index.num_entities = n
+    return index
+
+
+def build_entity_index(json_path: Path) -> EntityIndex:
+    """
+    Classify every entity of a dwg_to_json file in one pass. Synchronous and
+    CPU-bound; async callers use asyncio.to_thread.
+    """
+    table = open_entity_table(json_path)
+    if table is None:
+        return _index_from_stream(iter_dwg_entities(json_path))
+
+    with table:
+        index = EntityIndex()
+        index.sidecar_path = table.path
+        index.num_entities = len(table)
+        for etype, count in table.type_counts().items():
+            etype = etype.strip()
+            if etype:
+                index.type_counts[etype] = index.type_counts.get(etype, 0) + count
+        index.layer_counts.update(table.layer_counts())
+        rows = table.select_types(
+            lambda t: _is_dimension_type(t.lower()) or _is_note_type(t.lower())
+        )
+        for ent in table.raw_entities(rows):
+            index._add(ent)
+    return index
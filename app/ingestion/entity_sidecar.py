@@ -0,0 +1,513 @@
+# app/ingestion/entity_sidecar.py
+"""
+Columnar binary sidecar for dwg_to_json entities: <document_id>.entities.bin
+
+Written once at ingest time next to <document_id>.json. It holds one typed
+column per field for every entity in `entities[]`, plus the byte span of
+each entity object in the raw JSON:
+
+    index         int64    entity "index" (-1 if absent)
+    raw_type      int32    entity "raw_type" (-1 if absent)
+    type_id       uint16   -> manifest["tables"]["type"]   (0 = absent)
+    layer_id      uint32   -> manifest["tables"]["layer"]  (0 = absent)
+    units_id      uint16   -> manifest["tables"]["units"]  (0 = absent)
+    value         float64  entity "value" (NaN if absent / non-numeric)
+    handle        string column (offsets uint64[n+1] + utf-8 bytes + null mask)
+    owner_handle  string column
+    text          string column
+    json_offset   uint64   byte offset of the entity object in the raw JSON
+    json_length   uint32   byte length of the entity object
+
+Layout: MAGIC, uint32 format version, uint32 manifest length, the JSON
+manifest (count, source file size / mtime, string tables, column dtype /
+offset / length), then 8-byte aligned column blobs.
+
+EntityTable memory-maps the file; columns are numpy views over the
+mapping, so opening a table costs milliseconds regardless of drawing size.
+Full entity dicts (geometry etc.) are parsed on demand from the raw JSON
+via the offset index.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.ingestion.dwg_json import DwgToJsonError, iter_dwg_entities
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CSENTBIN"
+FORMAT_VERSION = 1
+SIDECAR_SUFFIX = ".entities.bin"
+
+_PREFIX = struct.Struct("<8sII")
+_ALIGN = 8
+_SCAN_CHUNK = 1 << 22  # bytes per vectorized scan step
+
+_STRING_COLUMNS = ("handle", "owner_handle", "text")
+# EntityTable attributes that are numpy views into the mapping
+_VIEW_ATTRS = (
+    "index", "raw_type", "type_id", "layer_id", "units_id",
+    "value", "json_offset", "json_length", "_strings",
+)
+
+_QUOTE, _BACKSLASH = 0x22, 0x5C
+_LBRACE, _RBRACE, _LBRACKET, _RBRACKET = 0x7B, 0x7D, 0x5B, 0x5D
+
+
+def sidecar_path_for(json_path: Path) -> Path:
+    # <document_id>.json -> <document_id>.entities.bin
+    return json_path.with_name(json_path.stem + SIDECAR_SUFFIX)
+
+
+# ---------------------------------------------------------
+# Offset index: byte spans of entities[] items in the raw JSON
+# ---------------------------------------------------------
+
+def scan_entity_spans(json_path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return (offsets, lengths) of every object in the top-level `entities`
+    array, found with a vectorized structural scan (string / escape aware)
+    over a memory map of the file, in fixed-size chunks.
+
+    Only quote and bracket positions are materialized: quotes decide which
+    brackets are inside strings, brackets give the nesting depth.
+    """
+    starts: List[np.ndarray] = []
+    ends: List[np.ndarray] = []
+
+    depth = 0            # nesting depth before the chunk
+    in_string = 0        # 1 if the chunk starts inside a string
+    trailing_bs = 0      # backslashes ending the previous chunk
+    key_pos = -1         # position of the top-level "entities" key
+    array_open = -1      # position of its '['
+    array_close = -1     # position of the matching ']'
+
+    with json_path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return np.empty(0, np.uint64), np.empty(0, np.uint32)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for base in range(0, size, _SCAN_CHUNK):
+                chunk = mm[base:base + _SCAN_CHUNK]
+                n = len(chunk)
+                b = np.frombuffer(chunk, dtype=np.uint8)
+
+                # Unescaped quotes: a quote is escaped iff an odd run of
+                # backslashes precedes it. Such quotes are rare, so the
+                # run length is only counted for those candidates.
+                qpos = np.flatnonzero(b == _QUOTE)
+                prev_bs = np.zeros(qpos.size, dtype=bool)
+                prev_bs[qpos > 0] = b[qpos[qpos > 0] - 1] == _BACKSLASH
+                if qpos.size and qpos[0] == 0 and trailing_bs:
+                    prev_bs[0] = True
+                if prev_bs.any():
+                    keep = np.ones(qpos.size, dtype=bool)
+                    for k in np.flatnonzero(prev_bs):
+                        q = int(qpos[k])
+                        j = q - 1
+                        while j >= 0 and chunk[j] == _BACKSLASH:
+                            j -= 1
+                        run = q - 1 - j + (trailing_bs if j < 0 else 0)
+                        keep[k] = run % 2 == 0
+                    qpos = qpos[keep]
+
+                # Brackets outside strings: an even number of real quotes
+                # (plus the carried state) before the bracket.
+                bpos = np.flatnonzero(
+                    (b == _LBRACE) | (b == _RBRACE) | (b == _LBRACKET) | (b == _RBRACKET)
+                )
+                outside = ((np.searchsorted(qpos, bpos) + in_string) & 1) == 0
+                bpos = bpos[outside]
+                bchar = b[bpos]
+                is_open = (bchar == _LBRACE) | (bchar == _LBRACKET)
+                depth_after = np.cumsum(np.where(is_open, 1, -1), dtype=np.int64) + depth
+
+                if key_pos < 0 and qpos.size:
+                    # Opening quotes of strings at depth 1 (top-level keys and values).
+                    q_depth = np.concatenate(([depth], depth_after))[np.searchsorted(bpos, qpos)]
+                    opening = ((np.arange(qpos.size) + in_string) & 1) == 0
+                    for p in qpos[opening & (q_depth == 1)]:
+                        p = base + int(p)
+                        if mm[p:p + 10] == b'"entities"':
+                            if mm[p + 10:p + 74].lstrip().startswith(b":"):
+                                key_pos = p
+                                break
+
+                abs_b = bpos + base
+                if key_pos >= 0 and array_open < 0:
+                    cand = abs_b[(bchar == _LBRACKET) & (depth_after == 2) & (abs_b > key_pos)]
+                    if cand.size:
+                        array_open = int(cand[0])
+
+                if array_open >= 0 and array_close < 0:
+                    close_cand = abs_b[(bchar == _RBRACKET) & (depth_after == 1) & (abs_b > array_open)]
+                    limit = int(close_cand[0]) if close_cand.size else base + n
+                    window = (abs_b > array_open) & (abs_b < limit)
+                    starts.append(abs_b[window & (bchar == _LBRACE) & (depth_after == 3)])
+                    ends.append(abs_b[window & (bchar == _RBRACE) & (depth_after == 2)])
+                    if close_cand.size:
+                        array_close = limit
+
+                if depth_after.size:
+                    depth = int(depth_after[-1])
+                in_string = (in_string + qpos.size) & 1
+                stripped = len(chunk.rstrip(b"\\"))
+                trailing_bs = (n - stripped) + (trailing_bs if stripped == 0 else 0)
+
+                if array_close >= 0:
+                    break
+
+    if array_open < 0:
+        return np.empty(0, np.uint64), np.empty(0, np.uint32)
+
+    start_arr = np.concatenate(starts) if starts else np.empty(0, np.int64)
+    end_arr = np.concatenate(ends) if ends else np.empty(0, np.int64)
+    if start_arr.size != end_arr.size:
+        raise DwgToJsonError(f"Unbalanced entity objects in {json_path}")
+    return start_arr.astype(np.uint64), (end_arr - start_arr + 1).astype(np.uint32)
+
+
+# ---------------------------------------------------------
+# Writer
+# ---------------------------------------------------------
+
+class _Interner:
+    __slots__ = ("ids", "values")
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.values: List[Optional[str]] = [None]  # id 0 = absent
+
+    def __call__(self, value: Any) -> int:
+        if value is None:
+            return 0
+        value = str(value)
+        got = self.ids.get(value)
+        if got is None:
+            got = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return got
+
+
+class _StringColumnBuilder:
+    __slots__ = ("offsets", "data", "nulls")
+
+    def __init__(self) -> None:
+        self.offsets = array("Q", [0])
+        self.data = bytearray()
+        self.nulls = bytearray()
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            self.nulls.append(1)
+        else:
+            self.nulls.append(0)
+            self.data += str(value).encode("utf-8")
+        self.offsets.append(len(self.data))
+
+
+def _as_float(value: Any) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return math.nan
+
+
+def write_entity_sidecar(json_path: Path, sidecar_path: Optional[Path] = None) -> Path:
+    """
+    Build <document_id>.entities.bin from a dwg_to_json file: one streaming
+    parse for the columns plus one vectorized scan for the offset index.
+    Written to a .partial file and renamed into place.
+    """
+    sidecar_path = sidecar_path or sidecar_path_for(json_path)
+
+    types, layers, units = _Interner(), _Interner(), _Interner()
+    strings = {name: _StringColumnBuilder() for name in _STRING_COLUMNS}
+    index, raw_type = array("q"), array("i")
+    type_id, layer_id, units_id = array("H"), array("I"), array("H")
+    value = array("d")
+
+    for ent in iter_dwg_entities(json_path):
+        idx = ent.get("index")
+        index.append(idx if isinstance(idx, int) else -1)
+        rt = ent.get("raw_type")
+        raw_type.append(rt if isinstance(rt, int) else -1)
+        type_id.append(types(ent.get("type")))
+        layer_id.append(layers(ent.get("layer")))
+        units_id.append(units(ent.get("units")))
+        value.append(_as_float(ent.get("value")))
+        for name in _STRING_COLUMNS:
+            strings[name].append(ent.get(name))
+
+    offsets, lengths = scan_entity_spans(json_path)
+    count = len(index)
+    if offsets.size != count:
+        raise DwgToJsonError(
+            f"Entity offset scan found {offsets.size} objects, parser found {count}: {json_path}"
+        )
+
+    columns: Dict[str, np.ndarray] = {
+        "index": np.frombuffer(index, dtype="<i8"),
+        "raw_type": np.frombuffer(raw_type, dtype="<i4"),
+        "type_id": np.frombuffer(type_id, dtype="<u2"),
+        "layer_id": np.frombuffer(layer_id, dtype="<u4"),
+        "units_id": np.frombuffer(units_id, dtype="<u2"),
+        "value": np.frombuffer(value, dtype="<f8"),
+        "json_offset": offsets.astype("<u8"),
+        "json_length": lengths.astype("<u4"),
+    }
+    for name, col in strings.items():
+        columns[f"{name}_offsets"] = np.frombuffer(col.offsets, dtype="<u8")
+        columns[f"{name}_data"] = np.frombuffer(bytes(col.data), dtype="u1")
+        columns[f"{name}_null"] = np.frombuffer(bytes(col.nulls), dtype="u1")
+
+    stat = json_path.stat()
+    manifest: Dict[str, Any] = {
+        "count": count,
+        "source": json_path.name,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "tables": {"type": types.values, "layer": layers.values, "units": units.values},
+        "columns": {},
+    }
+
+    # Column offsets are absolute, so the manifest length depends on them;
+    # re-layout until the data start no longer moves (two passes in practice).
+    data_start = 0
+    while True:
+        pos = data_start
+        for name, arr in columns.items():
+            manifest["columns"][name] = {"dtype": arr.dtype.str, "offset": pos, "length": int(arr.size)}
+            pos += arr.nbytes
+            pos += -pos % _ALIGN
+        manifest_bytes = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+        needed = _PREFIX.size + len(manifest_bytes)
+        needed += -needed % _ALIGN
+        if needed <= data_start:
+            break
+        data_start = needed
+
+    partial = sidecar_path.with_name(sidecar_path.name + ".partial")
+    try:
+        with partial.open("wb") as out:
+            out.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(manifest_bytes)))
+            out.write(manifest_bytes)
+            for name, arr in columns.items():
+                out.seek(manifest["columns"][name]["offset"])
+                out.write(arr.tobytes())
+        partial.replace(sidecar_path)
+    finally:
+        partial.unlink(missing_ok=True)
+
+    logger.info(
+        "Entity sidecar written: %s (%d entities, %.1f KB)",
+        sidecar_path,
+        count,
+        sidecar_path.stat().st_size / 1024.0,
+    )
+    return sidecar_path
+
+
+# ---------------------------------------------------------
+# Reader
+# ---------------------------------------------------------
+
+class EntityTable:
+    """
+    Memory-mapped view of an entities sidecar.
+
+        with EntityTable(path) as table:
+            dims = table.select_types(lambda t: "dim" in t.lower())
+            ent = table.raw_entity(int(dims[0]))
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = path.open("rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._json_file = None
+        self._json_mm: Optional[mmap.mmap] = None
+
+        magic, version, manifest_len = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Not an entities sidecar (v{FORMAT_VERSION}): {path}")
+        self.manifest: Dict[str, Any] = json.loads(
+            self._mm[_PREFIX.size:_PREFIX.size + manifest_len]
+        )
+
+        self.count: int = self.manifest["count"]
+        tables = self.manifest["tables"]
+        self.types: List[Optional[str]] = tables["type"]
+        self.layers: List[Optional[str]] = tables["layer"]
+        self.units: List[Optional[str]] = tables["units"]
+
+        self.index = self._column("index")
+        self.raw_type = self._column("raw_type")
+        self.type_id = self._column("type_id")
+        self.layer_id = self._column("layer_id")
+        self.units_id = self._column("units_id")
+        self.value = self._column("value")
+        self.json_offset = self._column("json_offset")
+        self.json_length = self._column("json_length")
+        self._strings = {
+            name: (
+                self._column(f"{name}_offsets"),
+                self._column(f"{name}_data"),
+                self._column(f"{name}_null"),
+            )
+            for name in _STRING_COLUMNS
+        }
+
+    def _column(self, name: str) -> np.ndarray:
+        spec = self.manifest["columns"][name]
+        return np.frombuffer(
+            self._mm, dtype=np.dtype(spec["dtype"]), count=spec["length"], offset=spec["offset"]
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self) -> "EntityTable":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # Don't mask the original error: the failing frame may still hold
+        # column views, which would make close() raise BufferError.
+        try:
+            self.close()
+        except BufferError:
+            logger.warning(
+                "Entity sidecar %s left mapped: column views still referenced", self.path
+            )
+
+    def close(self) -> None:
+        """
+        Unmap the sidecar and the raw JSON.
+
+        Column arrays (index, value, type_id, ...) are zero-copy views into
+        the mapping. The table drops its own references here; a caller that
+        still holds one gets a BufferError instead of a silently leaked
+        mapping. Keep data past close() with .copy().
+        """
+        for attr in _VIEW_ATTRS:
+            self.__dict__.pop(attr, None)
+
+        # Raw JSON slices are bytes copies, so this mapping has no views.
+        if getattr(self, "_json_mm", None) is not None:
+            self._json_mm.close()
+            self._json_mm = None
+        if getattr(self, "_json_file", None) is not None:
+            self._json_file.close()
+            self._json_file = None
+
+        mm = getattr(self, "_mm", None)
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError as exc:
+                raise BufferError(
+                    f"Entity sidecar {self.path} is still referenced by column "
+                    "views; release them (or .copy() them) before close()"
+                ) from exc
+            finally:
+                if getattr(self, "_file", None) is not None:
+                    self._file.close()
+                    self._file = None
+            self._mm = None
+
+    # -- scalar accessors ------------------------------------------------
+
+    def _string(self, name: str, i: int) -> Optional[str]:
+        offsets, data, nulls = self._strings[name]
+        if nulls[i]:
+            return None
+        return data[int(offsets[i]):int(offsets[i + 1])].tobytes().decode("utf-8")
+
+    def text(self, i: int) -> Optional[str]:
+        return self._string("text", i)
+
+    def handle(self, i: int) -> Optional[str]:
+        return self._string("handle", i)
+
+    def owner_handle(self, i: int) -> Optional[str]:
+        return self._string("owner_handle", i)
+
+    def type_name(self, i: int) -> Optional[str]:
+        return self.types[int(self.type_id[i])]
+
+    def layer_name(self, i: int) -> Optional[str]:
+        return self.layers[int(self.layer_id[i])]
+
+    # -- vectorized helpers ----------------------------------------------
+
+    def select_types(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        """Row numbers whose entity type satisfies predicate, in file order."""
+        lut = np.array(
+            [t is not None and predicate(t) for t in self.types], dtype=bool
+        )
+        return np.nonzero(lut[self.type_id])[0]
+
+    def type_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.type_id, minlength=len(self.types))
+        return {t: int(c) for t, c in zip(self.types, counts) if t and c}
+
+    def layer_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.layer_id, minlength=len(self.layers))
+        return {name: int(c) for name, c in zip(self.layers, counts) if name and c}
+
+    # -- raw JSON via the offset index -----------------------------------
+
+    def raw_entity(self, i: int) -> Dict[str, Any]:
+        """Parse entity i (including geometry) from its span in the raw JSON."""
+        if self._json_mm is None:
+            json_path = self.path.with_name(self.manifest["source"])
+            self._json_file = json_path.open("rb")
+            self._json_mm = mmap.mmap(self._json_file.fileno(), 0, access=mmap.ACCESS_READ)
+        start = int(self.json_offset[i])
+        return json.loads(self._json_mm[start:start + int(self.json_length[i])])
+
+    def raw_entities(self, rows: Iterable[int]) -> Iterable[Dict[str, Any]]:
+        for i in rows:
+            yield self.raw_entity(int(i))
+
+
+def open_entity_table(json_path: Path) -> Optional[EntityTable]:
+    """
+    Open the sidecar for json_path if it exists and was built from the
+    current file (same size and mtime); None otherwise.
+    """
+    path = sidecar_path_for(json_path)
+    if not path.is_file():
+        return None
+    try:
+        table = EntityTable(path)
+    except (OSError, ValueError, KeyError):
+        logger.warning("Ignoring unreadable entity sidecar %s", path, exc_info=True)
+        return None
+    try:
+        stat = json_path.stat()
+    except OSError:
+        table.close()
+        return None
+    if (
+        table.manifest.get("source_size") != stat.st_size
+        or table.manifest.get("source_mtime_ns") != stat.st_mtime_ns
+    ):
+        logger.info("Entity sidecar %s is stale; ignoring it", path)
+        table.close()
+        return None
+    return table
@@ -0,0 +1,218 @@
+# app/ingestion/stage_graph.py
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+StageFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+# ---------------------------------------------------------
+# Process pool for CPU-bound stages (DXF rendering)
+# ---------------------------------------------------------
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Lazily created, process-wide pool sized by RENDER_PROCESS_WORKERS.
+
+    "spawn" keeps children free of the parent's DB connections and event
+    loop state.
+    """
+    global _process_pool
+    if _process_pool is None:
+        workers = max(1, get_settings().render_process_workers)
+        _process_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info("Started render process pool with %d worker(s)", workers)
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+
+
+async def run_in_process_pool(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a picklable module-level function on the process pool without
+    blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_process_pool(), functools.partial(fn, *args, **kwargs)
+    )
+
+
+# ---------------------------------------------------------
+# Stage graph
+# ---------------------------------------------------------
+
+@dataclass
+class Stage:
+    """
+    One node of the pipeline graph.
+
+    run() receives a dict {dependency name: dependency result}. If a
+    non-required stage fails, its dependents still run and see None as its
+    result; if a required stage fails the whole graph is aborted.
+    """
+    name: str
+    run: StageFn
+    deps: Sequence[str] = ()
+    required: bool = True
+
+
+@dataclass
+class StageOutcome:
+    name: str
+    status: str = "pending"  # "succeeded" | "failed" | "skipped" | "cancelled"
+    result: Any = None
+    error: Optional[BaseException] = None
+    duration_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "succeeded"
+
+
+@dataclass
+class GraphResult:
+    outcomes: Dict[str, StageOutcome] = field(default_factory=dict)
+    duration_ms: float = 0.0
+
+    def __getitem__(self, name: str) -> StageOutcome:
+        return self.outcomes[name]
+
+
+def _validate(stages: Sequence[Stage]) -> None:
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names in graph: {names}")
+    known = set(names)
+    for s in stages:
+        missing = [d for d in s.deps if d not in known]
+        if missing:
+            raise ValueError(f"Stage {s.name!r} depends on unknown stage(s) {missing}")
+
+    # Kahn's algorithm, only to reject cycles up front.
+    indegree = {s.name: len(s.deps) for s in stages}
+    children: Dict[str, list[str]] = {s.name: [] for s in stages}
+    for s in stages:
+        for d in s.deps:
+            children[d].append(s.name)
+    ready = [n for n, deg in indegree.items() if deg == 0]
+    seen = 0
+    while ready:
+        n = ready.pop()
+        seen += 1
+        for c in children[n]:
+            indegree[c] -= 1
+            if indegree[c] == 0:
+                ready.append(c)
+    if seen != len(stages):
+        raise ValueError("Stage graph contains a cycle")
+
+
+async def run_stage_graph(
+    stages: Sequence[Stage],
+    *,
+    on_stage_done: Optional[Callable[[StageOutcome], None]] = None,
+) -> GraphResult:
+    """
+    Execute stages as soon as all of their dependencies have finished, so
+    independent branches overlap and wall-clock time approaches the
+    critical path.
+
+    A failed required stage cancels everything still running; stages
+    whose dependencies can no longer be satisfied are marked "skipped".
+    """
+    _validate(stages)
+
+    by_name = {s.name: s for s in stages}
+    graph = GraphResult(outcomes={s.name: StageOutcome(s.name) for s in stages})
+    running: Dict[asyncio.Task, str] = {}
+    aborted = False
+    t_graph = time.perf_counter()
+
+    def _finish(outcome: StageOutcome) -> None:
+        if on_stage_done is not None:
+            try:
+                on_stage_done(outcome)
+            except Exception:
+                logger.exception("on_stage_done callback failed for %s", outcome.name)
+
+    def _launch_ready() -> None:
+        for s in stages:
+            outcome = graph.outcomes[s.name]
+            if outcome.status != "pending" or s.name in running.values():
+                continue
+            dep_outcomes = [graph.outcomes[d] for d in s.deps]
+            if any(o.status == "pending" for o in dep_outcomes):
+                continue
+            blocked = [
+                o.name for o in dep_outcomes
+                if not o.ok and by_name[o.name].required
+            ]
+            if aborted or blocked:
+                outcome.status = "skipped"
+                _finish(outcome)
+                continue
+            inputs = {d: graph.outcomes[d].result for d in s.deps}
+            task = asyncio.create_task(s.run(inputs), name=f"stage:{s.name}")
+            task.started_at = time.perf_counter()  # type: ignore[attr-defined]
+            running[task] = s.name
+
+    try:
+        _launch_ready()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                outcome = graph.outcomes[name]
+                outcome.duration_ms = (time.perf_counter() - task.started_at) * 1000.0  # type: ignore[attr-defined]
+
+                if task.cancelled():
+                    outcome.status = "cancelled"
+                elif task.exception() is not None:
+                    outcome.status = "failed"
+                    outcome.error = task.exception()
+                    if by_name[name].required and not aborted:
+                        aborted = True
+                        for other in running:
+                            other.cancel()
+                else:
+                    outcome.status = "succeeded"
+                    outcome.result = task.result()
+                _finish(outcome)
+
+            # Skips can cascade through several levels; settle them all.
+            while True:
+                before = sum(1 for o in graph.outcomes.values() if o.status != "pending")
+                _launch_ready()
+                after = sum(1 for o in graph.outcomes.values() if o.status != "pending")
+                if after == before:
+                    break
+    finally:
+        # Our own caller was cancelled: don't leave orphaned stage tasks.
+        for task in running:
+            task.cancel()
+
+    graph.duration_ms = (time.perf_counter() - t_graph) * 1000.0
+    return graph
@@ -0,0 +1,126 @@
+# app/ingestion/subprocess_async.py
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 64 * 1024  # bytes per stdout read
+STDERR_TAIL_BYTES = 64 * 1024  # keep only the end of stderr for error messages
+
+StdoutSink = Callable[[bytes], None]
+
+_tool_semaphore: Optional[asyncio.Semaphore] = None
+
+
+class ExternalToolTimeout(RuntimeError):
+    """Raised when an external converter exceeds its timeout and is killed."""
+
+
+@dataclass
+class ToolResult:
+    returncode: int
+    stderr: str
+
+
+def _get_tool_semaphore() -> asyncio.Semaphore:
+    """
+    Global cap on concurrently running converter processes (dwg2dxf,
+    dwg2json, ...), sized by EXTERNAL_TOOL_MAX_CONCURRENCY.
+    """
+    global _tool_semaphore
+    if _tool_semaphore is None:
+        limit = max(1, get_settings().external_tool_max_concurrency)
+        _tool_semaphore = asyncio.Semaphore(limit)
+    return _tool_semaphore
+
+
+async def _pump_stdout(stream: asyncio.StreamReader, sink: Optional[StdoutSink]) -> None:
+    while True:
+        chunk = await stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        if sink is not None:
+            sink(chunk)
+
+
+async def _collect_tail(stream: asyncio.StreamReader, tail: deque) -> None:
+    size = 0
+    while True:
+        chunk = await stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        tail.append(chunk)
+        size += len(chunk)
+        while size > STDERR_TAIL_BYTES and len(tail) > 1:
+            size -= len(tail.popleft())
+
+
+async def _kill(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+    await proc.wait()
+
+
+async def run_tool(
+    cmd: Sequence[str],
+    *,
+    cwd: Path,
+    timeout: Optional[float] = None,
+    stdout_sink: Optional[StdoutSink] = None,
+) -> ToolResult:
+    """
+    Run an external converter without blocking the event loop.
+
+    - stdout is streamed chunk by chunk into stdout_sink (never buffered whole)
+    - stderr is drained concurrently; only its tail is kept
+    - on timeout or task cancellation the child process is killed
+    - at most EXTERNAL_TOOL_MAX_CONCURRENCY tools run at once per process
+    """
+    if timeout is None:
+        timeout = get_settings().external_tool_timeout_seconds
+
+    async with _get_tool_semaphore():
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=str(cwd),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+
+        stderr_tail: deque = deque()
+        io = asyncio.gather(
+            _pump_stdout(proc.stdout, stdout_sink),
+            _collect_tail(proc.stderr, stderr_tail),
+            proc.wait(),
+        )
+        # Mark the outcome as retrieved even when we abandon it below.
+        io.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            await asyncio.wait_for(io, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error("External tool timed out after %ss: %s", timeout, cmd[0])
+            await _kill(proc)
+            raise ExternalToolTimeout(
+                f"{cmd[0]} did not finish within {timeout} seconds"
+            )
+        except BaseException:
+            # Cancellation (client gone, worker shutdown) or sink failure:
+            # never leave an orphaned converter running.
+            await _kill(proc)
+            raise
+
+    stderr = b"".join(stderr_tail).decode("utf-8", errors="replace")
+    return ToolResult(returncode=proc.returncode, stderr=stderr)
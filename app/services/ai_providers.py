@@ -1,16 +1,50 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import json
+import random
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from abc import ABC, abstractmethod
 
-from openai import OpenAI
+from openai import (
+    APIConnectionError,
+    BadRequestError,
+    InternalServerError,
+    NotFoundError,
+    OpenAI,
+    RateLimitError,
+)
+
+from app.config import get_settings
+from app.services.http_clients import get_openai_client
+from app.ingestion.dwg_json import read_dwg_json_header
+from app.ingestion.entity_index import EntityIndex, build_entity_index
+from app.services.pdf_upload_cache import (
+    forget_file_id,
+    get_cached_file_id,
+    pdf_sha256,
+    remember_file_id,
+)
 
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
+# Caps in-flight summarization requests across all providers in this
+# process (SUMMARY_CONCURRENCY); created lazily so it binds to the running
+# event loop.
+_summary_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_summary_semaphore() -> asyncio.Semaphore:
+    global _summary_semaphore
+    if _summary_semaphore is None:
+        _summary_semaphore = asyncio.Semaphore(max(1, settings.summary_concurrency))
+    return _summary_semaphore
+
 # ============================================================================
 # Abstract Provider Interfaces
 # ============================================================================
@@ -18,18 +52,26 @@ logger = logging.getLogger(__name__)
 class SummaryProvider(ABC):
     """
     Abstract interface for multimodal drawing summaries.
+
+    prompt_version is stored on DrawingSummary rows; bump it whenever the
+    prompts or passes change so cached summaries are regenerated.
     """
     model_name: str
+    prompt_version: str = "1.0"
 
     @abstractmethod
-    def generate_summary(
+    async def generate_summary(
         self,
         *,
         document_id: str,
         pdf_path: Optional[Path],
-        json_dict: Dict[str, Any],
+        json_path: Path,
+        entity_index: Optional[EntityIndex] = None,
     ) -> Dict[str, Any]:
         """
+        entity_index, if given, is the caller's build_entity_index(json_path)
+        and saves a second pass over the entities.
+
         Return dict:
         {
             "structured_summary": {...},
@@ -119,52 +161,48 @@ class OpenAISummaryProvider(SummaryProvider):
     Multi-pass design (no JSON truncation):
       1. JSON pass:
          - Serialize full DWG→JSON output
-         - Chunk if needed and summarize each chunk
+         - Chunk if needed and summarize each chunk (concurrently)
          - Combine chunk summaries into one JSON-based summary
 
-      2. PDF pass:
+      2. PDF pass (runs concurrently with the JSON pass):
          - Analyze the drawing PDF only (views, layout, callouts, GD&T frames)
 
       3. Fusion pass:
          - Merge JSON-based and PDF-based summaries into final structured object
            { structured_summary, long_form_description, short_description }
+
+    All model calls go through _create_response(), which shares the
+    SUMMARY_CONCURRENCY semaphore and retries rate limits with backoff.
     """
 
     def __init__(self, model_name: str = "gpt-5.1"):
         self.model_name = model_name
-        self.client = OpenAI()
+        # Process-wide pooled client, shared with chat and embeddings.
+        self.client = get_openai_client()
 
     # ------------------------------------------------------------------
     # Public API used by ETL
     # ------------------------------------------------------------------
-    def generate_summary(
+    async def generate_summary(
         self,
         *,
         document_id: str,
         pdf_path: Optional[Path],
-        json_dict: Dict[str, Any],
+        json_path: Path,
+        entity_index: Optional[EntityIndex] = None,
     ) -> Dict[str, Any]:
 
         logger.info("Generating summary for document_id=%s", document_id)
 
-        # 1) Upload PDF once (if present)
-        pdf_file_id: Optional[str] = self._upload_pdf(document_id, pdf_path)
-
-        # 2) JSON-only summarization (hierarchical, chunked)
-        json_summary = self._summarize_json(document_id, json_dict)
-
-        # 3) PDF-only summarization (if we have a file)
-        pdf_summary = ""
-        if pdf_file_id:
-            pdf_summary = self._summarize_pdf(document_id, pdf_file_id)
-        else:
-            logger.info(
-                "No PDF available for document_id=%s; skipping PDF summarization.",
-                document_id,
-            )
+        # 1) + 2) JSON pass (map-reduce over chunks) and PDF pass are
+        # independent, so run them side by side.
+        json_summary, pdf_summary = await asyncio.gather(
+            self._summarize_json(document_id, json_path, entity_index),
+            self._pdf_pass(document_id, pdf_path),
+        )
 
-        # 4) Fusion pass: combine JSON + PDF into final structured object
-        fused = self._fuse_summaries(
+        # 3) Fusion pass: combine JSON + PDF into final structured object
+        fused = await self._fuse_summaries(
             document_id=document_id,
             json_summary=json_summary,
             pdf_summary=pdf_summary,
@@ -194,6 +232,37 @@ class OpenAISummaryProvider(SummaryProvider):
     # Internal helpers
     # ------------------------------------------------------------------
 
+    async def _create_response(self, content: List[Dict[str, Any]]) -> str:
+        """
+        One Responses API call with a single user message, bounded by the
+        shared summary semaphore. Rate limits and transient server or
+        connection errors are retried with exponential backoff and jitter.
+        """
+        retries = max(0, settings.summary_max_retries)
+        delay = 1.0
+        for attempt in range(retries + 1):
+            try:
+                async with _get_summary_semaphore():
+                    response = await self.client.responses.create(
+                        model=self.model_name,
+                        input=[{"role": "user", "content": content}],
+                    )
+                return self._extract_text_from_response(response)
+            except (RateLimitError, APIConnectionError, InternalServerError) as exc:
+                if attempt == retries:
+                    raise
+                sleep_for = delay + random.uniform(0, delay)
+                logger.warning(
+                    "Summary request failed (%s); retry %d/%d in %.1fs",
+                    type(exc).__name__,
+                    attempt + 1,
+                    retries,
+                    sleep_for,
+                )
+                await asyncio.sleep(sleep_for)
+                delay = min(delay * 2, 30.0)
+        raise AssertionError("unreachable")
+
     def _extract_text_from_response(self, response: Any) -> str:
         """
         Robustly extract text from Responses API output for SDK 2.9.0.
@@ -233,9 +302,17 @@ class OpenAISummaryProvider(SummaryProvider):
         # Ultimate fallback
         return str(response)
 
-    def _upload_pdf(self, document_id: str, pdf_path: Optional[Path]) -> Optional[str]:
+    async def _upload_pdf(
+        self,
+        document_id: str,
+        pdf_path: Optional[Path],
+        *,
+        reuse_cached: bool = True,
+    ) -> Optional[Tuple[str, str, bool]]:
         """
-        Upload the PDF (if present) as user_data and return file_id.
+        Return (pdf_sha256, file_id, from_cache) for the PDF, uploading it
+        as user_data only when the PDF upload cache has no valid file_id.
+        None if there is no PDF or the upload failed.
         """
         if not pdf_path or not pdf_path.is_file():
             logger.info(
@@ -245,12 +322,25 @@ class OpenAISummaryProvider(SummaryProvider):
             return None
 
         try:
-            with pdf_path.open("rb") as f:
-                uploaded = self.client.files.create(
-                    file=f,
-                    # We want general file usage, not 'vision'
-                    purpose="user_data",
-                )
+            pdf_bytes = await asyncio.to_thread(pdf_path.read_bytes)
+            sha256 = pdf_sha256(pdf_bytes)
+
+            if reuse_cached:
+                cached = await asyncio.to_thread(get_cached_file_id, sha256, "openai")
+                if cached:
+                    logger.info(
+                        "Reusing uploaded PDF for document_id=%s, file_id=%s",
+                        document_id,
+                        cached,
+                    )
+                    return sha256, cached, True
+
+            # No backoff loop here; keep the SDK default retries.
+            uploaded = await self.client.with_options(max_retries=2).files.create(
+                file=(pdf_path.name, pdf_bytes, "application/pdf"),
+                # We want general file usage, not 'vision'
+                purpose="user_data",
+            )
             pdf_file_id = uploaded.id
             logger.info(
                 "Uploaded PDF for document_id=%s, file_id=%s, path=%s",
@@ -258,7 +348,10 @@ class OpenAISummaryProvider(SummaryProvider):
                 pdf_file_id,
                 pdf_path,
             )
-            return pdf_file_id
+            await asyncio.to_thread(
+                remember_file_id, sha256, "openai", pdf_file_id, len(pdf_bytes)
+            )
+            return sha256, pdf_file_id, False
         except Exception:
             logger.exception(
                 "Failed to upload PDF for document_id=%s; continuing without PDF.",
@@ -268,7 +361,11 @@ class OpenAISummaryProvider(SummaryProvider):
 
     # ------------------------- JSON PASS -------------------------
 
-    def _build_llm_json_view(self, json_dict: Dict[str, Any]) -> Dict[str, Any]:
+    def _build_llm_json_view(
+        self,
+        json_path: Path,
+        entity_index: Optional[EntityIndex] = None,
+    ) -> Dict[str, Any]:
         """
         Build a *semantic* JSON view for the LLM, much smaller than the full
         DWG→JSON, but preserving all the information we care about for
@@ -281,98 +378,103 @@ class OpenAISummaryProvider(SummaryProvider):
           - all notes/text (text, layer, inferred note_type)
 
         The full raw JSON is still kept on disk / in the DB; this is only what
-        we send to the model for summarization.
+        we send to the model for summarization. Entities are classified by
+        build_entity_index() unless the caller (ETL) already did it.
         """
-        entities = json_dict.get("entities", []) or []
-
-        entity_type_counts: Dict[str, int] = {}
-        layer_counts: Dict[str, int] = {}
-
-        dimensions: List[Dict[str, Any]] = []
-        notes: List[Dict[str, Any]] = []
-
-        for ent in entities:
-            etype = (ent.get("type") or "").strip()
-            etype_lower = etype.lower()
-            layer = ent.get("layer")
-
-            # entity type stats
-            if etype:
-                entity_type_counts[etype] = entity_type_counts.get(etype, 0) + 1
-
-            # layer stats
-            if layer:
-                layer_counts[layer] = layer_counts.get(layer, 0) + 1
-
-            # dimensions
-            if "dim" in etype_lower:
-                dimensions.append(
-                    {
-                        "index": ent.get("index"),
-                        "type": etype,
-                        "layer": layer,
-                        "handle": ent.get("handle"),
-                        "owner_handle": ent.get("owner_handle"),
-                        "dim_text": ent.get("text"),
-                        "dim_value": ent.get("value"),
-                        "units": ent.get("units"),
-                        # optional: keep light geometry; omit if too big
-                        "geometry": ent.get("geometry"),
-                    }
-                )
-                continue
+        meta = read_dwg_json_header(json_path)
+        if entity_index is None:
+            entity_index = build_entity_index(json_path)
+
+        dimensions: List[Dict[str, Any]] = [
+            {
+                "index": d.index,
+                "type": (d.type or "").strip(),
+                "layer": d.layer,
+                "handle": d.handle,
+                "owner_handle": d.owner_handle,
+                "dim_text": d.text,
+                "dim_value": d.value,
+                "units": d.units,
+                # optional: keep light geometry; omit if too big
+                "geometry": d.geometry,
+            }
+            for d in entity_index.dimensions
+        ]
 
-            # notes / text (TEXT, MTEXT, etc.)
-            if "text" in etype_lower:
-                raw_text = ent.get("text") or ""
-                note_type = self._infer_note_type_from_text(raw_text)
-                notes.append(
-                    {
-                        "index": ent.get("index"),
-                        "type": etype,
-                        "layer": layer,
-                        "handle": ent.get("handle"),
-                        "note_type": note_type,
-                        "text": raw_text,
-                        # light geometry is optional
-                        "geometry": ent.get("geometry"),
-                    }
-                )
-                continue
+        # notes / text (TEXT, MTEXT, etc.)
+        notes: List[Dict[str, Any]] = [
+            {
+                "index": n.index,
+                "type": (n.type or "").strip(),
+                "layer": n.layer,
+                "handle": n.handle,
+                "note_type": n.note_type,
+                "text": n.text,
+                # light geometry is optional
+                "geometry": n.geometry,
+            }
+            for n in entity_index.notes
+        ]
 
         layers_list = [
             {"name": name, "entity_count": count}
-            for name, count in sorted(layer_counts.items(), key=lambda kv: kv[0])
+            for name, count in sorted(entity_index.layer_counts.items(), key=lambda kv: kv[0])
         ]
 
         llm_view = {
             "metadata": {
-                "schema_version": json_dict.get("schema_version"),
-                "dwg_header": json_dict.get("header"),
-                "num_entities": len(entities),
+                "schema_version": meta.get("schema_version"),
+                "dwg_header": meta.get("header"),
+                "num_entities": entity_index.num_entities,
             },
-            "entity_type_counts": entity_type_counts,
+            "entity_type_counts": entity_index.type_counts,
             "layers": layers_list,
             "dimensions": dimensions,
             "notes": notes,
         }
         return llm_view
 
-    def _infer_note_type_from_text(self, raw_text: str) -> str:
+    def _compact_llm_json_view(
+        self,
+        json_path: Path,
+        entity_index: Optional[EntityIndex] = None,
+    ) -> str:
         """
-        Lightweight inference of note type from raw text, similar to ETL infer.
+        Compact serialization of _build_llm_json_view(), byte-for-byte the
+        same as one json.dumps() call. The dimension and note lists are
+        encoded in slices because a single C-level dumps() of the whole view
+        holds the GIL until it finishes, which would stall the event loop
+        even from a worker thread.
         """
-        t = (raw_text or "").lower()
-        if any(tok in t for tok in ["±", "tolerance", "tol"]):
-            return "tolerance"
-        if any(tok in t for tok in ["⌀", "gd&t", "true position", "flatness"]):
-            return "gdandt"
-        return "general"
+        view = self._build_llm_json_view(json_path, entity_index)
+        dimensions = view.pop("dimensions")
+        notes = view.pop("notes")
 
+        def dumps(obj: Any) -> str:
+            return json.dumps(obj, separators=(",", ":"))
 
-        # ------------------------- JSON PASS -------------------------
+        def dumps_items(items: List[Dict[str, Any]], step: int = 1000) -> str:
+            return ",".join(
+                dumps(items[k : k + step])[1:-1] for k in range(0, len(items), step)
+            )
 
-    def _summarize_json(self, document_id: str, json_dict: Dict[str, Any]) -> str:
+        return "".join(
+            [
+                dumps(view)[:-1],
+                ',"dimensions":[',
+                dumps_items(dimensions),
+                '],"notes":[',
+                dumps_items(notes),
+                "]}",
+            ]
+        )
+
+    async def _summarize_json(
+        self,
+        document_id: str,
+        json_path: Path,
+        entity_index: Optional[EntityIndex] = None,
+    ) -> str:
         """
         Summarize the DWG→JSON structure using a *semantic* projection:
 
@@ -387,15 +489,17 @@ class OpenAISummaryProvider(SummaryProvider):
 
           3) If it fits under MAX_CHARS, summarize in a single call.
 
-          4) Otherwise, chunk by characters and do a small number of calls,
-             then combine chunk summaries.
+          4) Otherwise, chunk by characters, summarize the chunks
+             concurrently, then combine chunk summaries.
 
         The full raw JSON is *not* truncated; it is still stored on disk/DB.
         Only the derived, semantic view is fed to the model.
         """
-        llm_view = self._build_llm_json_view(json_dict)
-
-        compact_json = json.dumps(llm_view, separators=(",", ":"))
+        # Walking every entity and serializing the view is CPU-bound on large
+        # drawings; keep it off the event loop.
+        compact_json = await asyncio.to_thread(
+            self._compact_llm_json_view, json_path, entity_index
+        )
 
         MAX_CHARS = 60000  # ~15k tokens; safe headroom for prompt + output
 
@@ -406,42 +510,35 @@ class OpenAISummaryProvider(SummaryProvider):
                 len(compact_json),
             )
             # Single-call summary
-            response = self.client.responses.create(
-                model=self.model_name,
-                input=[
+            return await self._create_response(
+                [
+                    {
+                        "type": "input_text",
+                        "text": (
+                            "You are CadSentinel. You are given a semantic JSON "
+                            "view of a mechanical drawing derived from DWG.\n\n"
+                            "The JSON includes:\n"
+                            "- metadata and DWG header (if available)\n"
+                            "- entity type counts\n"
+                            "- layers and how many entities they contain\n"
+                            "- a list of dimensions (text, value, units, layer)\n"
+                            "- a list of notes/text with inferred types.\n\n"
+                            "From this, produce a concise but thorough technical "
+                            "summary of the drawing:\n"
+                            "- part identity (name/number if present)\n"
+                            "- main geometric features (holes, slots, bosses, etc.)\n"
+                            "- critical dimensions and tolerances\n"
+                            "- GD&T callouts and datums\n"
+                            "- important notes, inspection/manufacturing hints.\n\n"
+                            "Return a technical narrative in text form."
+                        ),
+                    },
                     {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "input_text",
-                                "text": (
-                                    "You are CadSentinel. You are given a semantic JSON "
-                                    "view of a mechanical drawing derived from DWG.\n\n"
-                                    "The JSON includes:\n"
-                                    "- metadata and DWG header (if available)\n"
-                                    "- entity type counts\n"
-                                    "- layers and how many entities they contain\n"
-                                    "- a list of dimensions (text, value, units, layer)\n"
-                                    "- a list of notes/text with inferred types.\n\n"
-                                    "From this, produce a concise but thorough technical "
-                                    "summary of the drawing:\n"
-                                    "- part identity (name/number if present)\n"
-                                    "- main geometric features (holes, slots, bosses, etc.)\n"
-                                    "- critical dimensions and tolerances\n"
-                                    "- GD&T callouts and datums\n"
-                                    "- important notes, inspection/manufacturing hints.\n\n"
-                                    "Return a technical narrative in text form."
-                                ),
-                            },
-                            {
-                                "type": "input_text",
-                                "text": compact_json,
-                            },
-                        ],
-                    }
-                ],
+                        "type": "input_text",
+                        "text": compact_json,
+                    },
+                ]
             )
-            return self._extract_text_from_response(response)
 
         # If we get here, even the semantic view is large; chunk it.
         CHUNK_SIZE = MAX_CHARS
@@ -458,54 +555,51 @@ class OpenAISummaryProvider(SummaryProvider):
             len(compact_json),
         )
 
-        chunk_summaries: List[str] = []
-        for idx, chunk in enumerate(chunks, start=1):
-            chunk_summary = self._summarize_json_chunk(
-                document_id=document_id,
-                chunk_idx=idx,
-                total_chunks=len(chunks),
-                chunk_text=chunk,
+        # Map: all chunks in flight at once (bounded by the semaphore);
+        # gather() keeps the results in chunk order.
+        chunk_summaries: List[str] = await asyncio.gather(
+            *(
+                self._summarize_json_chunk(
+                    document_id=document_id,
+                    chunk_idx=idx,
+                    total_chunks=len(chunks),
+                    chunk_text=chunk,
+                )
+                for idx, chunk in enumerate(chunks, start=1)
             )
-            chunk_summaries.append(chunk_summary)
+        )
 
         combined_input = "\n\n--- CHUNK SUMMARY SEPARATOR ---\n\n".join(
             chunk_summaries
         )
 
-        response = self.client.responses.create(
-            model=self.model_name,
-            input=[
+        # Reduce
+        return await self._create_response(
+            [
                 {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "input_text",
-                            "text": (
-                                "You are CadSentinel. You are given multiple partial "
-                                "summaries of a semantic JSON view of a mechanical drawing.\n\n"
-                                "Each partial summary corresponds to a chunk of the JSON.\n"
-                                "Merge them into a single coherent JSON-centric summary. "
-                                "Focus on:\n"
-                                "- part identity\n"
-                                "- key features\n"
-                                "- critical dimensions and tolerances\n"
-                                "- GD&T\n"
-                                "- important notes.\n\n"
-                                "Return a technical narrative in text form."
-                            ),
-                        },
-                        {
-                            "type": "input_text",
-                            "text": combined_input,
-                        },
-                    ],
-                }
-            ],
+                    "type": "input_text",
+                    "text": (
+                        "You are CadSentinel. You are given multiple partial "
+                        "summaries of a semantic JSON view of a mechanical drawing.\n\n"
+                        "Each partial summary corresponds to a chunk of the JSON.\n"
+                        "Merge them into a single coherent JSON-centric summary. "
+                        "Focus on:\n"
+                        "- part identity\n"
+                        "- key features\n"
+                        "- critical dimensions and tolerances\n"
+                        "- GD&T\n"
+                        "- important notes.\n\n"
+                        "Return a technical narrative in text form."
+                    ),
+                },
+                {
+                    "type": "input_text",
+                    "text": combined_input,
+                },
+            ]
         )
 
-        return self._extract_text_from_response(response)
-
-    def _summarize_json_chunk(
+    async def _summarize_json_chunk(
         self,
         *,
         document_id: str,
@@ -524,42 +618,67 @@ class OpenAISummaryProvider(SummaryProvider):
             document_id,
         )
 
-        response = self.client.responses.create(
-            model=self.model_name,
-            input=[
+        return await self._create_response(
+            [
                 {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "input_text",
-                            "text": (
-                                f"You are CadSentinel. This is semantic JSON chunk "
-                                f"{chunk_idx} of {total_chunks} for a mechanical drawing.\n\n"
-                                "The JSON contains metadata, entity type counts, layers, "
-                                "dimensions, and notes.\n\n"
-                                "From this chunk only, extract and describe:\n"
-                                "- relevant dimensions and what they apply to\n"
-                                "- any tolerances or GD&T implied by notes\n"
-                                "- anything notable about layers or feature types.\n\n"
-                                "Return a concise technical summary in text form."
-                            ),
-                        },
-                        {
-                            "type": "input_text",
-                            "text": chunk_text,
-                        },
-                    ],
-                }
-            ],
+                    "type": "input_text",
+                    "text": (
+                        f"You are CadSentinel. This is semantic JSON chunk "
+                        f"{chunk_idx} of {total_chunks} for a mechanical drawing.\n\n"
+                        "The JSON contains metadata, entity type counts, layers, "
+                        "dimensions, and notes.\n\n"
+                        "From this chunk only, extract and describe:\n"
+                        "- relevant dimensions and what they apply to\n"
+                        "- any tolerances or GD&T implied by notes\n"
+                        "- anything notable about layers or feature types.\n\n"
+                        "Return a concise technical summary in text form."
+                    ),
+                },
+                {
+                    "type": "input_text",
+                    "text": chunk_text,
+                },
+            ]
         )
 
-        return self._extract_text_from_response(response)
-
 
 
     # ------------------------- PDF PASS -------------------------
 
-    def _summarize_pdf(self, document_id: str, pdf_file_id: str) -> str:
+    async def _pdf_pass(self, document_id: str, pdf_path: Optional[Path]) -> str:
+        """
+        Upload the PDF (if present) and summarize it; "" when there is no PDF.
+
+        A cached file_id the provider no longer knows is dropped from the
+        cache and the PDF is uploaded again once.
+        """
+        upload = await self._upload_pdf(document_id, pdf_path)
+        if upload is None:
+            logger.info(
+                "No PDF available for document_id=%s; skipping PDF summarization.",
+                document_id,
+            )
+            return ""
+
+        sha256, pdf_file_id, from_cache = upload
+        try:
+            return await self._summarize_pdf(document_id, pdf_file_id)
+        except (NotFoundError, BadRequestError):
+            if not from_cache:
+                raise
+            logger.warning(
+                "Cached PDF file_id=%s rejected for document_id=%s; uploading again.",
+                pdf_file_id,
+                document_id,
+            )
+            await asyncio.to_thread(forget_file_id, sha256, "openai", pdf_file_id)
+
+        upload = await self._upload_pdf(document_id, pdf_path, reuse_cached=False)
+        if upload is None:
+            return ""
+        return await self._summarize_pdf(document_id, upload[1])
+
+    async def _summarize_pdf(self, document_id: str, pdf_file_id: str) -> str:
         """
         Summarize the PDF rendering of the drawing:
           - views, layout, orientation
@@ -572,39 +691,31 @@ class OpenAISummaryProvider(SummaryProvider):
             pdf_file_id,
         )
 
-        response = self.client.responses.create(
-            model=self.model_name,
-            input=[
+        return await self._create_response(
+            [
                 {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "input_text",
-                            "text": (
-                                "You are CadSentinel, analyzing a mechanical drawing PDF.\n"
-                                "Describe the drawing from a visual/layout perspective:\n"
-                                "- primary views (front, top, side, section views, details)\n"
-                                "- arrangement and spacing of views\n"
-                                "- locations of key dimensions and notes\n"
-                                "- presence and placement of GD&T feature control frames\n"
-                                "- title block information if legible.\n\n"
-                                "Return a technical narrative in text form."
-                            ),
-                        },
-                        {
-                            "type": "input_file",
-                            "file_id": pdf_file_id,
-                        },
-                    ],
-                }
-            ],
+                    "type": "input_text",
+                    "text": (
+                        "You are CadSentinel, analyzing a mechanical drawing PDF.\n"
+                        "Describe the drawing from a visual/layout perspective:\n"
+                        "- primary views (front, top, side, section views, details)\n"
+                        "- arrangement and spacing of views\n"
+                        "- locations of key dimensions and notes\n"
+                        "- presence and placement of GD&T feature control frames\n"
+                        "- title block information if legible.\n\n"
+                        "Return a technical narrative in text form."
+                    ),
+                },
+                {
+                    "type": "input_file",
+                    "file_id": pdf_file_id,
+                },
+            ]
         )
 
-        return self._extract_text_from_response(response)
-
     # ------------------------- FUSION PASS -------------------------
 
-    def _fuse_summaries(
+    async def _fuse_summaries(
         self,
         *,
         document_id: str,
@@ -652,21 +763,13 @@ class OpenAISummaryProvider(SummaryProvider):
             f"{pdf_summary}"
         )
 
-        response = self.client.responses.create(
-            model=self.model_name,
-            input=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "input_text", "text": fusion_prompt},
-                        {"type": "input_text", "text": combined_input},
-                    ],
-                }
-            ],
+        text = await self._create_response(
+            [
+                {"type": "input_text", "text": fusion_prompt},
+                {"type": "input_text", "text": combined_input},
+            ]
         )
 
-        text = self._extract_text_from_response(response)
-
         try:
             parsed = json.loads(text)
             return parsed
@@ -780,12 +883,13 @@ class OllamaSummaryProvider(SummaryProvider):
     def __init__(self, model_name: str = "my-local-llm"):
         self.model_name = model_name
 
-    def generate_summary(
+    async def generate_summary(
         self,
         *,
         document_id: str,
         pdf_path: Optional[Path],
-        json_dict: Dict[str, Any],
+        json_path: Path,
+        entity_index: Optional[EntityIndex] = None,
     ) -> Dict[str, Any]:
         raise NotImplementedError(
             "Ollama summary provider not implemented yet. "
@@ -0,0 +1,293 @@
+# app/services/ann_search.py
+
+from __future__ import annotations
+
+import logging
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, literal, select, text
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db.models import Embedding
+from app.services.drawing_versions import hidden_version_ids
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+HNSW_DEFAULT_EF_SEARCH = 40
+HNSW_MAX_EF_SEARCH = 1000
+
+
+def apply_ann_search_params(
+    db: Session,
+    *,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> None:
+    """
+    Set pgvector's per-query recall/latency knobs for the current transaction
+    (equivalent to SET LOCAL; set_config() is used because SET cannot take
+    bind parameters).
+
+    - hnsw.ef_search: candidate list size for HNSW scans (server default 40)
+    - ivfflat.probes: lists visited by ivfflat scans (server default 1)
+
+    Request values override HNSW_EF_SEARCH / IVFFLAT_PROBES; None for both
+    leaves the server defaults untouched. Only the knob for the index that
+    actually exists matters, so both are set.
+
+    An HNSW scan returns at most ef_search rows, so when the query's LIMIT
+    is passed in, ef_search is raised to at least that.
+    """
+    ef_search = ef_search if ef_search is not None else settings.hnsw_ef_search
+    probes = probes if probes is not None else settings.ivfflat_probes
+
+    if limit is not None and limit > (ef_search or HNSW_DEFAULT_EF_SEARCH):
+        ef_search = min(limit, HNSW_MAX_EF_SEARCH)
+
+    if ef_search is not None:
+        db.execute(
+            text("SELECT set_config('hnsw.ef_search', :v, true)"),
+            {"v": str(int(ef_search))},
+        )
+    if probes is not None:
+        db.execute(
+            text("SELECT set_config('ivfflat.probes', :v, true)"),
+            {"v": str(int(probes))},
+        )
+
+
+# ---------------------------------------------------------
+# Filtered nearest-neighbour planner
+# ---------------------------------------------------------
+
+def _filter_clauses(
+    cols: Any,
+    drawing_version_id: Optional[int],
+    source_types: Optional[Sequence[str]],
+    hidden_version_ids: Sequence[int] = (),
+) -> List[Any]:
+    clauses = []
+    if drawing_version_id is not None:
+        clauses.append(cols.drawing_version_id == drawing_version_id)
+    if source_types:
+        clauses.append(cols.source_type.in_(list(source_types)))
+    if hidden_version_ids:
+        # staging / retired versions awaiting purge
+        clauses.append(cols.drawing_version_id.not_in(list(hidden_version_ids)))
+    return clauses
+
+
+def _bounded_count(db: Session, clauses: List[Any], cap: int) -> int:
+    """
+    count(*) of the filtered subset, stopping at cap. Served by
+    idx_embeddings_version_source for version / source_type filters.
+    """
+    inner = select(literal(1)).select_from(Embedding).where(*clauses).limit(cap).subquery()
+    return int(db.execute(select(func.count()).select_from(inner)).scalar_one())
+
+
+def _exact_scan(
+    db: Session,
+    query_vec: Sequence[float],
+    clauses: List[Any],
+    k: int,
+) -> List[Tuple[int, float]]:
+    # MATERIALIZED keeps the planner from rewriting this into an ANN index
+    # scan: the small subset is fetched by the btree and ranked exactly.
+    subset = (
+        select(Embedding.id, Embedding.embedding)
+        .where(*clauses)
+        .cte("subset")
+        .prefix_with("MATERIALIZED")
+    )
+    distance = subset.c.embedding.cosine_distance(query_vec)
+    stmt = (
+        select(subset.c.id, distance.label("distance"))
+        .order_by(distance.asc())
+        .limit(k)
+    )
+    return [(row.id, float(row.distance)) for row in db.execute(stmt)]
+
+
+def _ann_overfetch(
+    db: Session,
+    query_vec: Sequence[float],
+    drawing_version_id: Optional[int],
+    source_types: Optional[Sequence[str]],
+    hidden: Sequence[int],
+    k: int,
+    ef_search: Optional[int],
+    probes: Optional[int],
+) -> Tuple[List[Tuple[int, float]], bool]:
+    """
+    Global ANN scan, filtered afterwards, doubling the fetch size until k
+    rows survive the filter. Returns (rows, filled); filled is False if even
+    the largest allowed fetch left fewer than k rows.
+    """
+    distance = Embedding.embedding.cosine_distance(query_vec)
+    factor = max(1, settings.ann_overfetch_factor)
+    max_fetch = max(k, settings.ann_max_fetch)
+    fetch = min(max(k * factor, k), max_fetch)
+
+    while True:
+        apply_ann_search_params(db, ef_search=ef_search, probes=probes, limit=fetch)
+        candidates = (
+            select(
+                Embedding.id,
+                Embedding.drawing_version_id,
+                Embedding.source_type,
+                distance.label("distance"),
+            )
+            .order_by(distance.asc())
+            .limit(fetch)
+            .subquery()
+        )
+        stmt = (
+            select(candidates.c.id, candidates.c.distance)
+            .where(*_filter_clauses(candidates.c, drawing_version_id, source_types, hidden))
+            .order_by(candidates.c.distance.asc())
+            .limit(k)
+        )
+        rows = [(row.id, float(row.distance)) for row in db.execute(stmt)]
+        if len(rows) >= k or fetch >= max_fetch:
+            return rows, len(rows) >= k
+        fetch = min(fetch * 2, max_fetch)
+
+
+def fits_exact_scan(
+    db: Session,
+    *,
+    drawing_version_id: Optional[int] = None,
+    source_types: Optional[Sequence[str]] = None,
+    hidden_ids: Optional[Sequence[int]] = None,
+) -> bool:
+    """
+    True if the filtered subset is small enough (< ANN_EXACT_SCAN_MAX_ROWS)
+    to rank exactly; callers with their own exact query (e.g. chat's
+    windowed multi-type retrieval) use this to choose their path.
+
+    Hidden (non-ready) versions are left out of the count, as they are from
+    every search. Pass hidden_ids when the caller already has them (or ()
+    when its filter already guarantees a ready version) to skip the lookup.
+    """
+    if drawing_version_id is None and not source_types:
+        return False
+    if hidden_ids is None:
+        hidden_ids = hidden_version_ids(db)
+    clauses = _filter_clauses(Embedding, drawing_version_id, source_types, hidden_ids)
+    cap = max(1, settings.ann_exact_scan_max_rows)
+    return _bounded_count(db, clauses, cap) < cap
+
+
+def nearest_embedding_ids(
+    db: Session,
+    query_vec: Sequence[float],
+    *,
+    k: int,
+    drawing_version_id: Optional[int] = None,
+    source_types: Optional[Sequence[str]] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+) -> List[Tuple[int, float]]:
+    """
+    Top-k (embedding_id, cosine_distance) pairs, nearest first, honouring
+    the version / source_type filters. Versions that are not "ready"
+    (staging or retired, see app.services.drawing_versions) are excluded.
+
+    Strategy, based on the size of the filtered subset:
+      - no filters           → plain ANN index scan; if any versions are
+        hidden, over-fetched and filtered afterwards (never an exact scan)
+      - subset ≤ ANN_EXACT_SCAN_MAX_ROWS → exact scan of the subset via
+        idx_embeddings_version_source (always correct, cheap when small)
+      - larger subsets       → global ANN with iterative over-fetch, then
+        exact scan if the filter is too selective for the ANN candidates
+
+    Only the caller's filters pick the strategy. Hidden versions exist
+    during every ingest and until the purge catches up, and are few, so
+    they are dropped from the candidates rather than treated as a filter.
+    """
+    if k <= 0:
+        return []
+
+    hidden = hidden_version_ids(db)
+
+    if drawing_version_id is None and not source_types:
+        if not hidden:
+            apply_ann_search_params(db, ef_search=ef_search, probes=probes, limit=k)
+            distance = Embedding.embedding.cosine_distance(query_vec)
+            stmt = select(Embedding.id, distance.label("distance")).order_by(distance.asc()).limit(k)
+            return [(row.id, float(row.distance)) for row in db.execute(stmt)]
+
+        rows, filled = _ann_overfetch(
+            db, query_vec, None, None, hidden, k, ef_search, probes
+        )
+        if not filled:
+            logger.info(
+                "ANN over-fetch returned %d of k=%d rows after dropping %d hidden version(s)",
+                len(rows),
+                k,
+                len(hidden),
+            )
+        return rows
+
+    cap = max(1, settings.ann_exact_scan_max_rows)
+    estimated = _bounded_count(
+        db, _filter_clauses(Embedding, drawing_version_id, source_types), cap
+    )
+    clauses = _filter_clauses(Embedding, drawing_version_id, source_types, hidden)
+    if estimated < cap:
+        logger.debug("ANN planner: exact scan over %d rows", estimated)
+        return _exact_scan(db, query_vec, clauses, k)
+
+    logger.debug("ANN planner: subset ≥ %d rows, using over-fetched ANN", cap)
+    rows, filled = _ann_overfetch(
+        db, query_vec, drawing_version_id, source_types, hidden, k, ef_search, probes
+    )
+    if not filled:
+        logger.info(
+            "ANN over-fetch could not fill k=%d for filters version=%s types=%s; "
+            "falling back to exact scan",
+            k,
+            drawing_version_id,
+            source_types,
+        )
+        rows = _exact_scan(db, query_vec, clauses, k)
+    return rows
+
+
+def nearest_embeddings(
+    db: Session,
+    query_vec: Sequence[float],
+    *,
+    k: int,
+    drawing_version_id: Optional[int] = None,
+    source_types: Optional[Sequence[str]] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+) -> List[Tuple[Embedding, float]]:
+    """
+    Like nearest_embedding_ids(), but returns (Embedding, cosine_similarity)
+    pairs in rank order.
+    """
+    ranked = nearest_embedding_ids(
+        db,
+        query_vec,
+        k=k,
+        drawing_version_id=drawing_version_id,
+        source_types=source_types,
+        ef_search=ef_search,
+        probes=probes,
+    )
+    if not ranked:
+        return []
+    by_id = {
+        e.id: e
+        for e in db.execute(
+            select(Embedding).where(Embedding.id.in_([emb_id for emb_id, _ in ranked]))
+        ).scalars()
+    }
+    return [(by_id[emb_id], 1.0 - dist) for emb_id, dist in ranked if emb_id in by_id]
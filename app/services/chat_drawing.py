@@ -1,11 +1,13 @@
 # app/services/chat_drawing.py
-from typing import List, Tuple
+import json
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 import httpx
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, case, func
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from openai import AsyncOpenAI, APIError, RateLimitError, APIConnectionError, BadRequestError
+from openai import APIError, RateLimitError, APIConnectionError, BadRequestError
 
 from app.config import get_settings
 from app.services.security_mode import get_effective_providers
@@ -22,7 +24,10 @@ from app.api.schemas import (
     ChatDrawingResponse,
     RetrievedContextItem,
 )
-from app.services.embeddings import embed_texts
+from app.services.ann_search import fits_exact_scan, nearest_embeddings
+from app.services.drawing_versions import VERSION_READY
+from app.services.embeddings import embed_query
+from app.services.http_clients import get_ollama_client, get_openai_client
 
 import logging
 
@@ -30,7 +35,6 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-_openai_chat_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 
 # ---------------------------------------------------------
 # Helpers
@@ -50,23 +54,179 @@ async def _top_embeddings_for_type(
     if limit <= 0:
         return []
 
-    sim_expr = 1.0 - Embedding.embedding.cosine_distance(query_vec)
+    # Per-version subsets are usually small → exact scan; the planner
+    # switches to over-fetched ANN for very large drawings.
+    return nearest_embeddings(
+        db,
+        query_vec,
+        k=limit,
+        drawing_version_id=drawing_version_id,
+        source_types=[source_type],
+    )
 
-    stmt = (
-        select(Embedding, sim_expr.label("similarity"))
+
+def _geometry_index(
+    source_type: str,
+    d: Optional[Dimension],
+    n: Optional[Note],
+) -> Optional[dict]:
+    if source_type == "dimension" and d is not None:
+        return {
+            "kind": "dimension",
+            "dimension_id": d.id,
+            "json_index": d.json_index,
+            "layer": d.layer,
+            "handle": d.handle,
+            "owner_handle": d.owner_handle,
+            "geometry": d.geometry,
+            "dim_text": d.dim_text,
+            "dim_value": d.dim_value,
+            "units": d.units,
+        }
+    if source_type == "note" and n is not None:
+        return {
+            "kind": "note",
+            "note_id": n.id,
+            "json_index": n.json_index,
+            "layer": n.layer,
+            "handle": n.handle,
+            "geometry": n.geometry,
+        }
+    return None
+
+
+def _retrieve_items_windowed(
+    db: Session,
+    drawing_version_id: int,
+    query_vec: list[float],
+    limits: Dict[str, int],
+) -> List[RetrievedContextItem]:
+    """
+    One round trip for all source types: rank the version's embeddings
+    exactly with ROW_NUMBER() OVER (PARTITION BY source_type ORDER BY
+    distance), keep the top limits[type] of each partition, and LEFT JOIN
+    dimension / note geometry and the version thumbnail onto the winners.
+    """
+    subset = (
+        select(
+            Embedding.id,
+            Embedding.drawing_version_id,
+            Embedding.source_type,
+            Embedding.source_ref_id,
+            Embedding.content,
+            Embedding.embedding,
+        )
         .where(
+            Embedding.drawing_version_id == drawing_version_id,
+            Embedding.source_type.in_(list(limits)),
+        )
+        .cte("subset")
+        .prefix_with("MATERIALIZED")
+    )
+    distance = subset.c.embedding.cosine_distance(query_vec)
+    ranked = select(
+        subset.c.id,
+        subset.c.drawing_version_id,
+        subset.c.source_type,
+        subset.c.source_ref_id,
+        subset.c.content,
+        distance.label("distance"),
+        func.row_number()
+        .over(partition_by=subset.c.source_type, order_by=distance.asc())
+        .label("rn"),
+    ).cte("ranked")
+
+    per_type_limit = case(limits, value=ranked.c.source_type, else_=0)
+    thumbnail = (
+        select(DrawingFile.file_path)
+        .where(
+            DrawingFile.drawing_version_id == ranked.c.drawing_version_id,
+            DrawingFile.file_type == "png_thumb",
+        )
+        .limit(1)
+        .scalar_subquery()
+    )
+
+    stmt = (
+        select(ranked, Dimension, Note, thumbnail.label("thumbnail_url"))
+        .select_from(ranked)
+        .outerjoin(
+            Dimension,
             and_(
-                Embedding.embedding.is_not(None),
-                Embedding.drawing_version_id == drawing_version_id,
-                Embedding.source_type == source_type,
-            )
+                ranked.c.source_type == "dimension",
+                Dimension.id == ranked.c.source_ref_id,
+            ),
         )
-        .order_by(Embedding.embedding.cosine_distance(query_vec).asc())
-        .limit(limit)
+        .outerjoin(
+            Note,
+            and_(
+                ranked.c.source_type == "note",
+                Note.id == ranked.c.source_ref_id,
+            ),
+        )
+        .where(ranked.c.rn <= per_type_limit)
+        .order_by(ranked.c.source_type, ranked.c.rn)
     )
 
-    rows = db.execute(stmt).all()
-    return [(row[0], float(row[1])) for row in rows]
+    items: List[RetrievedContextItem] = []
+    for row in db.execute(stmt):
+        items.append(
+            RetrievedContextItem(
+                chunk_id=row.id,
+                source_type=row.source_type,
+                drawing_version_id=row.drawing_version_id,
+                source_ref_id=row.source_ref_id,
+                matched_text=row.content,
+                similarity_score=1.0 - float(row.distance),
+                geometry_index=_geometry_index(row.source_type, row.Dimension, row.Note),
+                thumbnail_url=row.thumbnail_url,
+            )
+        )
+    return items
+
+
+async def _retrieve_items_by_type(
+    db: Session,
+    drawing_version_id: int,
+    query_vec: list[float],
+    limits: Dict[str, int],
+) -> Dict[str, List[RetrievedContextItem]]:
+    """
+    Top-N retrieved context items per source_type for one drawing version.
+
+    Normal-sized versions use the single windowed query; very large ones
+    (beyond ANN_EXACT_SCAN_MAX_ROWS) fall back to per-type planner searches
+    followed by one batched enrichment pass.
+
+    drawing_version_id must already be resolved to a ready version (see
+    _resolve_drawing_version_id), so the size check skips the hidden-version
+    lookup: a bounded count plus the windowed query, two round trips.
+    """
+    limits = {t: n for t, n in limits.items() if n > 0}
+    by_type: Dict[str, List[RetrievedContextItem]] = {t: [] for t in limits}
+    if not limits:
+        return by_type
+
+    if fits_exact_scan(
+        db,
+        drawing_version_id=drawing_version_id,
+        source_types=list(limits),
+        hidden_ids=(),
+    ):
+        items = _retrieve_items_windowed(db, drawing_version_id, query_vec, limits)
+    else:
+        pairs: List[Tuple[Embedding, float]] = []
+        for source_type, limit in limits.items():
+            pairs.extend(
+                await _top_embeddings_for_type(
+                    db, drawing_version_id, query_vec, source_type, limit
+                )
+            )
+        items = _build_retrieved_items(db, pairs)
+
+    for item in items:
+        by_type[item.source_type].append(item)
+    return by_type
 
 
 def _build_retrieved_items(
@@ -111,32 +271,11 @@ def _build_retrieved_items(
     items: List[RetrievedContextItem] = []
 
     for emb, sim in pairs:
-        geometry_index = None
-
-        if emb.source_type == "dimension" and emb.source_ref_id in dim_by_id:
-            d = dim_by_id[emb.source_ref_id]
-            geometry_index = {
-                "kind": "dimension",
-                "dimension_id": d.id,
-                "json_index": d.json_index,
-                "layer": d.layer,
-                "handle": d.handle,
-                "owner_handle": d.owner_handle,
-                "geometry": d.geometry,
-                "dim_text": d.dim_text,
-                "dim_value": d.dim_value,
-                "units": d.units,
-            }
-        elif emb.source_type == "note" and emb.source_ref_id in note_by_id:
-            n = note_by_id[emb.source_ref_id]
-            geometry_index = {
-                "kind": "note",
-                "note_id": n.id,
-                "json_index": n.json_index,
-                "layer": n.layer,
-                "handle": n.handle,
-                "geometry": n.geometry,
-            }
+        geometry_index = _geometry_index(
+            emb.source_type,
+            dim_by_id.get(emb.source_ref_id),
+            note_by_id.get(emb.source_ref_id),
+        )
 
         items.append(
             RetrievedContextItem(
@@ -167,7 +306,8 @@ def _resolve_drawing_version_id(
     # Case 1: explicit drawing_version_id
     if req.drawing_version_id is not None:
         dv = db.get(DrawingVersion, req.drawing_version_id)
-        if not dv:
+        # Staging / retired versions are invisible, as they are to search.
+        if not dv or dv.state != VERSION_READY:
             raise ValueError(f"drawing_version_id={req.drawing_version_id} not found")
 
         document_id: str | None = None
@@ -183,7 +323,10 @@ def _resolve_drawing_version_id(
         stmt = (
             select(DrawingVersion)
             .join(Drawing, DrawingVersion.drawing_id == Drawing.id)
-            .where(Drawing.document_id_sha == req.document_id)
+            .where(
+                Drawing.document_id_sha == req.document_id,
+                DrawingVersion.state == VERSION_READY,
+            )
             .order_by(DrawingVersion.ingested_at.desc())
         )
         dv = db.execute(stmt).scalars().first()
@@ -268,7 +411,7 @@ async def _call_chat_model(system_prompt: str, user_content: str) -> str:
         ]
 
         try:
-            completion = await _openai_chat_client.chat.completions.create(
+            completion = await get_openai_client().with_options(max_retries=2).chat.completions.create(
                 model=settings.openai_chat_model,
                 messages=messages,
                 temperature=0.2,
@@ -290,34 +433,114 @@ async def _call_chat_model(system_prompt: str, user_content: str) -> str:
                 "OLLAMA_CHAT_MODEL is not configured."
             )
 
-        async with httpx.AsyncClient(base_url=str(settings.ollama_base_url)) as client:
-            payload = {
-                "model": settings.ollama_chat_model,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_content},
-                ],
-            }
-            try:
-                resp = await client.post("/api/chat", json=payload)
-                resp.raise_for_status()
-            except httpx.HTTPError as e:
-                logger.exception("Ollama chat HTTP error: %r", e)
-                raise HTTPException(
-                    status_code=502,
-                    detail=f"Ollama chat error: {type(e).__name__}",
-                )
+        client = get_ollama_client()
+        payload = {
+            "model": settings.ollama_chat_model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content},
+            ],
+        }
+        try:
+            resp = await client.post("/api/chat", json=payload)
+            resp.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.exception("Ollama chat HTTP error: %r", e)
+            raise HTTPException(
+                status_code=502,
+                detail=f"Ollama chat error: {type(e).__name__}",
+            )
 
-            data = resp.json()
-            # Example expected shape: {"message": {"role": "assistant", "content": "..."}}
-            msg = data.get("message", {})
-            content = msg.get("content")
-            if not content:
-                raise HTTPException(
-                    status_code=502,
-                    detail="Ollama chat error: empty or malformed response",
-                )
-            return content
+        data = resp.json()
+        # Example expected shape: {"message": {"role": "assistant", "content": "..."}}
+        msg = data.get("message", {})
+        content = msg.get("content")
+        if not content:
+            raise HTTPException(
+                status_code=502,
+                detail="Ollama chat error: empty or malformed response",
+            )
+        return content
+
+    else:
+        raise RuntimeError(f"Unsupported chat provider: {provider!r}")
+
+
+async def _stream_chat_model(system_prompt: str, user_content: str) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of _call_chat_model(): yields text deltas as the
+    provider produces them (OpenAI stream=True, Ollama NDJSON stream).
+    """
+    providers = get_effective_providers()
+    provider = providers["chat"].lower()
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content},
+    ]
+
+    if provider == "openai":
+        try:
+            stream = await get_openai_client().with_options(max_retries=2).chat.completions.create(
+                model=settings.openai_chat_model,
+                messages=messages,
+                temperature=0.2,
+                stream=True,
+            )
+        except (RateLimitError, APIConnectionError, APIError, BadRequestError) as e:
+            logger.exception("OpenAI chat error: %r", e)
+            raise HTTPException(
+                status_code=502,
+                detail=f"Upstream AI model error: {type(e).__name__}",
+            )
+
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        finally:
+            await stream.close()
+
+    elif provider == "ollama":
+        if not settings.ollama_base_url or not settings.ollama_chat_model:
+            raise RuntimeError(
+                "Ollama chat provider selected but OLLAMA_BASE_URL or "
+                "OLLAMA_CHAT_MODEL is not configured."
+            )
+
+        payload = {
+            "model": settings.ollama_chat_model,
+            "messages": messages,
+            "stream": True,
+        }
+        client = get_ollama_client()
+        try:
+            async with client.stream("POST", "/api/chat", json=payload) as resp:
+                resp.raise_for_status()
+                # One JSON object per line:
+                # {"message": {"content": "..."}, "done": false} ... {"done": true}
+                async for line in resp.aiter_lines():
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise HTTPException(
+                            status_code=502,
+                            detail=f"Ollama chat error: {data['error']}",
+                        )
+                    delta = (data.get("message") or {}).get("content")
+                    if delta:
+                        yield delta
+                    if data.get("done"):
+                        break
+        except httpx.HTTPError as e:
+            logger.exception("Ollama chat HTTP error: %r", e)
+            raise HTTPException(
+                status_code=502,
+                detail=f"Ollama chat error: {type(e).__name__}",
+            )
 
     else:
         raise RuntimeError(f"Unsupported chat provider: {provider!r}")
@@ -327,33 +550,53 @@ async def _call_chat_model(system_prompt: str, user_content: str) -> str:
 # Main entry: chat_with_drawing
 # ---------------------------------------------------------
 
-async def chat_with_drawing(
+@dataclass
+class PreparedChat:
+    """
+    Everything /chat/drawing needs before the LLM call. Built while the DB
+    session is still open so streaming never touches the session.
+    """
+    drawing_version_id: int
+    document_id: Optional[str]
+    contexts: List[RetrievedContextItem]
+    system_prompt: str
+    user_content: str
+    # Set when there is no context at all; returned instead of calling the LLM.
+    canned_reply: Optional[str] = None
+
+    @property
+    def open_in_documents_url(self) -> str:
+        return f"/documents/{self.drawing_version_id}"
+
+
+async def prepare_chat(
     db: Session,
     req: ChatDrawingRequest,
-) -> ChatDrawingResponse:
+) -> PreparedChat:
     """
-    Orchestrates retrieval + LLM call for /chat/drawing.
+    Resolve the drawing version, embed the question and retrieve context.
+    Raises ValueError for an unknown drawing_version_id / document_id.
     """
     # 1) Resolve drawing_version_id + document_id
     drawing_version_id, document_id = _resolve_drawing_version_id(db, req)
 
     # 2) Embed user_message
-    [query_vec] = await embed_texts([req.user_message])
+    query_vec = await embed_query(req.user_message)
 
-    # 3) Retrieve chunks by type
-    summary_pairs = await _top_embeddings_for_type(
-        db, drawing_version_id, query_vec, "summary", req.max_summary_chunks
-    )
-    note_pairs = await _top_embeddings_for_type(
-        db, drawing_version_id, query_vec, "note", req.max_note_chunks
-    )
-    dim_pairs = await _top_embeddings_for_type(
-        db, drawing_version_id, query_vec, "dimension", req.max_dimension_chunks
+    # 3) Retrieve chunks for all types in one pass
+    by_type = await _retrieve_items_by_type(
+        db,
+        drawing_version_id,
+        query_vec,
+        {
+            "summary": req.max_summary_chunks,
+            "note": req.max_note_chunks,
+            "dimension": req.max_dimension_chunks,
+        },
     )
-
-    summary_items = _build_retrieved_items(db, summary_pairs)
-    note_items = _build_retrieved_items(db, note_pairs)
-    dim_items = _build_retrieved_items(db, dim_pairs)
+    summary_items = by_type.get("summary", [])
+    note_items = by_type.get("note", [])
+    dim_items = by_type.get("dimension", [])
 
     logger.info(
         "chat_with_drawing: dv_id=%s | summaries=%d notes=%d dims=%d",
@@ -363,23 +606,25 @@ async def chat_with_drawing(
         len(dim_items),
     )
 
+    system_prompt = _build_system_prompt()
+
     # 3.5) If we have no context at all, don't bother calling the LLM
     if not (summary_items or note_items or dim_items):
-        return ChatDrawingResponse(
-            assistant_reply=(
+        return PreparedChat(
+            drawing_version_id=drawing_version_id,
+            document_id=document_id,
+            contexts=[],
+            system_prompt=system_prompt,
+            user_content="",
+            canned_reply=(
                 "I couldn’t find any summaries, notes, or dimensions associated with "
                 f"this drawing (drawing_version_id={drawing_version_id}). "
                 "It may not have been fully processed yet, or no extractable data was found."
             ),
-            drawing_version_id=drawing_version_id,
-            document_id=document_id,
-            contexts=[],
-            open_in_documents_url=f"/documents/{drawing_version_id}",
         )
 
     # 4) Build context text for the LLM
     context_text = _build_context_text(summary_items, note_items, dim_items)
-    system_prompt = _build_system_prompt()
 
     user_content = (
         f"User question:\n{req.user_message}\n\n"
@@ -387,21 +632,75 @@ async def chat_with_drawing(
         f"{context_text}"
     )
 
-    # 5) Provider-agnostic call (OpenAI or Ollama based on security mode)
-    assistant_reply = await _call_chat_model(system_prompt, user_content)
-    
-    # 6) Aggregate all context items into one list
-    all_items: List[RetrievedContextItem] = []
-    all_items.extend(summary_items)
-    all_items.extend(note_items)
-    all_items.extend(dim_items)
+    return PreparedChat(
+        drawing_version_id=drawing_version_id,
+        document_id=document_id,
+        contexts=[*summary_items, *note_items, *dim_items],
+        system_prompt=system_prompt,
+        user_content=user_content,
+    )
+
 
-    open_in_documents_url = f"/documents/{drawing_version_id}"
+async def chat_with_drawing(
+    db: Session,
+    req: ChatDrawingRequest,
+) -> ChatDrawingResponse:
+    """
+    Orchestrates retrieval + LLM call for /chat/drawing.
+    """
+    prepared = await prepare_chat(db, req)
+
+    if prepared.canned_reply is not None:
+        assistant_reply = prepared.canned_reply
+    else:
+        # 5) Provider-agnostic call (OpenAI or Ollama based on security mode)
+        assistant_reply = await _call_chat_model(
+            prepared.system_prompt, prepared.user_content
+        )
 
     return ChatDrawingResponse(
         assistant_reply=assistant_reply,
-        drawing_version_id=drawing_version_id,
-        document_id=document_id,
-        contexts=all_items,
-        open_in_documents_url=open_in_documents_url,
+        drawing_version_id=prepared.drawing_version_id,
+        document_id=prepared.document_id,
+        contexts=prepared.contexts,
+        open_in_documents_url=prepared.open_in_documents_url,
     )
+
+
+async def stream_chat_events(
+    prepared: PreparedChat,
+) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Yield (event, data) pairs for /chat/drawing/stream:
+
+      contexts  → retrieved chunks, sent before the model is called
+      token     → {"text": ...} for every streamed delta
+      done      → {"assistant_reply": <full text>}
+      error     → {"detail": ...} if the provider fails mid-stream
+    """
+    yield "contexts", {
+        "drawing_version_id": prepared.drawing_version_id,
+        "document_id": prepared.document_id,
+        "open_in_documents_url": prepared.open_in_documents_url,
+        "contexts": [c.model_dump(mode="json") for c in prepared.contexts],
+    }
+
+    if prepared.canned_reply is not None:
+        yield "token", {"text": prepared.canned_reply}
+        yield "done", {"assistant_reply": prepared.canned_reply}
+        return
+
+    parts: List[str] = []
+    try:
+        async for delta in _stream_chat_model(prepared.system_prompt, prepared.user_content):
+            parts.append(delta)
+            yield "token", {"text": delta}
+    except HTTPException as e:
+        yield "error", {"detail": e.detail}
+        return
+    except Exception as e:
+        logger.exception("Chat stream failed")
+        yield "error", {"detail": f"Chat stream error: {type(e).__name__}"}
+        return
+
+    yield "done", {"assistant_reply": "".join(parts)}
@@ -1,11 +1,12 @@
 # app/services/drawing_search.py
 from __future__ import annotations
 
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, List, Sequence
 
 from sqlalchemy import select, and_, func
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
 from app.db.models import Embedding, Dimension, Note, DrawingFile
 from app.api.schemas import (
     VectorSearchRequest,
@@ -13,7 +14,11 @@ from app.api.schemas import (
     ChunkSearchResponse,
     ChunkSearchResult,
 )
-from app.services.embeddings import embed_texts
+from app.services.ann_search import nearest_embedding_ids, nearest_embeddings
+from app.services.drawing_versions import hidden_version_ids
+from app.services.embeddings import embed_query
+
+settings = get_settings()
 
 DEFAULT_SCORE_THRESHOLD: float = 0.15
 
@@ -117,30 +122,19 @@ async def vector_search_embeddings(
     Vector / semantic search over the embeddings table using pgvector cosine similarity.
     """
     # 1) Get query embedding
-    [query_vec] = await embed_texts([req.query_text])
-
-    # 2) Build base query
-    sim_expr = 1.0 - Embedding.embedding.cosine_distance(query_vec)
-
-    stmt = (
-        select(Embedding, sim_expr.label("similarity"))
-        .where(Embedding.embedding.is_not(None))
+    query_vec = await embed_query(req.query_text)
+
+    # 2) Planner picks exact subset scan vs (over-fetched) ANN
+    flt = req.filters
+    rows = nearest_embeddings(
+        db,
+        query_vec,
+        k=req.top_k,
+        drawing_version_id=flt.drawing_version_id if flt else None,
+        source_types=flt.source_types if flt else None,
+        ef_search=req.ef_search,
+        probes=req.probes,
     )
-
-    filters = []
-    if req.filters:
-        if req.filters.drawing_version_id is not None:
-            filters.append(Embedding.drawing_version_id == req.filters.drawing_version_id)
-        if req.filters.source_types:
-            filters.append(Embedding.source_type.in_(req.filters.source_types))
-
-    if filters:
-        stmt = stmt.where(and_(*filters))
-
-    stmt = stmt.order_by(Embedding.embedding.cosine_distance(query_vec).asc())
-    stmt = stmt.limit(req.top_k)
-
-    rows = db.execute(stmt).all()
     embeddings: List[Embedding] = [row[0] for row in rows]
 
     # 3) Thumbnail + geometry enrichment
@@ -186,6 +180,46 @@ async def vector_search_embeddings(
 # Hybrid search (vector + keyword/trigram)
 # ---------------------------------------------------------
 
+def _embedding_filters(filters) -> list:
+    clauses = []
+    if filters:
+        if filters.drawing_version_id is not None:
+            clauses.append(Embedding.drawing_version_id == filters.drawing_version_id)
+        if filters.source_types:
+            clauses.append(Embedding.source_type.in_(filters.source_types))
+    return clauses
+
+
+def _fuse_weighted(
+    alpha: float,
+    vector_scores: Dict[int, float],
+    keyword_scores: Dict[int, float],
+) -> Dict[int, float]:
+    return {
+        emb_id: alpha * vector_scores.get(emb_id, 0.0)
+        + (1.0 - alpha) * keyword_scores.get(emb_id, 0.0)
+        for emb_id in vector_scores.keys() | keyword_scores.keys()
+    }
+
+
+def _fuse_rrf(
+    alpha: float,
+    k: int,
+    vector_ranked: Sequence[int],
+    keyword_ranked: Sequence[int],
+) -> Dict[int, float]:
+    """
+    Weighted reciprocal-rank fusion, scaled by (k + 1) so a document ranked
+    first in both lists scores 1.0 and scores stay comparable to
+    score_threshold.
+    """
+    fused: Dict[int, float] = {}
+    for weight, ranked in ((alpha, vector_ranked), (1.0 - alpha, keyword_ranked)):
+        for rank, emb_id in enumerate(ranked, start=1):
+            fused[emb_id] = fused.get(emb_id, 0.0) + weight * (k + 1) / (k + rank)
+    return fused
+
+
 async def hybrid_search_embeddings(
     db: Session,
     req: HybridSearchRequest,
@@ -194,42 +228,73 @@ async def hybrid_search_embeddings(
     Hybrid search combining:
       - vector similarity (pgvector cosine)
       - keyword/trigram similarity on content (pg_trgm similarity())
-    """
-    [query_vec] = await embed_texts([req.query_text])
-    sim_expr = 1.0 - Embedding.embedding.cosine_distance(query_vec)
 
+    Candidates come from two index-backed top-N queries:
+      - vector leg:  ORDER BY embedding <=> :q LIMIT n   (ivfflat / hnsw)
+      - keyword leg: WHERE content % :q ORDER BY similarity DESC LIMIT n
+                     (gin_trgm_ops)
+    The union is scored once by primary key and merged with weighted or
+    reciprocal-rank fusion, so cost depends on n, not on table size.
+    """
+    query_vec = await embed_query(req.query_text)
+    distance_expr = Embedding.embedding.cosine_distance(query_vec)
     # pg_trgm similarity(content, query_text) — requires pg_trgm extension
     trigram_expr = func.similarity(Embedding.content, req.query_text)
 
-    stmt = (
-        select(
-            Embedding,
-            sim_expr.label("vector_score"),
-            trigram_expr.label("keyword_score"),
+    filters = _embedding_filters(req.filters)
+    hidden = hidden_version_ids(db)
+    if hidden:
+        filters.append(Embedding.drawing_version_id.not_in(hidden))
+    n_candidates = max(req.top_k, req.top_k * settings.hybrid_candidate_multiplier)
+
+    # 1) Vector leg: ANN top-N (filtered via the planner)
+    flt = req.filters
+    vector_ranked: List[int] = [
+        emb_id
+        for emb_id, _ in nearest_embedding_ids(
+            db,
+            query_vec,
+            k=n_candidates,
+            drawing_version_id=flt.drawing_version_id if flt else None,
+            source_types=flt.source_types if flt else None,
+            ef_search=req.ef_search,
+            probes=req.probes,
         )
-        .where(Embedding.embedding.is_not(None))
+    ]
+
+    # 2) Keyword leg: trigram `%` top-N
+    keyword_stmt = (
+        select(Embedding.id)
+        .where(Embedding.content.op("%")(req.query_text))
+        .order_by(trigram_expr.desc())
+        .limit(n_candidates)
     )
-
-    filters = []
-    if req.filters:
-        if req.filters.drawing_version_id is not None:
-            filters.append(Embedding.drawing_version_id == req.filters.drawing_version_id)
-        if req.filters.source_types:
-            filters.append(Embedding.source_type.in_(req.filters.source_types))
-
     if filters:
-        stmt = stmt.where(and_(*filters))
-
-    # Grab extra candidates, then fuse-sort in Python
-    stmt = stmt.limit(req.top_k * 3)
-
-    rows = db.execute(stmt).all()
-    embeddings: List[Embedding] = [row[0] for row in rows]
+        keyword_stmt = keyword_stmt.where(and_(*filters))
+    keyword_ranked: List[int] = list(db.execute(keyword_stmt).scalars())
 
-    thumb_map = _load_thumbnails_for_embeddings(db, embeddings)
-    geom_map = _load_geometry_for_embeddings(db, embeddings)
+    candidate_ids = set(vector_ranked) | set(keyword_ranked)
+    if not candidate_ids:
+        return ChunkSearchResponse(results=[], total_returned=0, mode="hybrid")
 
-    fused_results: List[Tuple[ChunkSearchResult, float]] = []
+    # 3) Score the union by primary key
+    rows = db.execute(
+        select(
+            Embedding,
+            (1.0 - distance_expr).label("vector_score"),
+            trigram_expr.label("keyword_score"),
+        ).where(Embedding.id.in_(candidate_ids))
+    ).all()
+    emb_by_id: Dict[int, Embedding] = {row[0].id: row[0] for row in rows}
+
+    if req.fusion == "rrf":
+        fused_scores = _fuse_rrf(req.alpha, req.rrf_k, vector_ranked, keyword_ranked)
+    else:
+        fused_scores = _fuse_weighted(
+            req.alpha,
+            {row[0].id: float(row.vector_score) for row in rows},
+            {row[0].id: float(row.keyword_score or 0.0) for row in rows},
+        )
 
     # Decide threshold: request value or default
     effective_threshold = (
@@ -238,31 +303,35 @@ async def hybrid_search_embeddings(
         else DEFAULT_SCORE_THRESHOLD
     )
 
-    for emb, vector_score, keyword_score in rows:
-        v = float(vector_score)
-        k = float(keyword_score or 0.0)
-        fused = req.alpha * v + (1.0 - req.alpha) * k
-
-        if fused < effective_threshold:
-            continue
-
+    ranked = sorted(
+        (
+            (emb_id, score)
+            for emb_id, score in fused_scores.items()
+            if score >= effective_threshold and emb_id in emb_by_id
+        ),
+        key=lambda x: x[1],
+        reverse=True,
+    )[: req.top_k]
+
+    embeddings: List[Embedding] = [emb_by_id[emb_id] for emb_id, _ in ranked]
+    thumb_map = _load_thumbnails_for_embeddings(db, embeddings)
+    geom_map = _load_geometry_for_embeddings(db, embeddings)
 
-        result = ChunkSearchResult(
-            id=emb.id,
-            matched_text=emb.content,
-            source_type=emb.source_type,
-            drawing_version_id=emb.drawing_version_id,
-            source_ref_id=emb.source_ref_id,
-            similarity_score=fused,
-            thumbnail_url=thumb_map.get(emb.drawing_version_id),
-            geometry_index=geom_map.get(emb.id),
-            metadata=None,
+    final_results: List[ChunkSearchResult] = []
+    for emb, (_, fused) in zip(embeddings, ranked):
+        final_results.append(
+            ChunkSearchResult(
+                id=emb.id,
+                matched_text=emb.content,
+                source_type=emb.source_type,
+                drawing_version_id=emb.drawing_version_id,
+                source_ref_id=emb.source_ref_id,
+                similarity_score=fused,
+                thumbnail_url=thumb_map.get(emb.drawing_version_id),
+                geometry_index=geom_map.get(emb.id),
+                metadata=None,
+            )
         )
-        fused_results.append((result, fused))
-
-    # Sort by fused score descending and truncate
-    fused_results.sort(key=lambda x: x[1], reverse=True)
-    final_results = [r for (r, _) in fused_results[: req.top_k]]
 
     return ChunkSearchResponse(
         results=final_results,
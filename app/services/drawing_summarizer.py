@@ -5,10 +5,16 @@ import logging
 from pathlib import Path
 from typing import Any, Dict
 
-from openai import OpenAI  # pip install openai
+from openai import BadRequestError, NotFoundError, OpenAI  # pip install openai
 
 from app.api.schemas import DrawingStructuredSummary
 from app.config import get_settings  # ⬅ import your settings
+from app.services.pdf_upload_cache import (
+    forget_file_id,
+    get_cached_file_id,
+    pdf_sha256,
+    remember_file_id,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -172,6 +178,31 @@ Using this information, produce the JSON object described in the system prompt.
 """
 
 
+def _pdf_file_id(
+    client: OpenAI,
+    pdf_path: Path,
+    sha256: str,
+    *,
+    reuse_cached: bool = True,
+) -> tuple[str, bool]:
+    """
+    Return (file_id, from_cache) for the PDF, uploading it only when the
+    PDF upload cache has no valid entry.
+    """
+    if reuse_cached:
+        cached = get_cached_file_id(sha256, "openai")
+        if cached:
+            logger.info("Reusing uploaded PDF file_id=%s for %s", cached, pdf_path)
+            return cached, True
+
+    with pdf_path.open("rb") as f:
+        uploaded_file = client.files.create(
+            file=f,
+            purpose="user_data",
+        )
+    remember_file_id(sha256, "openai", uploaded_file.id, pdf_path.stat().st_size)
+    return uploaded_file.id, False
+
 
 def summarize_drawing_with_llm(
     document_id: str,
@@ -206,41 +237,50 @@ def summarize_drawing_with_llm(
 
     client = get_openai_client()
 
-    # 1) Upload the PDF as a file for this request
-    with pdf_path.open("rb") as f:
-        uploaded_file = client.files.create(
-            file=f,
-            purpose="user_data",
-        )
+    # 1) Upload the PDF as a file (or reuse a previous upload of the same PDF)
+    sha256 = pdf_sha256(pdf_path.read_bytes())
+    file_id, from_cache = _pdf_file_id(client, pdf_path, sha256)
 
     # 2) Call a vision-capable chat model with BOTH:
     #    - the PDF file
     #    - the JSON-based text prompt
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[
-            {
-                "role": "system",
-                "content": system_prompt,
-            },
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "file",
-                        "file": {
-                            "file_id": uploaded_file.id,
+    def _complete(file_id: str):
+        return client.chat.completions.create(
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_prompt,
+                },
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "file",
+                            "file": {
+                                "file_id": file_id,
+                            },
                         },
-                    },
-                    {
-                        "type": "text",
-                        "text": user_prompt,
-                    },
-                ],
-            },
-        ],
-        temperature=0.15,
-    )
+                        {
+                            "type": "text",
+                            "text": user_prompt,
+                        },
+                    ],
+                },
+            ],
+            temperature=0.15,
+        )
+
+    try:
+        resp = _complete(file_id)
+    except (NotFoundError, BadRequestError):
+        if not from_cache:
+            raise
+        # The provider dropped the cached file; upload again once.
+        logger.warning("Cached PDF file_id=%s rejected; uploading again", file_id)
+        forget_file_id(sha256, "openai", file_id)
+        file_id, _ = _pdf_file_id(client, pdf_path, sha256, reuse_cached=False)
+        resp = _complete(file_id)
 
     content = resp.choices[0].message.content
     if content is None:
@@ -0,0 +1,170 @@
+# app/services/drawing_versions.py
+"""
+Drawing version lifecycle: staging → ready → retired.
+
+ETL builds every ingest under a new DrawingVersion in state "staging",
+committed but invisible to readers (search excludes non-ready versions).
+activate_version() then swaps it in with one short transaction:
+
+  - versions of the same DWG hash that are still "ready" become "retired"
+  - the drawing's previously active version is deactivated
+  - the staging version becomes "ready" and active
+
+Retired versions, and staging versions abandoned by a crashed ingest, are
+deleted later by purge_retired_versions(), which every ingest worker runs
+on a timer alongside its jobs. It deletes child rows in small batches, each batch in its own
+transaction, so no statement holds locks on many rows.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db.models import (
+    Dimension,
+    DrawingFile,
+    DrawingSummary,
+    DrawingTextChunk,
+    DrawingVersion,
+    Embedding,
+    Note,
+    StandardViolation,
+)
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+VERSION_STAGING = "staging"
+VERSION_READY = "ready"
+VERSION_RETIRED = "retired"
+
+# Child tables in delete order: violations reference dimensions / notes.
+_CHILD_MODELS = (
+    Embedding,
+    StandardViolation,
+    DrawingTextChunk,
+    Dimension,
+    Note,
+    DrawingFile,
+    DrawingSummary,
+)
+
+
+def hidden_version_ids(db: Session) -> List[int]:
+    """
+    Ids of versions readers must not see (staging or retired). Served by
+    the partial index ix_drawing_versions_not_ready; normally a handful.
+    """
+    return list(
+        db.scalars(
+            select(DrawingVersion.id).where(DrawingVersion.state != VERSION_READY)
+        )
+    )
+
+
+def activate_version(db: Session, version: DrawingVersion) -> None:
+    """
+    Make a committed staging version the live one, in a single short
+    transaction. Retires any other ready version with the same dwg_sha256
+    (including one swapped in concurrently) and deactivates the drawing's
+    current active version.
+    """
+    try:
+        db.execute(
+            update(DrawingVersion)
+            .where(
+                DrawingVersion.dwg_sha256 == version.dwg_sha256,
+                DrawingVersion.state == VERSION_READY,
+                DrawingVersion.id != version.id,
+            )
+            .values(state=VERSION_RETIRED, is_active=False)
+        )
+        db.execute(
+            update(DrawingVersion)
+            .where(
+                DrawingVersion.drawing_id == version.drawing_id,
+                DrawingVersion.is_active == True,
+                DrawingVersion.id != version.id,
+            )
+            .values(is_active=False)
+        )
+        db.execute(
+            update(DrawingVersion)
+            .where(DrawingVersion.id == version.id)
+            .values(state=VERSION_READY, is_active=True)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to activate drawing_version_id=%s", version.id)
+        raise
+    db.refresh(version)
+
+
+def purge_retired_versions(batch_size: int | None = None, max_versions: int = 10) -> int:
+    """
+    Delete up to `max_versions` retired (or abandoned staging) versions and
+    all their rows, `batch_size` rows per transaction.
+
+    Returns the number of versions removed.
+    """
+    batch_size = batch_size or settings.retired_version_purge_batch_size
+    stale_before = datetime.now(timezone.utc) - timedelta(
+        hours=settings.stale_staging_version_hours
+    )
+
+    with SessionLocal() as db:
+        version_ids = list(
+            db.scalars(
+                select(DrawingVersion.id)
+                .where(
+                    or_(
+                        DrawingVersion.state == VERSION_RETIRED,
+                        (DrawingVersion.state == VERSION_STAGING)
+                        & (DrawingVersion.ingested_at < stale_before),
+                    )
+                )
+                .order_by(DrawingVersion.id)
+                .limit(max_versions)
+            )
+        )
+
+    removed = 0
+    for version_id in version_ids:
+        for model in _CHILD_MODELS:
+            while True:
+                with SessionLocal() as db:
+                    batch = (
+                        select(model.id)
+                        .where(model.drawing_version_id == version_id)
+                        .limit(batch_size)
+                        .scalar_subquery()
+                    )
+                    deleted = db.execute(
+                        delete(model).where(model.id.in_(batch))
+                    ).rowcount
+                    db.commit()
+                if deleted < batch_size:
+                    break
+
+        with SessionLocal() as db:
+            # Re-check the state: never drop a version that went live meanwhile.
+            db.execute(
+                delete(DrawingVersion).where(
+                    DrawingVersion.id == version_id,
+                    DrawingVersion.state != VERSION_READY,
+                )
+            )
+            db.commit()
+        removed += 1
+        logger.info("Purged drawing_version_id=%s", version_id)
+
+    return removed
@@ -0,0 +1,337 @@
+# app/services/embedding_cache.py
+"""
+Content-addressed embedding cache.
+
+Dimension and note strings ("= 0.25 in", "1/4-20 UNC-2B", "BREAK ALL SHARP
+EDGES", ...) repeat across thousands of drawings. embed_texts() routes every
+request through get_or_embed(), which resolves texts in three tiers:
+
+  1. in-process LRU (float32 arrays, bounded by EMBEDDING_CACHE_MEMORY_ENTRIES)
+  2. the embedding_cache table, keyed by sha256(model_name + normalized text)
+  3. the embedding provider, for the remaining misses only
+
+Provider results are written back to both tiers. The DB tier uses its own
+short sessions so cached vectors survive an ETL rollback, and any DB error
+degrades to "miss" instead of failing the caller.
+
+DB hits refresh last_used_at (at most once per _TOUCH_AFTER per entry), and
+purge_embedding_cache() evicts entries unused for EMBEDDING_CACHE_TTL_DAYS.
+Hit / miss counts accumulate per process and are flushed into the shared
+embedding_cache_counters table, so the API reports what the ingest workers
+saw too.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db.models import EmbeddingCacheCounter, EmbeddingCacheEntry
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+EmbedFn = Callable[[Sequence[str]], Awaitable[List[List[float]]]]
+
+_DB_LOOKUP_CHUNK = 1000
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# last_used_at is only rewritten when older than this, so hot entries do
+# not turn every lookup into a write.
+_TOUCH_AFTER = timedelta(hours=24)
+_STATS_FLUSH_SECONDS = 30.0
+
+_lru: "OrderedDict[str, array]" = OrderedDict()
+_lru_lock = threading.Lock()
+# model_name -> counts not yet flushed to embedding_cache_counters
+_pending_stats: Dict[str, Dict[str, int]] = {}
+_last_stats_flush = time.monotonic()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form used for both the cache key and the provider input:
+    NFC, trimmed, internal whitespace runs collapsed to one space. Case is
+    preserved ("M6" and "m6" are different callouts).
+    """
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", str(text))).strip()
+
+
+def cache_key(model_name: str, normalized_text: str) -> str:
+    return hashlib.sha256(
+        f"{model_name}\x00{normalized_text}".encode("utf-8")
+    ).hexdigest()
+
+
+def _count(model_name: str, memory_hits: int, db_hits: int, misses: int) -> None:
+    with _lru_lock:
+        counts = _pending_stats.setdefault(
+            model_name, {"memory_hits": 0, "db_hits": 0, "misses": 0}
+        )
+        counts["memory_hits"] += memory_hits
+        counts["db_hits"] += db_hits
+        counts["misses"] += misses
+
+
+def flush_cache_stats() -> None:
+    """
+    Add this process's pending hit / miss counts to embedding_cache_counters.
+    On failure the counts are kept for the next flush.
+    """
+    global _last_stats_flush
+
+    with _lru_lock:
+        pending = dict(_pending_stats)
+        _pending_stats.clear()
+        _last_stats_flush = time.monotonic()
+    if not pending:
+        return
+
+    now = datetime.now(timezone.utc)
+    try:
+        with SessionLocal() as db:
+            for model_name, counts in pending.items():
+                stmt = pg_insert(EmbeddingCacheCounter).values(
+                    model_name=model_name, updated_at=now, **counts
+                )
+                db.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["model_name"],
+                        set_={
+                            "memory_hits": EmbeddingCacheCounter.memory_hits + stmt.excluded.memory_hits,
+                            "db_hits": EmbeddingCacheCounter.db_hits + stmt.excluded.db_hits,
+                            "misses": EmbeddingCacheCounter.misses + stmt.excluded.misses,
+                            "updated_at": stmt.excluded.updated_at,
+                        },
+                    )
+                )
+            db.commit()
+    except Exception:
+        for model_name, counts in pending.items():
+            _count(model_name, **counts)
+        raise
+
+
+def get_cache_stats(db: Session) -> Dict[str, int]:
+    """
+    Cumulative hit / miss counts across all processes, plus the size of this
+    process's memory tier.
+    """
+    memory_hits, db_hits, misses = db.execute(
+        select(
+            func.coalesce(func.sum(EmbeddingCacheCounter.memory_hits), 0),
+            func.coalesce(func.sum(EmbeddingCacheCounter.db_hits), 0),
+            func.coalesce(func.sum(EmbeddingCacheCounter.misses), 0),
+        )
+    ).one()
+    with _lru_lock:
+        memory_entries = len(_lru)
+    return {
+        "memory_hits": int(memory_hits),
+        "db_hits": int(db_hits),
+        "misses": int(misses),
+        "lookups": int(memory_hits + db_hits + misses),
+        "memory_entries": memory_entries,
+    }
+
+
+# ---------------------------------------------------------
+# Memory tier
+# ---------------------------------------------------------
+
+def _lru_get_many(keys: Sequence[str]) -> Dict[str, List[float]]:
+    found: Dict[str, List[float]] = {}
+    with _lru_lock:
+        for key in keys:
+            vec = _lru.get(key)
+            if vec is not None:
+                _lru.move_to_end(key)
+                found[key] = vec.tolist()
+    return found
+
+
+def _lru_put_many(items: Dict[str, Sequence[float]]) -> None:
+    limit = max(0, settings.embedding_cache_memory_entries)
+    if limit == 0:
+        return
+    with _lru_lock:
+        for key, vec in items.items():
+            _lru[key] = array("f", vec)
+            _lru.move_to_end(key)
+        while len(_lru) > limit:
+            _lru.popitem(last=False)
+
+
+# ---------------------------------------------------------
+# Postgres tier (sync; called via asyncio.to_thread)
+# ---------------------------------------------------------
+
+def _db_get_many(keys: Sequence[str]) -> Dict[str, List[float]]:
+    found: Dict[str, List[float]] = {}
+    with SessionLocal() as db:
+        for i in range(0, len(keys), _DB_LOOKUP_CHUNK):
+            chunk = list(keys[i:i + _DB_LOOKUP_CHUNK])
+            rows = db.execute(
+                select(EmbeddingCacheEntry.cache_key, EmbeddingCacheEntry.embedding)
+                .where(EmbeddingCacheEntry.cache_key.in_(chunk))
+            )
+            for key, vec in rows:
+                found[key] = vec.tolist() if hasattr(vec, "tolist") else list(vec)
+        _touch(db, list(found))
+    return found
+
+
+def _touch(db: Session, keys: Sequence[str]) -> None:
+    if not keys:
+        return
+    now = datetime.now(timezone.utc)
+    for i in range(0, len(keys), _DB_LOOKUP_CHUNK):
+        db.execute(
+            update(EmbeddingCacheEntry)
+            .where(
+                EmbeddingCacheEntry.cache_key.in_(keys[i:i + _DB_LOOKUP_CHUNK]),
+                EmbeddingCacheEntry.last_used_at < now - _TOUCH_AFTER,
+            )
+            .values(last_used_at=now)
+        )
+    db.commit()
+
+
+def purge_embedding_cache(batch_size: int = 5000) -> int:
+    """
+    Evict entries not used for EMBEDDING_CACHE_TTL_DAYS, model by model,
+    `batch_size` rows per transaction. Returns the number of rows deleted.
+    """
+    ttl_days = settings.embedding_cache_ttl_days
+    if ttl_days <= 0:
+        return 0
+    cutoff = datetime.now(timezone.utc) - timedelta(days=ttl_days)
+
+    with SessionLocal() as db:
+        models = list(db.scalars(select(EmbeddingCacheEntry.model_name).distinct()))
+
+    removed = 0
+    for model_name in models:
+        while True:
+            with SessionLocal() as db:
+                batch = (
+                    select(EmbeddingCacheEntry.cache_key)
+                    .where(
+                        EmbeddingCacheEntry.model_name == model_name,
+                        EmbeddingCacheEntry.last_used_at < cutoff,
+                    )
+                    .limit(batch_size)
+                    .scalar_subquery()
+                )
+                deleted = db.execute(
+                    delete(EmbeddingCacheEntry).where(EmbeddingCacheEntry.cache_key.in_(batch))
+                ).rowcount
+                db.commit()
+            removed += deleted
+            if deleted < batch_size:
+                break
+
+    if removed:
+        logger.info("Evicted %d embedding cache entries unused for %s days", removed, ttl_days)
+    return removed
+
+
+def _db_put_many(model_name: str, items: Dict[str, Sequence[float]]) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            pg_insert(EmbeddingCacheEntry).on_conflict_do_nothing(
+                index_elements=["cache_key"]
+            ),
+            [
+                {"cache_key": key, "model_name": model_name, "embedding": list(vec)}
+                for key, vec in items.items()
+            ],
+        )
+        db.commit()
+
+
+# ---------------------------------------------------------
+# Public entry point
+# ---------------------------------------------------------
+
+async def get_or_embed(
+    texts: Sequence[str],
+    *,
+    model_name: str,
+    embed_fn: EmbedFn,
+) -> List[List[float]]:
+    """
+    Return one vector per input text, in order, calling embed_fn only for
+    distinct normalized texts that are in neither cache tier.
+    """
+    if not texts:
+        return []
+
+    normalized = [normalize_text(t) for t in texts]
+    keys = [cache_key(model_name, n) for n in normalized]
+
+    # Distinct keys, first occurrence wins for the text we send.
+    unique: "OrderedDict[str, str]" = OrderedDict()
+    for key, norm in zip(keys, normalized):
+        unique.setdefault(key, norm)
+
+    resolved = _lru_get_many(list(unique))
+    memory_hits = len(resolved)
+
+    pending = [k for k in unique if k not in resolved]
+    db_found: Dict[str, List[float]] = {}
+    if pending:
+        try:
+            db_found = await asyncio.to_thread(_db_get_many, pending)
+        except Exception:
+            logger.exception("Embedding cache lookup failed; treating as misses")
+        resolved.update(db_found)
+        _lru_put_many(db_found)
+
+    missing = [k for k in unique if k not in resolved]
+    if missing:
+        vectors = await embed_fn([unique[k] for k in missing])
+        if len(vectors) != len(missing):
+            # Let the caller's own length check report this.
+            return vectors
+        fresh = dict(zip(missing, vectors))
+        resolved.update(fresh)
+        _lru_put_many(fresh)
+        try:
+            await asyncio.to_thread(_db_put_many, model_name, fresh)
+        except Exception:
+            logger.exception("Embedding cache write failed; continuing without it")
+
+    _count(model_name, memory_hits, len(db_found), len(missing))
+    if time.monotonic() - _last_stats_flush >= _STATS_FLUSH_SECONDS:
+        try:
+            await asyncio.to_thread(flush_cache_stats)
+        except Exception:
+            logger.exception("Embedding cache stats flush failed; will retry")
+
+    logger.debug(
+        "Embedding cache: %d texts, %d distinct, %d memory hits, %d db hits, %d misses",
+        len(texts),
+        len(unique),
+        memory_hits,
+        len(db_found),
+        len(missing),
+    )
+
+    return [resolved[k] for k in keys]
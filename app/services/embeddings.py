@@ -1,12 +1,21 @@
 from __future__ import annotations
 
-from typing import Sequence, List
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence, List
 
 import httpx
-from openai import AsyncOpenAI
+from openai import APIConnectionError, InternalServerError, RateLimitError
 
 from app.config import get_settings
-from app.services.security_mode import get_effective_providers
+from app.services.embedding_cache import get_or_embed
+from app.services.http_clients import get_ollama_client, get_openai_client
+from app.services.security_mode import get_effective_providers, get_security_mode
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
@@ -31,39 +40,202 @@ EMBEDDING_MODEL: str = get_current_embedding_model_name()
 # Embedding dimension: use settings if defined, else default to 1536
 EMBEDDING_DIM: int = getattr(settings, "embedding_dim", 1536)
 
-# Single shared OpenAI client (uses OPENAI_API_KEY env var or settings)
-_openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 OPENAI_EMBEDDING_MODEL = settings.openai_embedding_model
 
 
+# Hard API limits per embeddings request are 2048 inputs and ~300k tokens;
+# the configured defaults stay well under both.
+_openai_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_openai_semaphore() -> asyncio.Semaphore:
+    global _openai_semaphore
+    if _openai_semaphore is None:
+        _openai_semaphore = asyncio.Semaphore(max(1, settings.openai_embed_concurrency))
+    return _openai_semaphore
+
+
+def _estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English/CAD text; cheap and conservative
+    # enough for batching without pulling in a tokenizer.
+    return len(text) // 4 + 1
+
+
+def _openai_batches(inputs: Sequence[str]) -> List[tuple[int, List[str]]]:
+    """
+    Split inputs into (start_offset, batch) chunks bounded by
+    OPENAI_EMBED_BATCH_SIZE items and OPENAI_EMBED_MAX_BATCH_TOKENS
+    estimated tokens.
+    """
+    max_items = max(1, settings.openai_embed_batch_size)
+    max_tokens = max(1, settings.openai_embed_max_batch_tokens)
+
+    batches: List[tuple[int, List[str]]] = []
+    start = 0
+    current: List[str] = []
+    current_tokens = 0
+    for i, text in enumerate(inputs):
+        tokens = _estimate_tokens(text)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append((start, current))
+            start, current, current_tokens = i, [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        batches.append((start, current))
+    return batches
+
+
+async def _openai_embed_batch(batch: List[str]) -> List[List[float]]:
+    """
+    Embed one batch, retrying rate limits and transient server/connection
+    errors with exponential backoff and jitter.
+    """
+    retries = max(0, settings.openai_embed_max_retries)
+    delay = 1.0
+    for attempt in range(retries + 1):
+        try:
+            async with _get_openai_semaphore():
+                resp = await get_openai_client().embeddings.create(
+                    model=OPENAI_EMBEDDING_MODEL,
+                    input=batch,
+                )
+            # The API documents data[i].index; don't rely on response order.
+            return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+        except (RateLimitError, APIConnectionError, InternalServerError) as exc:
+            if attempt == retries:
+                raise
+            sleep_for = delay + random.uniform(0, delay)
+            logger.warning(
+                "OpenAI embeddings batch of %d failed (%s); retry %d/%d in %.1fs",
+                len(batch),
+                type(exc).__name__,
+                attempt + 1,
+                retries,
+                sleep_for,
+            )
+            await asyncio.sleep(sleep_for)
+            delay = min(delay * 2, 30.0)
+    raise AssertionError("unreachable")
+
+
 async def _embed_openai(texts: Sequence[str]) -> List[List[float]]:
+    """
+    Embed texts with OpenAI in token- and item-bounded batches, dispatched
+    concurrently (OPENAI_EMBED_CONCURRENCY) and reassembled in input order.
+    """
     if not texts:
         return []
 
     inputs: List[str] = [str(t) for t in texts]
+    batches = _openai_batches(inputs)
 
-    resp = await _openai_client.embeddings.create(
-        model=OPENAI_EMBEDDING_MODEL,
-        input=inputs,
-    )
+    results = await asyncio.gather(*(_openai_embed_batch(b) for _, b in batches))
 
-    vectors: List[List[float]] = [d.embedding for d in resp.data]
+    vectors: List[List[float]] = [[] for _ in inputs]
+    for (start, batch), batch_vecs in zip(batches, results):
+        if len(batch_vecs) != len(batch):
+            raise RuntimeError(
+                f"OpenAI returned {len(batch_vecs)} embeddings for {len(batch)} inputs"
+            )
+        vectors[start:start + len(batch)] = batch_vecs
 
-    # Optional sanity check
     if vectors and len(vectors[0]) != EMBEDDING_DIM:
-        # You could log or enforce here
-        pass
+        logger.warning(
+            "OpenAI embedding dimension %d does not match EMBEDDING_DIM=%d",
+            len(vectors[0]),
+            EMBEDDING_DIM,
+        )
 
     return vectors
 
 
+# In-flight cap, created lazily on first use so it binds to the running
+# event loop. The HTTP client itself comes from app.services.http_clients.
+_ollama_semaphore: Optional[asyncio.Semaphore] = None
+# Flipped to False the first time the server answers a bare 404 on
+# /api/embed (Ollama < 0.3 only has the single-prompt /api/embeddings
+# endpoint). A 404 with a JSON error body, e.g. an unpulled model, leaves it
+# alone.
+_ollama_batch_supported: bool = True
+
+
+def _get_ollama_semaphore() -> asyncio.Semaphore:
+    global _ollama_semaphore
+    if _ollama_semaphore is None:
+        _ollama_semaphore = asyncio.Semaphore(max(1, settings.ollama_embed_concurrency))
+    return _ollama_semaphore
+
+
+def _ollama_error_message(resp: httpx.Response) -> Optional[str]:
+    """The "error" field of an Ollama JSON error body, if there is one."""
+    try:
+        data = resp.json()
+    except ValueError:
+        return None
+    error = data.get("error") if isinstance(data, dict) else None
+    return str(error) if error else None
+
+
+async def _ollama_embed_batch(
+    client: httpx.AsyncClient, batch: Sequence[str]
+) -> Optional[List[List[float]]]:
+    """
+    POST one batch to /api/embed. Returns None if the server does not
+    support the batch endpoint.
+
+    Ollama also answers 404 for an unknown model, but with a JSON
+    {"error": "model ... not found"} body; that is raised, not treated as a
+    missing endpoint (the router's own 404 is plain text).
+    """
+    payload = {
+        "model": settings.ollama_embedding_model,
+        "input": [str(t) for t in batch],
+    }
+    async with _get_ollama_semaphore():
+        resp = await client.post("/api/embed", json=payload)
+    if resp.status_code == 404:
+        error = _ollama_error_message(resp)
+        if error is None:
+            return None
+        raise RuntimeError(f"Ollama /api/embed failed: {error}")
+    resp.raise_for_status()
+
+    # Response shape: {"model": ..., "embeddings": [[...], ...]}
+    embs = resp.json().get("embeddings")
+    if not isinstance(embs, list) or len(embs) != len(batch):
+        raise RuntimeError("Unexpected Ollama /api/embed response format.")
+    return embs
+
+
+async def _ollama_embed_one(client: httpx.AsyncClient, text: str) -> List[float]:
+    payload = {
+        "model": settings.ollama_embedding_model,
+        "prompt": str(text),
+    }
+    async with _get_ollama_semaphore():
+        resp = await client.post("/api/embeddings", json=payload)
+    resp.raise_for_status()
+    data = resp.json()
+
+    # Typical Ollama response shape: {"embedding": [...], "num_tokens": N}
+    emb = data.get("embedding")
+    if not isinstance(emb, list):
+        raise RuntimeError("Unexpected Ollama embeddings response format.")
+    return emb
+
+
 async def _embed_ollama(texts: Sequence[str]) -> List[List[float]]:
     """
-    Use Ollama's /api/embeddings endpoint.
+    Embed texts with Ollama over a pooled connection.
 
-    This assumes Ollama's HTTP API is running and accessible via OLLAMA_BASE_URL,
-    and that OLLAMA_EMBEDDING_MODEL is set in the environment.
+    Texts are sent in OLLAMA_EMBED_BATCH_SIZE chunks to the batch
+    /api/embed endpoint, with at most OLLAMA_EMBED_CONCURRENCY requests in
+    flight. Servers without /api/embed fall back to concurrent single-text
+    /api/embeddings calls. Output order always matches input order.
     """
+    global _ollama_batch_supported
+
     if not texts:
         return []
 
@@ -73,35 +245,26 @@ async def _embed_ollama(texts: Sequence[str]) -> List[List[float]]:
             "OLLAMA_EMBEDDING_MODEL is not configured."
         )
 
-    vectors: List[List[float]] = []
+    client = get_ollama_client()
 
-    async with httpx.AsyncClient(base_url=str(settings.ollama_base_url)) as client:
-        for t in texts:
-            payload = {
-                "model": settings.ollama_embedding_model,
-                "prompt": str(t),
-            }
-            resp = await client.post("/api/embeddings", json=payload)
-            resp.raise_for_status()
-            data = resp.json()
+    if _ollama_batch_supported:
+        size = max(1, settings.ollama_embed_batch_size)
+        batches = [texts[i:i + size] for i in range(0, len(texts), size)]
+        results = await asyncio.gather(
+            *(_ollama_embed_batch(client, b) for b in batches)
+        )
+        if all(r is not None for r in results):
+            return [vec for batch_vecs in results for vec in batch_vecs]
 
-            # Typical Ollama response shape: {"embedding": [...], "num_tokens": N}
-            emb = data.get("embedding")
-            if not isinstance(emb, list):
-                raise RuntimeError("Unexpected Ollama embeddings response format.")
-            vectors.append(emb)
+        logger.info("Ollama server has no /api/embed; falling back to /api/embeddings")
+        _ollama_batch_supported = False
 
-    return vectors
+    return list(
+        await asyncio.gather(*(_ollama_embed_one(client, t) for t in texts))
+    )
 
 
-async def embed_texts(texts: Sequence[str]) -> List[List[float]]:
-    """
-    Get embeddings for a batch of texts using the provider implied by the
-    current security mode:
-
-      - secure     → Ollama
-      - not_secure → OpenAI
-    """
+async def _embed_uncached(texts: Sequence[str]) -> List[List[float]]:
     providers = get_effective_providers()
     provider = providers["embedding"].lower()
 
@@ -111,3 +274,65 @@ async def embed_texts(texts: Sequence[str]) -> List[List[float]]:
         return await _embed_ollama(texts)
     else:
         raise RuntimeError(f"Unsupported embedding provider: {provider!r}")
+
+
+async def embed_texts(texts: Sequence[str]) -> List[List[float]]:
+    """
+    Get embeddings for a batch of texts using the provider implied by the
+    current security mode:
+
+      - secure     → Ollama
+      - not_secure → OpenAI
+
+    Texts already seen for the current model are served from the embedding
+    cache (app.services.embedding_cache); only misses reach the provider.
+    """
+    if not settings.embedding_cache_enabled:
+        return await _embed_uncached(texts)
+
+    return await get_or_embed(
+        texts,
+        model_name=get_current_embedding_model_name(),
+        embed_fn=_embed_uncached,
+    )
+
+
+# ---------------------------------------------------------
+# Query-vector cache (search + chat)
+# ---------------------------------------------------------
+
+# (security mode, model, query) -> (expires_at, vector)
+_query_cache: "OrderedDict[tuple[str, str, str], tuple[float, tuple[float, ...]]]" = OrderedDict()
+
+
+async def embed_query(query: str) -> List[float]:
+    """
+    Embed a single search / chat query, served from a small TTL+LRU cache so
+    paging or re-filtering the same query skips the provider round trip.
+
+    Keyed by security mode and model, so flipping modes never returns a
+    vector from the other provider's space.
+    """
+    text = query.strip()
+    key = (get_security_mode(), get_current_embedding_model_name(), text)
+    ttl = settings.query_embedding_cache_ttl_seconds
+    now = time.monotonic()
+
+    hit = _query_cache.get(key)
+    if hit is not None:
+        expires_at, vec = hit
+        if expires_at > now:
+            _query_cache.move_to_end(key)
+            return list(vec)
+        del _query_cache[key]
+
+    [vec] = await embed_texts([text])
+
+    if ttl > 0 and settings.query_embedding_cache_size > 0:
+        # Stored as a tuple so a caller mutating its list cannot poison the cache.
+        _query_cache[key] = (now + ttl, tuple(vec))
+        _query_cache.move_to_end(key)
+        while len(_query_cache) > settings.query_embedding_cache_size:
+            _query_cache.popitem(last=False)
+
+    return vec
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple
 
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.config import get_settings
+
 from app.db.models import (
     Drawing,
     DrawingVersion,
@@ -15,14 +20,22 @@ from app.db.models import (
     Dimension,
     Note,
     DrawingSummary,
-    Embedding,
 )
 
+from app.db.bulk import bulk_insert_returning_ids, copy_embeddings, copy_embeddings_forward
+from app.ingestion.entity_index import EntityIndex, build_entity_index
 from app.services.ai_providers import SummaryProvider
+from app.services.drawing_versions import (
+    VERSION_READY,
+    VERSION_STAGING,
+    activate_version,
+)
 from app.services.embeddings import embed_texts, EMBEDDING_MODEL, get_current_embedding_model_name
 
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
 
 # ======================================================================
 # ETL RESULT OBJECT
@@ -41,6 +54,8 @@ class ETLResult:
         num_notes: int,
         summary_id: Optional[int],
         num_embeddings: int,
+        summary_reused: bool = False,
+        num_carried_forward: int = 0,
     ) -> None:
         self.drawing_id = drawing_id
         self.drawing_version_id = drawing_version_id
@@ -48,6 +63,8 @@ class ETLResult:
         self.num_notes = num_notes
         self.summary_id = summary_id
         self.num_embeddings = num_embeddings
+        self.summary_reused = summary_reused
+        self.num_carried_forward = num_carried_forward
 
     def dict(self) -> dict:
         return {
@@ -57,9 +74,30 @@ class ETLResult:
             "num_notes": self.num_notes,
             "summary_id": self.summary_id,
             "num_embeddings": self.num_embeddings,
+            "summary_reused": self.summary_reused,
+            "num_carried_forward": self.num_carried_forward,
         }
 
 
+class EmbeddableRecord(NamedTuple):
+    """
+    Compact (source_type, source_ref_id, text) triple produced by extraction
+    so embedding never has to re-read dimensions / notes from the DB.
+    """
+    source_type: str
+    source_ref_id: int
+    text: str
+
+
+class ExtractionResult(NamedTuple):
+    num_dimensions: int
+    num_notes: int
+    records: List[EmbeddableRecord]
+    # (source_type, base version row id, new row id) for rows whose
+    # handle + content_hash match the base version (incremental re-ingest)
+    unchanged: List[Tuple[str, int, int]]
+
+
 # ======================================================================
 # MAIN ETL FUNCTION
 # ======================================================================
@@ -76,6 +114,7 @@ async def run_drawing_etl(
     png_path: Optional[Path],
     thumbnail_path: Optional[Path],
     summary_provider: SummaryProvider,
+    force_resummarize: bool = False,
 ) -> ETLResult:
 
     """
@@ -83,12 +122,21 @@ async def run_drawing_etl(
 
     Steps:
     1. Create/lookup Drawing
-    2. Find or insert DrawingVersion (idempotent by dwg_sha256)
+    2. Create a staging DrawingVersion (a re-ingest of the same dwg_sha256
+       builds next to the live version instead of deleting its rows)
     3. Insert DrawingFiles
-    4. Parse JSON → Dimensions + Notes
-    5. Generate LLM summary (provider can be multi-pass JSON+PDF)
-    6. Generate embeddings for summary, dimensions, notes
-    7. Commit all changes
+    4. Classify JSON entities once → Dimensions + Notes
+       (a new revision is diffed against the previous active version by
+       handle + content_hash)
+    5. Generate LLM summary (provider can be multi-pass JSON+PDF), or
+       reuse the existing one on re-ingest when model_name and
+       prompt_version match (unless force_resummarize)
+    6. Generate embeddings for summary, dimensions, notes; unchanged
+       rows (and a reused summary) copy their embeddings from the
+       previous version
+    7. Commit the staging version
+    8. Swap it in with activate_version() (short transaction); the old
+       version is purged asynchronously by the ingest worker
     """
 
     logger.info(f"Starting ETL for document_id={document_id}")
@@ -108,69 +156,78 @@ async def run_drawing_etl(
         db.flush()  # get drawing.id
 
     # ------------------------------------------------------------------
-    # 2. Find or create DrawingVersion for this dwg_sha256
-    #    (dwg_sha256 is UNIQUE, so we must reuse if it already exists)
+    # 2. Create a staging DrawingVersion
+    #    Everything below is written under this new version id; the live
+    #    version (if any) is untouched until activate_version() swaps the
+    #    two in a short final transaction. Nothing is deleted here — the
+    #    retired version is purged later by the ingest worker.
     # ------------------------------------------------------------------
     existing_version = (
         db.query(DrawingVersion)
-        .filter(DrawingVersion.dwg_sha256 == document_id)
+        .filter(
+            DrawingVersion.dwg_sha256 == document_id,
+            DrawingVersion.state == VERSION_READY,
+        )
         .one_or_none()
     )
 
+    reused_summary: Optional[DrawingSummary] = None
+    base_version: Optional[DrawingVersion] = None
+
     if existing_version is not None:
-        # Re-ingest: reuse the same version row and clean out old derived data
-        version = existing_version
+        # Re-ingest of the same DWG: its rows and embeddings are the
+        # natural base to carry forward from.
+        base_version = existing_version
         logger.info(
-            "Re-ingesting existing drawing_version_id=%s for dwg_sha256=%s; "
-            "clearing previous extracted data",
-            version.id,
+            "Re-ingesting dwg_sha256=%s; staging a replacement for drawing_version_id=%s",
             document_id,
+            existing_version.id,
         )
 
-        # Keep it active and update filename
-        version.is_active = True
-        version.source_filename = source_filename
-
-        # Delete previous derived rows so we don't duplicate things
-        db.query(DrawingFile).filter(
-            DrawingFile.drawing_version_id == version.id
-        ).delete(synchronize_session=False)
-
-        db.query(Dimension).filter(
-            Dimension.drawing_version_id == version.id
-        ).delete(synchronize_session=False)
-
-        db.query(Note).filter(
-            Note.drawing_version_id == version.id
-        ).delete(synchronize_session=False)
-
-        db.query(DrawingSummary).filter(
-            DrawingSummary.drawing_version_id == version.id
-        ).delete(synchronize_session=False)
-
-        db.query(Embedding).filter(
-            Embedding.drawing_version_id == version.id
-        ).delete(synchronize_session=False)
-
-        db.flush()
+        # Same dwg_sha256: the summary only depends on the provider model and
+        # prompt version, so keep it when both still match.
+        if not force_resummarize:
+            reused_summary = (
+                db.query(DrawingSummary)
+                .filter(
+                    DrawingSummary.drawing_version_id == existing_version.id,
+                    DrawingSummary.model_name == summary_provider.model_name,
+                    DrawingSummary.prompt_version == summary_provider.prompt_version,
+                )
+                .one_or_none()
+            )
+        if reused_summary is not None:
+            logger.info(
+                "Reusing summary id=%s (model=%s, prompt_version=%s) for dwg_sha256=%s",
+                reused_summary.id,
+                reused_summary.model_name,
+                reused_summary.prompt_version,
+                document_id,
+            )
 
-    else:
-        # First time ingest for this DWG hash: create a new version
-        # Deactivate previous versions (if any) for this drawing
-        db.query(DrawingVersion).filter(
-            DrawingVersion.drawing_id == drawing.id,
-            DrawingVersion.is_active == True,
-        ).update({DrawingVersion.is_active: False})
-
-        version = DrawingVersion(
-            drawing_id=drawing.id,
-            revision_label=None,  # future support for Revision
-            dwg_sha256=document_id,
-            source_filename=source_filename,
-            is_active=True,
+    elif settings.incremental_reingest_enabled:
+        # A new revision of a known drawing is diffed against the version
+        # it replaces, so unchanged entities keep their embeddings.
+        base_version = _find_base_version(
+            db, drawing_id=drawing.id, source_filename=source_filename
         )
-        db.add(version)
-        db.flush()  # populate version.id
+        if base_version is not None:
+            logger.info(
+                "Incremental ingest for dwg_sha256=%s against drawing_version_id=%s",
+                document_id,
+                base_version.id,
+            )
+
+    version = DrawingVersion(
+        drawing_id=drawing.id,
+        revision_label=None,  # future support for Revision
+        dwg_sha256=document_id,
+        source_filename=source_filename,
+        is_active=False,
+        state=VERSION_STAGING,
+    )
+    db.add(version)
+    db.flush()  # populate version.id
 
     # ------------------------------------------------------------------
     # 3. Register DrawingFiles
@@ -198,40 +255,61 @@ async def run_drawing_etl(
     _add_file("png_thumb", thumbnail_path)
 
     # ------------------------------------------------------------------
-    # 4. Parse JSON → Dimensions + Notes
+    # 4. Classify JSON entities once → Dimensions + Notes
     # ------------------------------------------------------------------
-    with json_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    # One classification pass shared with the summary provider (step 5).
+    entity_index = await asyncio.to_thread(build_entity_index, json_path)
+    _add_file("entities_bin", entity_index.sidecar_path)
+    dim_rows, note_rows = _entity_rows(version.id, entity_index)
 
-    dims_inserted, notes_inserted = _extract_dimensions_and_notes(
+    extracted = _insert_dimensions_and_notes(
         db=db,
-        version_id=version.id,
-        json_data=data,
+        dim_rows=dim_rows,
+        note_rows=note_rows,
+        base_version_id=base_version.id if base_version is not None else None,
     )
+    dims_inserted = extracted.num_dimensions
+    notes_inserted = extracted.num_notes
+    carried_forward = list(extracted.unchanged)
 
     # ------------------------------------------------------------------
-    # 5. Generate LLM summary via provider
+    # 5. Generate LLM summary via provider (or reuse the cached one)
     # ------------------------------------------------------------------
-    summary_output = summary_provider.generate_summary(
-        document_id=document_id,
-        pdf_path=pdf_path,
-        json_dict=data,
-    )
-
-    structured = summary_output["structured_summary"]
-    long_form = summary_output["long_form_description"]
-    short = summary_output.get("short_description")
+    if reused_summary is not None:
+        summary_row = DrawingSummary(
+            drawing_version_id=version.id,
+            structured_summary=reused_summary.structured_summary,
+            long_form_description=reused_summary.long_form_description,
+            short_description=reused_summary.short_description,
+            model_name=reused_summary.model_name,
+            prompt_version=reused_summary.prompt_version,
+        )
+        db.add(summary_row)
+        db.flush()  # for summary_row.id
+        for source_type in ("summary", "summary_short"):
+            carried_forward.append((source_type, reused_summary.id, summary_row.id))
+    else:
+        summary_output = await summary_provider.generate_summary(
+            document_id=document_id,
+            pdf_path=pdf_path,
+            json_path=json_path,
+            entity_index=entity_index,
+        )
 
-    summary_row = DrawingSummary(
-        drawing_version_id=version.id,
-        structured_summary=structured,
-        long_form_description=long_form,
-        short_description=short,
-        model_name=summary_provider.model_name,
-        prompt_version="1.0",
-    )
-    db.add(summary_row)
-    db.flush()  # for summary_row.id
+        structured = summary_output["structured_summary"]
+        long_form = summary_output["long_form_description"]
+        short = summary_output.get("short_description")
+
+        summary_row = DrawingSummary(
+            drawing_version_id=version.id,
+            structured_summary=structured,
+            long_form_description=long_form,
+            short_description=short,
+            model_name=summary_provider.model_name,
+            prompt_version=summary_provider.prompt_version,
+        )
+        db.add(summary_row)
+        db.flush()  # for summary_row.id
 
     # ------------------------------------------------------------------
     # 6. Generate embeddings
@@ -240,23 +318,32 @@ async def run_drawing_etl(
         db=db,
         version_id=version.id,
         summary_row=summary_row,
+        records=extracted.records,
+        unchanged=carried_forward,
+        base_version_id=base_version.id if base_version is not None else None,
     )
 
 
     # ------------------------------------------------------------------
-    # 7. Commit ETL
+    # 7. Commit the staging version (invisible to search until step 8)
     # ------------------------------------------------------------------
     try:
         db.commit()
-        logger.info(
-            f"ETL completed: drawing_id={drawing.id}, version_id={version.id}, "
-            f"{dims_inserted} dims, {notes_inserted} notes, {embeddings_created} embeddings"
-        )
     except SQLAlchemyError:
         db.rollback()
         logger.exception("ETL failed; DB rolled back")
         raise
 
+    # ------------------------------------------------------------------
+    # 8. Swap it in: retire / deactivate the old version, activate this one
+    # ------------------------------------------------------------------
+    activate_version(db, version)
+    logger.info(
+        f"ETL completed: drawing_id={drawing.id}, version_id={version.id}, "
+        f"{dims_inserted} dims, {notes_inserted} notes, {embeddings_created} embeddings "
+        f"({len(extracted.unchanged)} entities unchanged from the previous version)"
+    )
+
     return ETLResult(
         drawing_id=drawing.id,
         drawing_version_id=version.id,
@@ -264,6 +351,8 @@ async def run_drawing_etl(
         num_notes=notes_inserted,
         summary_id=summary_row.id,
         num_embeddings=embeddings_created,
+        summary_reused=reused_summary is not None,
+        num_carried_forward=len(extracted.unchanged),
     )
 
 
@@ -285,12 +374,59 @@ def _guess_mime(file_type: str) -> str:
     return "application/octet-stream"
 
 
-def _extract_dimensions_and_notes(
-    *,
+def _find_base_version(
     db: Session,
+    *,
+    drawing_id: int,
+    source_filename: str,
+) -> Optional[DrawingVersion]:
+    """
+    Previous active version a new revision is diffed against: the active
+    version of the same drawing if there is one, otherwise the most recent
+    active version ingested under the same filename (every distinct DWG
+    hash gets its own Drawing, so revisions usually land there).
+
+    A wrong guess only costs speed: rows are carried forward only when
+    handle and content_hash both match.
+    """
+    return (
+        db.query(DrawingVersion)
+        .filter(
+            DrawingVersion.is_active == True,
+            or_(
+                DrawingVersion.drawing_id == drawing_id,
+                DrawingVersion.source_filename == source_filename,
+            ),
+        )
+        .order_by(
+            (DrawingVersion.drawing_id == drawing_id).desc(),
+            DrawingVersion.ingested_at.desc(),
+            DrawingVersion.id.desc(),
+        )
+        .first()
+    )
+
+
+_DIMENSION_CONTENT_FIELDS = (
+    "dim_type", "raw_type_code", "layer", "handle", "owner_handle",
+    "dim_text", "dim_value", "units", "geometry",
+)
+_NOTE_CONTENT_FIELDS = ("note_type", "text", "layer", "handle", "geometry")
+
+
+def _content_hash(row: Dict[str, Any], fields: Tuple[str, ...]) -> str:
+    # json_index is left out on purpose: an entity that only moved in
+    # entities[] is still unchanged.
+    payload = json.dumps(
+        [row[f] for f in fields], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entity_rows(
     version_id: int,
-    json_data: Dict[str, Any],
-) -> tuple[int, int]:
+    entity_index: EntityIndex,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
     Your C++ JSON exporter provides `entities[]` with types including:
       - TEXT → notes
@@ -298,62 +434,125 @@ def _extract_dimensions_and_notes(
       - MTEXT → notes
       - etc.
 
-    We will generalize extraction here.
+    Classification happens once in build_entity_index(); this only shapes
+    the dimension / note entities into rows ready for bulk insert, each
+    with the content_hash used by incremental re-ingest.
     """
-    dims = 0
-    notes = 0
-
-    entities = json_data.get("entities", [])
-    for ent in entities:
-        ent_type = ent.get("type", "").lower()
-        idx = ent.get("index")
-
-        # --------------------------
-        # DIMENSIONS
-        # --------------------------
-        if "dim" in ent_type:  # e.g., "DIMENSION_LINEAR"
-            dim = Dimension(
-                drawing_version_id=version_id,
-                json_index=idx,
-                dim_type=ent.get("type"),
-                raw_type_code=ent.get("raw_type"),
-                layer=ent.get("layer"),
-                handle=ent.get("handle"),
-                owner_handle=ent.get("owner_handle"),
-                dim_text=ent.get("text"),
-                dim_value=ent.get("value"),
-                units=ent.get("units"),
-                geometry=ent.get("geometry"),
-            )
-            db.add(dim)
-            dims += 1
-
-        # --------------------------
-        # NOTES / TEXT
-        # --------------------------
-        elif "text" in ent_type:
-            note = Note(
-                drawing_version_id=version_id,
-                json_index=idx,
-                note_type=_infer_note_type(ent),
-                text=ent.get("text", ""),
-                layer=ent.get("layer"),
-                handle=ent.get("handle"),
-                geometry=ent.get("geometry"),
-            )
-            db.add(note)
-            notes += 1
+    dim_rows = [
+        {
+            "drawing_version_id": version_id,
+            "json_index": d.index,
+            "dim_type": d.type,
+            "raw_type_code": d.raw_type,
+            "layer": d.layer,
+            "handle": d.handle,
+            "owner_handle": d.owner_handle,
+            "dim_text": d.text,
+            "dim_value": d.value,
+            "units": d.units,
+            "geometry": d.geometry,
+        }
+        for d in entity_index.dimensions
+    ]
+    for row in dim_rows:
+        row["content_hash"] = _content_hash(row, _DIMENSION_CONTENT_FIELDS)
+
+    note_rows = [
+        {
+            "drawing_version_id": version_id,
+            "json_index": n.index,
+            "note_type": n.note_type,
+            "text": n.text,
+            "layer": n.layer,
+            "handle": n.handle,
+            "geometry": n.geometry,
+        }
+        for n in entity_index.notes
+    ]
+    for row in note_rows:
+        row["content_hash"] = _content_hash(row, _NOTE_CONTENT_FIELDS)
+    return dim_rows, note_rows
+
+
+def _insert_dimensions_and_notes(
+    *,
+    db: Session,
+    dim_rows: List[Dict[str, Any]],
+    note_rows: List[Dict[str, Any]],
+    base_version_id: Optional[int] = None,
+) -> ExtractionResult:
+    """
+    Returns the row counts plus, for every inserted row with non-empty
+    embeddable text, an EmbeddableRecord keyed by the RETURNING id.
 
-    return dims, notes
+    With base_version_id, rows whose handle + content_hash match a row of
+    that version are also reported in `unchanged`, so their embeddings can
+    be copied instead of recomputed.
+    """
+    # One executemany per table instead of one ORM object per entity.
+    dim_ids = bulk_insert_returning_ids(db, Dimension, dim_rows)
+    note_ids = bulk_insert_returning_ids(db, Note, note_rows)
+
+    records: List[EmbeddableRecord] = []
+    for dim_id, row in zip(dim_ids, dim_rows):
+        text = _dimension_embedding_text(row["dim_text"], row["dim_value"], row["units"])
+        if text:
+            records.append(EmbeddableRecord("dimension", dim_id, text))
+    for note_id, row in zip(note_ids, note_rows):
+        text = (row["text"] or "").strip()
+        if text:
+            records.append(EmbeddableRecord("note", note_id, text))
+
+    unchanged: List[Tuple[str, int, int]] = []
+    if base_version_id is not None:
+        for source_type, model, ids, rows in (
+            ("dimension", Dimension, dim_ids, dim_rows),
+            ("note", Note, note_ids, note_rows),
+        ):
+            base = _rows_by_handle(db, model, base_version_id)
+            for new_id, row in zip(ids, rows):
+                prev = base.pop(row["handle"], None) if row["handle"] else None
+                if prev is not None and prev[1] == row["content_hash"]:
+                    unchanged.append((source_type, prev[0], new_id))
+
+    return ExtractionResult(len(dim_ids), len(note_ids), records, unchanged)
 
 
-def _infer_note_type(ent: Dict[str, Any]) -> str:
-    raw_text = (ent.get("text") or "").lower()
-    if any(tok in raw_text for tok in ["±", "tolerance", "tol"]):
-        return "tolerance"
-    if any(tok in raw_text for tok in ["⌀", "gd&t", "true position", "flatness"]):
-        return "gdandt"
-    return "general"
+def _rows_by_handle(db: Session, model: Any, version_id: int) -> Dict[str, Tuple[int, str]]:
+    """
+    handle -> (id, content_hash) for a version's rows. Handles that occur
+    more than once are left out; they cannot be matched unambiguously.
+    """
+    by_handle: Dict[str, Tuple[int, str]] = {}
+    duplicates = set()
+    for row_id, handle, content_hash in db.execute(
+        select(model.id, model.handle, model.content_hash).where(
+            model.drawing_version_id == version_id,
+            model.handle.is_not(None),
+            model.content_hash.is_not(None),
+        )
+    ):
+        if handle in by_handle:
+            duplicates.add(handle)
+        by_handle[handle] = (row_id, content_hash)
+    for handle in duplicates:
+        del by_handle[handle]
+    return by_handle
+
+
+def _dimension_embedding_text(dim_text: Any, dim_value: Any, units: Any) -> str:
+    text_parts: List[str] = []
+    if dim_text:
+        text_parts.append(str(dim_text))
+    if dim_value is not None:
+        # dimensions.dim_value is a float column; format it the way it
+        # reads back from the DB so texts stay stable across ingests.
+        if isinstance(dim_value, int):
+            dim_value = float(dim_value)
+        text_parts.append(f"= {dim_value}")
+    if units:
+        text_parts.append(f" {units}")
+    return "".join(text_parts).strip()
 
 
 async def _generate_all_embeddings(
@@ -361,8 +560,31 @@ async def _generate_all_embeddings(
     db: Session,
     version_id: int,
     summary_row: DrawingSummary,
+    records: List[EmbeddableRecord],
+    unchanged: List[Tuple[str, int, int]],
+    base_version_id: Optional[int] = None,
 ) -> int:
-    embeddings_created = 0
+    current_embedding_model = get_current_embedding_model_name()
+
+    # -----------------------------------------------------
+    # 0. Carry embeddings of unchanged rows / a reused summary forward
+    #    (server-side copy); anything without a copyable embedding
+    #    falls through to step 2
+    # -----------------------------------------------------
+    carried: set[tuple[str, int]] = set()
+    if base_version_id is not None and unchanged:
+        for source_type in dict.fromkeys(st for (st, _, _) in unchanged):
+            pairs = [(old, new) for (st, old, new) in unchanged if st == source_type]
+            copied = copy_embeddings_forward(
+                db,
+                from_version_id=base_version_id,
+                to_version_id=version_id,
+                source_type=source_type,
+                id_pairs=pairs,
+                model_name=current_embedding_model,
+            )
+            carried.update((source_type, ref_id) for ref_id in copied)
+        records = [r for r in records if (r.source_type, r.source_ref_id) not in carried]
 
     # -----------------------------------------------------
     # 1. Build list of (source_type, source_ref_id, text)
@@ -370,46 +592,20 @@ async def _generate_all_embeddings(
     content_pieces: List[tuple[str, int, str]] = []
 
     # Summary long-form + short
-    if summary_row.long_form_description:
+    if summary_row.long_form_description and ("summary", summary_row.id) not in carried:
         content_pieces.append(
             ("summary", summary_row.id, summary_row.long_form_description)
         )
-    if summary_row.short_description:
+    if summary_row.short_description and ("summary_short", summary_row.id) not in carried:
         content_pieces.append(
             ("summary_short", summary_row.id, summary_row.short_description)
         )
 
-    # Dimensions
-    dim_rows = (
-        db.query(Dimension)
-        .filter(Dimension.drawing_version_id == version_id)
-        .all()
-    )
-    for dim in dim_rows:
-        text_parts: List[str] = []
-        if dim.dim_text:
-            text_parts.append(str(dim.dim_text))
-        if dim.dim_value is not None:
-            text_parts.append(f"= {dim.dim_value}")
-        if dim.units:
-            text_parts.append(f" {dim.units}")
-        text = "".join(text_parts).strip()
-
-        if text:
-            content_pieces.append(("dimension", dim.id, text))
-
-    # Notes
-    note_rows = (
-        db.query(Note)
-        .filter(Note.drawing_version_id == version_id)
-        .all()
-    )
-    for note in note_rows:
-        if note.text and note.text.strip():
-            content_pieces.append(("note", note.id, note.text.strip()))
+    # Dimensions + notes, straight from the extraction step
+    content_pieces.extend(records)
 
     if not content_pieces:
-        return 0
+        return len(carried)
 
     # -----------------------------------------------------
     # 2. Batch embed via shared embed_texts()
@@ -425,25 +621,17 @@ async def _generate_all_embeddings(
             len(content_pieces),
             version_id,
         )
-        return 0
+        return len(carried)
 
     # -----------------------------------------------------
-    # 3. Insert Embedding rows
+    # 3. Insert Embedding rows (binary COPY)
     # -----------------------------------------------------
+    embeddings_created = copy_embeddings(
+        db,
+        (
+            (version_id, source_type, ref_id, text, vec, current_embedding_model)
+            for (source_type, ref_id, text), vec in zip(content_pieces, vectors)
+        ),
+    )
 
-    current_embedding_model = get_current_embedding_model_name()
-    provider = get_effective_providers()["embedding"]
-    for (source_type, ref_id, text), vec in zip(content_pieces, vectors):
-        row = Embedding(
-            drawing_version_id=version_id,
-            source_type=source_type,
-            source_ref_id=ref_id,
-            content=text,
-            embedding=vec,
-            model_name=current_embedding_model,  # based on security switch
-            metadata={"provider": provider},
-        )
-        db.add(row)
-        embeddings_created += 1
-
-    return embeddings_created
+    return embeddings_created + len(carried)
@@ -0,0 +1,121 @@
+# app/services/http_clients.py
+"""
+Application-lifetime HTTP client registry.
+
+Provider calls (Ollama embeddings, chat, streaming chat; OpenAI chat,
+embeddings and summaries) share pooled httpx.AsyncClient instances instead
+of opening a client per request, so keep-alive connections are reused
+across requests.
+
+- FastAPI: startup_http_clients() / shutdown_http_clients() are wired to
+  the app's startup / shutdown events.
+- Workers and CLIs: clients are created lazily on first use; call
+  shutdown_http_clients() before the event loop exits.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_openai_client: Optional[AsyncOpenAI] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _http2() -> bool:
+    http2 = settings.http_client_http2
+    if http2 and not _http2_available():
+        logger.warning("HTTP_CLIENT_HTTP2 is set but the 'h2' package is missing; using HTTP/1.1")
+        http2 = False
+    return http2
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.http_client_max_connections,
+        max_keepalive_connections=settings.http_client_max_keepalive_connections,
+        keepalive_expiry=settings.http_client_keepalive_expiry_seconds,
+    )
+
+
+def _build_client(base_url: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        http2=_http2(),
+        timeout=httpx.Timeout(
+            settings.ollama_timeout_seconds,
+            connect=settings.http_client_connect_timeout_seconds,
+        ),
+        limits=_limits(),
+    )
+
+
+def get_ollama_client() -> httpx.AsyncClient:
+    """
+    Shared client for the Ollama HTTP API (OLLAMA_BASE_URL).
+    """
+    if not settings.ollama_base_url:
+        raise RuntimeError("OLLAMA_BASE_URL is not configured.")
+
+    client = _clients.get("ollama")
+    if client is None or client.is_closed:
+        client = _build_client(str(settings.ollama_base_url))
+        _clients["ollama"] = client
+    return client
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """
+    Shared AsyncOpenAI client for chat, embeddings and summaries. Keeps the
+    SDK's own timeouts but not its retries: embeddings and summaries run
+    their own backoff loops (openai_embed_max_retries, summary_max_retries),
+    and stacking the SDK's on top multiplied the attempts. Calls without a
+    loop of their own opt back in with ``.with_options(max_retries=2)``.
+    """
+    global _openai_client
+    if _openai_client is None or _openai_client.is_closed():
+        _openai_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(http2=_http2(), limits=_limits()),
+        )
+    return _openai_client
+
+
+async def startup_http_clients() -> None:
+    """Create configured clients up front (FastAPI startup)."""
+    if settings.ollama_base_url:
+        get_ollama_client()
+
+
+async def shutdown_http_clients() -> None:
+    """Close every registered client (FastAPI shutdown / worker exit)."""
+    global _openai_client
+
+    closers = [client.aclose for client in _clients.values()]
+    _clients.clear()
+    if _openai_client is not None:
+        closers.append(_openai_client.close)
+        _openai_client = None
+    for close in closers:
+        try:
+            await close()
+        except Exception:
+            logger.exception("Failed to close HTTP client")
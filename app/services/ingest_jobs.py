@@ -0,0 +1,246 @@
+# app/services/ingest_jobs.py
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.orm import Session
+
+from app.db.models import IngestJob
+from app.api.schemas import (
+    IngestArtifacts,
+    IngestJobStatus,
+    IngestResponse,
+    PipelineEvent,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------
+# Producer side (API)
+# ---------------------------------------------------------
+
+def enqueue_ingest_job(
+    db: Session,
+    *,
+    source_filename: str,
+    upload_path: str,
+    document_id: Optional[str],
+    force_resummarize: bool = False,
+) -> IngestJob:
+    """
+    Insert a queued job for an upload that is already on disk.
+    """
+    job = IngestJob(
+        status="queued",
+        source_filename=source_filename,
+        upload_path=upload_path,
+        document_id=document_id,
+        force_resummarize=force_resummarize,
+        events=[],
+        attempts=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    logger.info(
+        "Queued ingest job id=%s for %r (document_id=%s)",
+        job.id,
+        source_filename,
+        document_id,
+    )
+    return job
+
+
+def get_ingest_job(db: Session, job_id: int) -> Optional[IngestJob]:
+    return db.get(IngestJob, job_id)
+
+
+def job_to_status(job: IngestJob) -> IngestJobStatus:
+    return IngestJobStatus(
+        job_id=job.id,
+        status=job.status,
+        source_filename=job.source_filename,
+        document_id=job.document_id,
+        message=job.message,
+        attempts=job.attempts,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        events=[PipelineEvent.model_validate(e) for e in (job.events or [])],
+        artifacts=(
+            IngestArtifacts.model_validate(job.artifacts) if job.artifacts else None
+        ),
+    )
+
+
+# ---------------------------------------------------------
+# Consumer side (workers)
+# ---------------------------------------------------------
+
+def claim_next_ingest_job(
+    db: Session,
+    *,
+    worker_id: str,
+    max_attempts: int,
+) -> Optional[IngestJob]:
+    """
+    Atomically claim the oldest queued job.
+
+    FOR UPDATE SKIP LOCKED lets any number of workers poll the same table
+    without handing the same job to two of them.
+    """
+    stmt = (
+        select(IngestJob)
+        .where(IngestJob.status == "queued")
+        .order_by(IngestJob.created_at.asc(), IngestJob.id.asc())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    # Jobs past max_attempts are failed on the spot and the next row is
+    # tried, so None always means the queue is really empty.
+    while True:
+        job = db.execute(stmt).scalars().first()
+        if job is None:
+            db.rollback()
+            return None
+
+        now = datetime.utcnow()
+        job.attempts = (job.attempts or 0) + 1
+
+        if job.attempts > max_attempts:
+            job.status = "failed"
+            job.message = f"Giving up after {max_attempts} attempt(s)."
+            job.finished_at = now
+            db.commit()
+            logger.warning("Ingest job id=%s exceeded max attempts; marked failed", job.id)
+            continue
+
+        job.status = "running"
+        job.worker_id = worker_id
+        job.started_at = now
+        job.heartbeat_at = now
+        db.commit()
+
+        logger.info("Worker %s claimed ingest job id=%s (attempt %d)", worker_id, job.id, job.attempts)
+        return job
+
+
+def _lock_if_claimed(db: Session, job_id: int, worker_id: str) -> Optional[IngestJob]:
+    """
+    Row-lock the job and return it if `worker_id` still holds its claim.
+
+    A worker whose heartbeat lapsed may have had the job re-queued and
+    handed to another worker; from then on it must not write to the row.
+    """
+    job = db.get(IngestJob, job_id, with_for_update=True, populate_existing=True)
+    if job is not None and job.status == "running" and job.worker_id == worker_id:
+        return job
+    db.rollback()
+    logger.warning(
+        "Worker %s no longer holds ingest job id=%s (status=%s, worker=%s); not writing",
+        worker_id,
+        job_id,
+        job.status if job else None,
+        job.worker_id if job else None,
+    )
+    return None
+
+
+def heartbeat_ingest_job(db: Session, job_id: int, *, worker_id: str) -> bool:
+    """
+    Refresh the heartbeat of a running job. Returns False if `worker_id`
+    lost its claim (the job was re-queued or finished elsewhere).
+    """
+    result = db.execute(
+        update(IngestJob)
+        .where(
+            IngestJob.id == job_id,
+            IngestJob.status == "running",
+            IngestJob.worker_id == worker_id,
+        )
+        .values(heartbeat_at=datetime.utcnow())
+    )
+    db.commit()
+    return (result.rowcount or 0) == 1
+
+
+def append_job_events(
+    db: Session,
+    job_id: int,
+    events: Sequence[PipelineEvent],
+    *,
+    worker_id: str,
+) -> bool:
+    """
+    Persist a batch of pipeline events and refresh the job heartbeat.
+
+    The row is locked and the claim re-checked first, so a worker that lost
+    the job never overwrites the events of the worker now running it.
+    Returns False (and writes nothing) in that case.
+    """
+    job = _lock_if_claimed(db, job_id, worker_id)
+    if job is None:
+        return False
+    job.events = [*(job.events or []), *(e.model_dump(mode="json") for e in events)]
+    job.heartbeat_at = datetime.utcnow()
+    db.commit()
+    return True
+
+
+def finish_ingest_job(
+    db: Session,
+    job_id: int,
+    result: IngestResponse,
+    *,
+    worker_id: str,
+) -> bool:
+    """
+    Record the final pipeline outcome. Events were already persisted
+    through append_job_events, so they are not rewritten here.
+
+    Returns False (and writes nothing) if `worker_id` lost its claim.
+    """
+    job = _lock_if_claimed(db, job_id, worker_id)
+    if job is None:
+        return False
+    job.status = "succeeded" if result.success else "failed"
+    job.message = result.message
+    job.document_id = result.document_id or job.document_id
+    job.artifacts = result.artifacts.model_dump(mode="json") if result.artifacts else None
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+    logger.info("Ingest job id=%s finished with status=%s", job.id, job.status)
+    return True
+
+
+def requeue_stale_ingest_jobs(db: Session, *, stale_after_seconds: int) -> int:
+    """
+    Put running jobs whose worker stopped heart-beating back on the queue
+    (e.g. the worker process was killed mid-ingest).
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+    result = db.execute(
+        update(IngestJob)
+        .where(
+            and_(
+                IngestJob.status == "running",
+                or_(
+                    IngestJob.heartbeat_at.is_(None),
+                    IngestJob.heartbeat_at < cutoff,
+                ),
+            )
+        )
+        .values(status="queued", worker_id=None)
+    )
+    db.commit()
+
+    count = result.rowcount or 0
+    if count:
+        logger.warning("Re-queued %d stale ingest job(s)", count)
+    return count
@@ -0,0 +1,367 @@
+# app/services/ingest_pipeline.py
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import Settings
+
+from app.ingestion.dwg_to_dxf import convert_dwg_to_dxf_async
+from app.ingestion.dxf_render import render_all_artifacts
+from app.ingestion.dwg_json import run_dwg_to_json_async
+from app.ingestion.entity_sidecar import write_entity_sidecar
+from app.ingestion.files import ingest_dwg_file
+from app.ingestion.hashing import compute_document_id
+from app.ingestion.stage_graph import (
+    Stage,
+    StageOutcome,
+    run_in_process_pool,
+    run_stage_graph,
+)
+
+from app.services.etl_dwg import run_drawing_etl
+from app.services.ai_providers import (
+    build_summary_provider,
+)
+
+from app.api.schemas import (
+    IngestArtifacts,
+    IngestResponse,
+    PipelineEvent,
+)
+
+logger = logging.getLogger(__name__)
+
+EventCallback = Callable[[PipelineEvent], None]
+
+
+def _event(
+    step: str,
+    message: str,
+    level: str = "info",
+    duration_ms: Optional[float] = None,
+) -> PipelineEvent:
+    return PipelineEvent(
+        timestamp=datetime.utcnow(),
+        level=level,
+        step=step,
+        message=message,
+        duration_ms=duration_ms,
+    )
+
+
+class _EventLog(list):
+    """
+    List of PipelineEvents that also forwards every appended event to an
+    optional callback (used by the ingest worker to persist progress).
+    """
+
+    def __init__(self, on_event: Optional[EventCallback] = None) -> None:
+        super().__init__()
+        self._on_event = on_event
+
+    def append(self, event: PipelineEvent) -> None:
+        super().append(event)
+        if self._on_event is not None:
+            try:
+                self._on_event(event)
+            except Exception:
+                logger.exception("Pipeline event callback failed for step=%s", event.step)
+
+
+async def run_ingest_pipeline(
+    *,
+    db: Session,
+    settings: Settings,
+    upload_path: Path,
+    source_filename: str,
+    on_event: Optional[EventCallback] = None,
+    force_resummarize: bool = False,
+) -> IngestResponse:
+    """
+    Run the full DWG pipeline for an already-stored upload.
+
+    The stages form a small dependency graph rather than a fixed sequence:
+
+        ingest ─┬─> dwg_to_dxf ──> render ──────────────┐
+                └─> dwg_to_json ──> entity_sidecar ──────┴─> etl
+
+    so dwg2json runs while DWG→DXF and rendering are in progress, and
+    wall-clock time is roughly max(dxf + render, json + sidecar) + ETL.
+    Rendering and the entity sidecar are CPU-bound and run on the process
+    pool; both are optional, so their failure only downgrades the result
+    to a warning (ETL then streams the raw JSON instead of the sidecar).
+
+    Re-ingesting an identical DWG reuses its stored LLM summary when the
+    provider model and prompt version match; force_resummarize always
+    regenerates it.
+
+    Every event is appended to the returned IngestResponse.events and, if
+    given, passed to on_event as soon as it happens. Stage completion events
+    carry duration_ms.
+    """
+    events: List[PipelineEvent] = _EventLog(on_event)
+    state: Dict[str, Any] = {"document_id": None}
+
+    derived_dir = Path(settings.derived_dir)
+
+    # ======================================================================
+    # Stage bodies
+    # ======================================================================
+    async def stage_ingest(_: Dict[str, Any]) -> Path:
+        document_id = await asyncio.to_thread(compute_document_id, upload_path)
+        state["document_id"] = document_id
+        events.append(_event("hash", f"Computed document_id (SHA256): {document_id}"))
+
+        ingestion_result = await asyncio.to_thread(
+            ingest_dwg_file,
+            src_path=upload_path,
+            ingested_dir=Path(settings.ingested_dir),
+        )
+        derived_dir.mkdir(parents=True, exist_ok=True)
+        events.append(_event("ingest", f"Ingested DWG to {ingestion_result.ingested_path}"))
+        return ingestion_result.ingested_path
+
+    async def stage_dwg_to_dxf(inputs: Dict[str, Any]) -> Path:
+        events.append(
+            _event("dwg_to_dxf", f"Running dwg2dxf using {settings.dwg2dxf_path}")
+        )
+        return await convert_dwg_to_dxf_async(
+            ingested_dwg_path=inputs["ingest"],
+            derived_dir=derived_dir,
+            dwg2dxf_path=settings.dwg2dxf_path,
+            timeout=settings.external_tool_timeout_seconds,
+        )
+
+    async def stage_render(inputs: Dict[str, Any]):
+        dxf_path = inputs["dwg_to_dxf"]
+        document_id = state["document_id"]
+        events.append(
+            _event("render", f"Rendering PDF, PNG and thumbnail from {dxf_path}")
+        )
+        # One DXF parse + one draw pass feeds all three outputs.
+        rendered = await run_in_process_pool(
+            render_all_artifacts,
+            dxf_path,
+            pdf_path=derived_dir / f"{document_id}.pdf",
+            png_path=derived_dir / f"{document_id}.png",
+            thumbnail_path=derived_dir / f"{document_id}_thumbnail.png",
+            dpi=300,
+            thumbnail_max_size=512,
+        )
+        for step, key, label, path in (
+            ("render_pdf", "pdf", "PDF", rendered.pdf_path),
+            ("render_png", "png", "PNG", rendered.png_path),
+            ("render_thumbnail", "thumbnail", "Thumbnail", rendered.thumbnail_path),
+        ):
+            if path is not None:
+                events.append(_event(step, f"{label} rendered: {path}"))
+            else:
+                events.append(
+                    _event(
+                        step,
+                        f"{label} render failed: {rendered.errors.get(key)}",
+                        "warning",
+                    )
+                )
+        return rendered
+
+    async def stage_dwg_to_json(inputs: Dict[str, Any]) -> Path:
+        events.append(_event("dwg_to_json", "Running dwg_to_json extractor..."))
+        return await run_dwg_to_json_async(
+            ingested_dwg_path=inputs["ingest"],
+            derived_dir=derived_dir,
+            dwg_to_json_path=settings.dwg2json_path,
+            timeout=settings.external_tool_timeout_seconds,
+        )
+
+    async def stage_entity_sidecar(inputs: Dict[str, Any]) -> Path:
+        events.append(_event("entity_sidecar", "Writing entity sidecar..."))
+        return await run_in_process_pool(write_entity_sidecar, inputs["dwg_to_json"])
+
+    async def stage_etl(inputs: Dict[str, Any]):
+        rendered = inputs["render"]
+        events.append(_event("etl", "Starting ETL processing..."))
+        provider_name = getattr(settings, "ai_provider", "openai")
+        summary_provider = build_summary_provider(provider_name)
+
+        try:
+            return await run_drawing_etl(
+                db=db,
+                document_id=state["document_id"],
+                source_filename=source_filename,
+                json_path=inputs["dwg_to_json"],
+                dwg_path=inputs["ingest"],
+                dxf_path=inputs["dwg_to_dxf"],
+                pdf_path=rendered.pdf_path if rendered else None,
+                png_path=rendered.png_path if rendered else None,
+                thumbnail_path=rendered.thumbnail_path if rendered else None,
+                summary_provider=summary_provider,
+                force_resummarize=force_resummarize,
+            )
+        except BaseException:
+            db.rollback()
+            raise
+
+    stages = [
+        Stage("ingest", stage_ingest),
+        Stage("dwg_to_dxf", stage_dwg_to_dxf, deps=("ingest",)),
+        Stage("render", stage_render, deps=("dwg_to_dxf",), required=False),
+        Stage("dwg_to_json", stage_dwg_to_json, deps=("ingest",)),
+        Stage(
+            "entity_sidecar",
+            stage_entity_sidecar,
+            deps=("dwg_to_json",),
+            required=False,
+        ),
+        Stage(
+            "etl",
+            stage_etl,
+            deps=("ingest", "dwg_to_dxf", "render", "dwg_to_json", "entity_sidecar"),
+        ),
+    ]
+
+    # ======================================================================
+    # Per-stage completion events (timings / failures)
+    # ======================================================================
+    def on_stage_done(outcome: StageOutcome) -> None:
+        name = outcome.name
+        if outcome.ok:
+            if name == "dwg_to_dxf":
+                message = f"DXF created: {outcome.result}"
+            elif name == "dwg_to_json":
+                message = f"JSON created: {outcome.result}"
+            elif name == "entity_sidecar":
+                message = f"Entity sidecar created: {outcome.result}"
+            elif name == "etl":
+                etl_result = outcome.result
+                message = (
+                    f"ETL complete: {etl_result.num_dimensions} dims, "
+                    f"{etl_result.num_notes} notes, {etl_result.num_embeddings} embeddings"
+                )
+                if etl_result.num_carried_forward:
+                    message += (
+                        f" ({etl_result.num_carried_forward} unchanged entities "
+                        "carried forward from the previous version)"
+                    )
+                if etl_result.summary_reused:
+                    message += " (existing summary reused)"
+            else:
+                message = f"Stage {name} finished"
+            events.append(_event(name, message, duration_ms=outcome.duration_ms))
+        elif outcome.status == "failed":
+            exc = outcome.error
+            if name == "dwg_to_dxf":
+                logger.error("DWG→DXF failed", exc_info=exc)
+                message, level = f"DXF conversion failed: {exc}", "error"
+            elif name == "render":
+                logger.error("DXF render failed", exc_info=exc)
+                message, level = f"DXF render failed: {exc}", "warning"
+            elif name == "dwg_to_json":
+                logger.error("DWG→JSON failed", exc_info=exc)
+                message, level = f"JSON conversion failed: {exc}", "error"
+            elif name == "entity_sidecar":
+                logger.error("Entity sidecar failed", exc_info=exc)
+                message, level = f"Entity sidecar failed: {exc}", "warning"
+            elif name == "etl":
+                logger.error("ETL failed", exc_info=exc)
+                message, level = f"ETL failed: {exc}", "error"
+            else:
+                logger.error("Stage %s failed", name, exc_info=exc)
+                message, level = f"Unhandled error: {exc}", "error"
+            events.append(_event(name, message, level, duration_ms=outcome.duration_ms))
+        elif outcome.status == "cancelled":
+            events.append(
+                _event(name, "Cancelled after an earlier failure", "warning",
+                       duration_ms=outcome.duration_ms)
+            )
+
+    events.append(
+        _event("upload", f"Processing upload {source_filename!r} from {upload_path}")
+    )
+
+    try:
+        graph = await run_stage_graph(stages, on_stage_done=on_stage_done)
+    except Exception as exc:
+        logger.exception("Unhandled error during DWG ingestion.")
+        events.append(
+            _event("unhandled_error", f"Unhandled error: {exc}", "error")
+        )
+        return IngestResponse(
+            success=False,
+            document_id=state["document_id"],
+            message="Ingestion failed due to internal error.",
+            events=list(events),
+            artifacts=None,
+        )
+
+    document_id = state["document_id"]
+
+    def _result(name: str) -> Any:
+        outcome = graph[name]
+        return outcome.result if outcome.ok else None
+
+    ingested_dwg = _result("ingest")
+    dxf_path = _result("dwg_to_dxf")
+    rendered = _result("render")
+    json_path = _result("dwg_to_json")
+
+    artifacts = IngestArtifacts(
+        dwg_path=str(ingested_dwg) if ingested_dwg else None,
+        dxf_path=str(dxf_path) if dxf_path else None,
+        pdf_path=str(rendered.pdf_path) if rendered and rendered.pdf_path else None,
+        png_path=str(rendered.png_path) if rendered and rendered.png_path else None,
+        thumbnail_path=(
+            str(rendered.thumbnail_path)
+            if rendered and rendered.thumbnail_path
+            else None
+        ),
+        json_path=str(json_path) if json_path else None,
+    )
+
+    # First failing required stage decides the top-level message.
+    for name, message in (
+        ("ingest", "Ingestion failed due to internal error."),
+        ("dwg_to_dxf", "DWG ingestion failed during DWG→DXF."),
+        ("dwg_to_json", "DWG ingestion failed during DWG→JSON."),
+        ("etl", "ETL failed."),
+    ):
+        if graph[name].status == "failed":
+            return IngestResponse(
+                success=False,
+                document_id=document_id,
+                message=message,
+                events=list(events),
+                artifacts=artifacts if ingested_dwg else None,
+            )
+
+    if not graph["etl"].ok:
+        # Nothing failed outright but ETL never ran (e.g. cancellation).
+        return IngestResponse(
+            success=False,
+            document_id=document_id,
+            message="Ingestion failed due to internal error.",
+            events=list(events),
+            artifacts=artifacts,
+        )
+
+    events.append(
+        _event(
+            "complete",
+            "DWG ingestion + ETL completed successfully.",
+            duration_ms=graph.duration_ms,
+        )
+    )
+
+    return IngestResponse(
+        success=True,
+        document_id=document_id,
+        message="DWG fully processed, summarized, and embedded.",
+        events=list(events),
+        artifacts=artifacts,
+    )
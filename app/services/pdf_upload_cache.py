@@ -0,0 +1,193 @@
+# app/services/pdf_upload_cache.py
+"""
+Provider file-id cache for drawing PDFs.
+
+Summarization attaches the drawing PDF through the provider's files API.
+Instead of uploading the same multi-megabyte PDF on every re-ingest or
+/drawings/summarize call, callers:
+
+  1. hash the PDF bytes (pdf_sha256)
+  2. reuse get_cached_file_id(sha, provider) if it is still valid
+  3. otherwise upload and remember_file_id(...)
+  4. if the provider rejects a cached id (deleted / expired remotely),
+     forget_file_id(...) and upload again
+
+Entries expire after PDF_UPLOAD_CACHE_TTL_HOURS. The ingest worker
+periodically calls purge_expired_uploads(), which deletes expired files
+from the provider and then drops their rows.
+
+All functions are synchronous (own short sessions); async callers use
+asyncio.to_thread. Cache failures are logged and treated as misses.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from openai import NotFoundError, OpenAI
+from sqlalchemy import delete, select
+
+from app.config import get_settings
+from app.db.models import PdfUpload
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_openai_client: Optional[OpenAI] = None
+
+
+def pdf_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _enabled() -> bool:
+    return settings.pdf_upload_cache_ttl_hours > 0
+
+
+def get_cached_file_id(sha256: str, provider: str) -> Optional[str]:
+    """Return the provider file_id for this PDF if it has not expired."""
+    if not _enabled():
+        return None
+    try:
+        with SessionLocal() as db:
+            return db.scalar(
+                select(PdfUpload.file_id).where(
+                    PdfUpload.pdf_sha256 == sha256,
+                    PdfUpload.provider == provider,
+                    PdfUpload.expires_at > datetime.now(timezone.utc),
+                )
+            )
+    except Exception:
+        logger.exception("PDF upload cache lookup failed; uploading again")
+        return None
+
+
+def remember_file_id(
+    sha256: str,
+    provider: str,
+    file_id: str,
+    size_bytes: Optional[int] = None,
+) -> None:
+    """
+    Record a fresh upload. If a row for this PDF already exists (expired,
+    or written by a concurrent upload), it is replaced and the file it
+    pointed to is deleted from the provider.
+    """
+    if not _enabled():
+        return
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(hours=settings.pdf_upload_cache_ttl_hours)
+    replaced: Optional[str] = None
+    try:
+        with SessionLocal() as db:
+            row = db.get(PdfUpload, (sha256, provider), with_for_update=True)
+            if row is None:
+                db.add(
+                    PdfUpload(
+                        pdf_sha256=sha256,
+                        provider=provider,
+                        file_id=file_id,
+                        size_bytes=size_bytes,
+                        created_at=now,
+                        expires_at=expires_at,
+                    )
+                )
+            else:
+                if row.file_id != file_id:
+                    replaced = row.file_id
+                row.file_id = file_id
+                row.size_bytes = size_bytes
+                row.created_at = now
+                row.expires_at = expires_at
+            db.commit()
+    except Exception:
+        logger.exception("PDF upload cache write failed; continuing without it")
+        return
+
+    if replaced:
+        delete_remote_file(provider, replaced)
+
+
+def forget_file_id(sha256: str, provider: str, file_id: str) -> None:
+    """Drop a cached id the provider no longer accepts."""
+    try:
+        with SessionLocal() as db:
+            db.execute(
+                delete(PdfUpload).where(
+                    PdfUpload.pdf_sha256 == sha256,
+                    PdfUpload.provider == provider,
+                    PdfUpload.file_id == file_id,
+                )
+            )
+            db.commit()
+    except Exception:
+        logger.exception("Failed to drop stale PDF upload %s", file_id)
+
+
+# ---------------------------------------------------------
+# Cleanup
+# ---------------------------------------------------------
+
+def _get_openai_client() -> OpenAI:
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    return _openai_client
+
+
+def delete_remote_file(provider: str, file_id: str) -> bool:
+    """
+    Delete an uploaded file from the provider. A file that is already gone
+    counts as deleted.
+    """
+    try:
+        if provider == "openai":
+            try:
+                _get_openai_client().files.delete(file_id)
+            except NotFoundError:
+                pass
+            return True
+        logger.warning("No file cleanup for provider %r; dropping %s", provider, file_id)
+        return True
+    except Exception:
+        logger.exception("Failed to delete %s file %s", provider, file_id)
+        return False
+
+
+def purge_expired_uploads(limit: int = 100) -> int:
+    """
+    Delete up to `limit` expired uploads from their provider and drop the
+    rows. Rows whose remote delete fails are kept for the next run.
+
+    Returns the number of rows removed.
+    """
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(PdfUpload.pdf_sha256, PdfUpload.provider, PdfUpload.file_id)
+            .where(PdfUpload.expires_at <= datetime.now(timezone.utc))
+            .order_by(PdfUpload.expires_at)
+            .limit(limit)
+        ).all()
+
+        removed = 0
+        for sha256, provider, file_id in rows:
+            if not delete_remote_file(provider, file_id):
+                continue
+            db.execute(
+                delete(PdfUpload).where(
+                    PdfUpload.pdf_sha256 == sha256,
+                    PdfUpload.provider == provider,
+                    PdfUpload.file_id == file_id,
+                )
+            )
+            removed += 1
+        db.commit()
+
+    if removed:
+        logger.info("Purged %d expired PDF uploads", removed)
+    return removed
@@ -0,0 +1,128 @@
+# benchmarks/bench_ann_recall.py
+"""
+Recall@k vs. latency for pgvector ANN indexes on a synthetic corpus.
+
+Builds a TEMP table of clustered random vectors in the DATABASE_URL
+database (nothing persistent is created), indexes it with HNSW or ivfflat,
+and sweeps hnsw.ef_search / ivfflat.probes. Ground truth is computed
+exactly in numpy.
+
+    python -m benchmarks.bench_ann_recall --index hnsw --rows 200000 --dim 256
+    python -m benchmarks.bench_ann_recall --index ivfflat --lists 500 --sweep 1,5,10,20,50
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+from pgvector.psycopg import register_vector
+from sqlalchemy import text
+
+from app.db.session import engine
+
+
+def _corpus(rows: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=rows)
+    data = centers[labels] + 0.35 * rng.normal(size=(rows, dim)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def _exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> list[set[int]]:
+    # Vectors are unit-normalized, so max dot product == min cosine distance.
+    sims = queries @ corpus.T
+    top = np.argpartition(-sims, k, axis=1)[:, :k]
+    return [set((idx + 1).tolist()) for idx in top]  # ids are 1-based
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--index", choices=["hnsw", "ivfflat"], default="hnsw")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--lists", type=int, default=100)
+    parser.add_argument(
+        "--sweep",
+        default=None,
+        help="Comma-separated ef_search (hnsw) or probes (ivfflat) values.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sweep = (
+        [int(v) for v in args.sweep.split(",")]
+        if args.sweep
+        else ([10, 20, 40, 80, 160, 320] if args.index == "hnsw" else [1, 2, 5, 10, 20, 50])
+    )
+    knob = "hnsw.ef_search" if args.index == "hnsw" else "ivfflat.probes"
+
+    corpus = _corpus(args.rows, args.dim, args.clusters, args.seed)
+    queries = _corpus(args.queries, args.dim, args.clusters, args.seed + 1)
+    truth = _exact_top_k(corpus, queries, args.k)
+
+    with engine.connect() as conn:
+        raw = conn.connection.driver_connection
+        register_vector(raw)
+
+        conn.execute(
+            text(f"CREATE TEMP TABLE bench_vectors (id bigint PRIMARY KEY, embedding vector({args.dim}))")
+        )
+        t0 = time.perf_counter()
+        with raw.cursor() as cur:
+            with cur.copy("COPY bench_vectors (id, embedding) FROM STDIN WITH (FORMAT BINARY)") as copy:
+                copy.set_types(["int8", "vector"])
+                for i, vec in enumerate(corpus, start=1):
+                    copy.write_row((i, vec))
+        print(f"loaded {args.rows} x {args.dim} vectors in {time.perf_counter() - t0:.1f}s")
+
+        if args.index == "hnsw":
+            ddl = (
+                "CREATE INDEX ON bench_vectors USING hnsw (embedding vector_cosine_ops) "
+                f"WITH (m = {args.m}, ef_construction = {args.ef_construction})"
+            )
+        else:
+            ddl = (
+                "CREATE INDEX ON bench_vectors USING ivfflat (embedding vector_cosine_ops) "
+                f"WITH (lists = {args.lists})"
+            )
+        t0 = time.perf_counter()
+        conn.execute(text(ddl))
+        conn.execute(text("ANALYZE bench_vectors"))
+        print(f"built {args.index} index in {time.perf_counter() - t0:.1f}s\n")
+
+        print(f"{knob:>16} {'recall@' + str(args.k):>10} {'p50 ms':>9} {'p95 ms':>9}")
+        for value in sweep:
+            conn.execute(text("SELECT set_config(:knob, :v, false)"), {"knob": knob, "v": str(value)})
+            recalls: list[float] = []
+            latencies: list[float] = []
+            with raw.cursor() as cur:
+                for q, expected in zip(queries, truth):
+                    t0 = time.perf_counter()
+                    cur.execute(
+                        "SELECT id FROM bench_vectors ORDER BY embedding <=> %s LIMIT %s",
+                        (q, args.k),
+                    )
+                    got = {row[0] for row in cur.fetchall()}
+                    latencies.append((time.perf_counter() - t0) * 1000.0)
+                    recalls.append(len(got & expected) / args.k)
+            latencies.sort()
+            p95 = latencies[int(0.95 * (len(latencies) - 1))]
+            print(
+                f"{value:>16} {statistics.mean(recalls):>10.3f} "
+                f"{statistics.median(latencies):>9.2f} {p95:>9.2f}"
+            )
+
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_entity_sidecar.py
+"""
+Entity table load time: parsing dwg_to_json output vs. the memory-mapped
+entity sidecar (app/ingestion/entity_sidecar.py).
+
+Generates a synthetic drawing JSON in a temp directory, so it needs no
+database or DWG tools:
+
+    python -m benchmarks.bench_entity_sidecar --entities 200000 --annotated 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from app.ingestion.dwg_json import iter_dwg_entities
+from app.ingestion.entity_sidecar import open_entity_table, write_entity_sidecar
+
+
+def _is_annotation(type_name: str) -> bool:
+    t = type_name.lower()
+    return "dim" in t or "text" in t
+
+
+def _synthetic_entity(i: int, rnd: random.Random, annotated: float) -> Dict[str, Any]:
+    ent: Dict[str, Any] = {"index": i, "handle": f"{i + 0x100:X}", "owner_handle": "1F"}
+    r = rnd.random()
+    if r < annotated / 2:
+        ent.update(
+            type="DIMENSION_LINEAR", raw_type=20, layer="DIM",
+            text=f"<> ±0.{i % 10}", value=rnd.uniform(1, 500), units="mm",
+            geometry={"defpoint": [i, i, 0], "text_midpoint": [i, i + 1, 0]},
+        )
+    elif r < annotated:
+        ent.update(
+            type="MTEXT", raw_type=44, layer="NOTES",
+            text=f"NOTE {i}: BREAK ALL SHARP EDGES",
+            geometry={"insert": [i, 0, 0], "height": 2.5},
+        )
+    else:
+        ent.update(
+            type=rnd.choice(["LINE", "ARC", "CIRCLE", "LWPOLYLINE"]), raw_type=19,
+            layer=rnd.choice(["0", "OUTLINE", "HIDDEN", "CENTER"]),
+            geometry={"points": [[rnd.random() * 100, rnd.random() * 100, 0] for _ in range(4)]},
+        )
+    return ent
+
+
+def _write_json(path: Path, entities: int, annotated: float) -> None:
+    rnd = random.Random(0)
+    doc = {
+        "schema_version": "1.0",
+        "file": "bench.dwg",
+        "header": {"INSUNITS": 4},
+        "layers": [],
+        "entities": [_synthetic_entity(i, rnd, annotated) for i in range(entities)],
+    }
+    path.write_text(json.dumps(doc), encoding="utf-8")
+
+
+def _timed(label: str, fn: Callable[[], Any]) -> Any:
+    t0 = time.perf_counter()
+    result = fn()
+    print(f"{label:<28} {time.perf_counter() - t0:8.3f} s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--entities", type=int, default=200_000)
+    parser.add_argument("--annotated", type=float, default=0.15,
+                        help="fraction of dimension / text entities")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "bench.json"
+        _write_json(json_path, args.entities, args.annotated)
+        print(f"{json_path.stat().st_size / 1e6:.1f} MB, {args.entities} entities")
+
+        def stream_annotations() -> List[Dict[str, Any]]:
+            return [e for e in iter_dwg_entities(json_path) if _is_annotation(e.get("type", ""))]
+
+        _timed("json.load", lambda: json.loads(json_path.read_bytes()))
+        expected = _timed("stream dims/notes", stream_annotations)
+        _timed("write sidecar (ingest)", lambda: write_entity_sidecar(json_path))
+
+        def open_and_count():
+            table = open_entity_table(json_path)
+            table.type_counts()
+            table.layer_counts()
+            return table
+
+        table = _timed("open sidecar + counts", open_and_count)
+        with table:
+            rows = _timed("select dims/notes", lambda: table.select_types(_is_annotation))
+            got = _timed("sidecar dims/notes", lambda: list(table.raw_entities(rows)))
+        assert got == expected
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# benchmarks/bench_etl_bulk_insert.py
+"""
+Rows/second for the ETL write path: per-object ORM inserts (the old
+db.add() loop) vs. the bulk helpers in app/db/bulk.py.
+
+Runs against DATABASE_URL inside a single transaction that is rolled back,
+so it leaves no data behind:
+
+    python -m benchmarks.bench_etl_bulk_insert --entities 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.db.bulk import bulk_insert_returning_ids, copy_embeddings
+from app.db.models import Dimension, Drawing, DrawingVersion, Embedding, Note
+from app.db.session import SessionLocal
+
+EMBEDDING_DIM = 1536
+
+
+def _synthetic_rows(version_id: int, n: int) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    dims: List[Dict[str, Any]] = []
+    notes: List[Dict[str, Any]] = []
+    for i in range(n):
+        if i % 2 == 0:
+            dims.append(
+                {
+                    "drawing_version_id": version_id,
+                    "json_index": i,
+                    "dim_type": "DIMENSION_LINEAR",
+                    "raw_type_code": 20,
+                    "layer": "DIM",
+                    "handle": f"{i:X}",
+                    "owner_handle": "1F",
+                    "dim_text": f"<> ±0.{i % 10}",
+                    "dim_value": float(i) / 10.0,
+                    "units": "mm",
+                    "geometry": {"defpoint": [i, i, 0]},
+                }
+            )
+        else:
+            notes.append(
+                {
+                    "drawing_version_id": version_id,
+                    "json_index": i,
+                    "note_type": "general",
+                    "text": f"NOTE {i}: BREAK ALL SHARP EDGES",
+                    "layer": "TEXT",
+                    "handle": f"{i:X}",
+                    "geometry": {"insert": [i, 0, 0]},
+                }
+            )
+    return dims, notes
+
+
+def _vectors(n: int) -> List[List[float]]:
+    rnd = random.Random(0)
+    return [[rnd.random() for _ in range(EMBEDDING_DIM)] for _ in range(n)]
+
+
+def _orm_path(db: Session, version_id: int, dims, notes, vectors) -> int:
+    dim_objs = [Dimension(**row) for row in dims]
+    note_objs = [Note(**row) for row in notes]
+    db.add_all(dim_objs)
+    db.add_all(note_objs)
+    db.flush()
+    refs = [("dimension", d.id, d.dim_text) for d in dim_objs] + [
+        ("note", n.id, n.text) for n in note_objs
+    ]
+    for (source_type, ref_id, text), vec in zip(refs, vectors):
+        db.add(
+            Embedding(
+                drawing_version_id=version_id,
+                source_type=source_type,
+                source_ref_id=ref_id,
+                content=text,
+                embedding=vec,
+                model_name="bench",
+            )
+        )
+    db.flush()
+    return len(dims) + len(notes) + len(refs)
+
+
+def _bulk_path(db: Session, version_id: int, dims, notes, vectors) -> int:
+    dim_ids = bulk_insert_returning_ids(db, Dimension, dims)
+    note_ids = bulk_insert_returning_ids(db, Note, notes)
+    refs = [("dimension", i, r["dim_text"]) for i, r in zip(dim_ids, dims)] + [
+        ("note", i, r["text"]) for i, r in zip(note_ids, notes)
+    ]
+    written = copy_embeddings(
+        db,
+        (
+            (version_id, source_type, ref_id, text, vec, "bench")
+            for (source_type, ref_id, text), vec in zip(refs, vectors)
+        ),
+    )
+    return len(dim_ids) + len(note_ids) + written
+
+
+def _run(label: str, fn: Callable[..., int], entities: int, vectors) -> None:
+    with SessionLocal() as db:
+        try:
+            drawing = Drawing(document_id_sha=f"bench-{uuid.uuid4().hex}")
+            db.add(drawing)
+            db.flush()
+            version = DrawingVersion(
+                drawing_id=drawing.id,
+                dwg_sha256=drawing.document_id_sha,
+                source_filename="bench.dwg",
+                is_active=True,
+            )
+            db.add(version)
+            db.flush()
+
+            dims, notes = _synthetic_rows(version.id, entities)
+            t0 = time.perf_counter()
+            rows = fn(db, version.id, dims, notes, vectors)
+            elapsed = time.perf_counter() - t0
+        finally:
+            db.rollback()
+
+    print(f"{label:<6} {rows:>8} rows  {elapsed:8.3f} s  {rows / elapsed:>10.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--entities", type=int, default=10_000)
+    args = parser.parse_args()
+
+    vectors = _vectors(args.entities)
+    _run("orm", _orm_path, args.entities, vectors)
+    _run("bulk", _bulk_path, args.entities, vectors)
+
+
+if __name__ == "__main__":
+    main()
@@ -47,13 +47,14 @@ for f in "${dwg_files[@]}"; do
     # Try to extract document_id if jq is available
     if command -v jq >/dev/null 2>&1; then
       doc_id=$(echo "$body" | jq -r '.document_id // empty')
-      if [[ -n "$doc_id" ]]; then
-        echo "  ✅ Successfully ingested ${fname} (document_id: ${doc_id})"
+      job_id=$(echo "$body" | jq -r '.job_id // empty')
+      if [[ -n "$job_id" ]]; then
+        echo "  ✅ Queued ${fname} (job_id: ${job_id}, document_id: ${doc_id})"
       else
-        echo "  ✅ Successfully ingested ${fname}"
+        echo "  ✅ Queued ${fname}"
       fi
     else
-      echo "  ✅ Successfully ingested ${fname}"
+      echo "  ✅ Queued ${fname}"
     fi
   else
     echo "  ❌ Failed to ingest ${fname} (HTTP ${http_code})"
@@ -64,4 +65,4 @@ for f in "${dwg_files[@]}"; do
   echo
 done
 
-echo "=== DWG batch ingestion completed for ${count} file(s). ==="
+echo "=== Queued ${count} file(s); ingest workers will process them. ==="
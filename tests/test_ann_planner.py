@@ -0,0 +1,97 @@
+# tests/test_ann_planner.py
+"""
+nearest_embedding_ids() strategy choice. The DB-facing helpers are stubbed;
+only the planner's decisions are under test.
+"""
+
+import pytest
+
+from app.services import ann_search
+
+QUERY = [0.0] * 4
+
+
+class FakeDB:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, stmt, *args):
+        self.statements.append(stmt)
+        return []
+
+
+@pytest.fixture
+def planner(monkeypatch):
+    calls = []
+
+    def install(*, hidden=(), subset_rows=0, overfetch_filled=True):
+        monkeypatch.setattr(ann_search, "hidden_version_ids", lambda db: list(hidden))
+        monkeypatch.setattr(ann_search, "apply_ann_search_params", lambda db, **kw: None)
+
+        def bounded_count(db, clauses, cap):
+            calls.append(("count", len(clauses)))
+            return min(subset_rows, cap)
+
+        def exact_scan(db, query_vec, clauses, k):
+            calls.append(("exact", len(clauses)))
+            return [(1, 0.1)]
+
+        def overfetch(db, query_vec, version, types, hidden_ids, k, ef, probes):
+            calls.append(("overfetch", tuple(hidden_ids)))
+            return [(2, 0.2)], overfetch_filled
+
+        monkeypatch.setattr(ann_search, "_bounded_count", bounded_count)
+        monkeypatch.setattr(ann_search, "_exact_scan", exact_scan)
+        monkeypatch.setattr(ann_search, "_ann_overfetch", overfetch)
+        return calls
+
+    return install
+
+
+def test_unfiltered_without_hidden_versions_is_a_plain_ann_scan(planner):
+    calls = planner()
+    db = FakeDB()
+
+    ann_search.nearest_embedding_ids(db, QUERY, k=5)
+
+    assert calls == [] and len(db.statements) == 1
+
+
+def test_hidden_versions_do_not_force_the_filtered_planner(planner):
+    calls = planner(hidden=(7, 8), overfetch_filled=False)
+
+    rows = ann_search.nearest_embedding_ids(FakeDB(), QUERY, k=5)
+
+    # No count, and no exact scan even when the over-fetch comes up short.
+    assert calls == [("overfetch", (7, 8))]
+    assert rows == [(2, 0.2)]
+
+
+def test_small_filtered_subset_is_scanned_exactly_without_hidden_versions(planner):
+    calls = planner(hidden=(7,), subset_rows=10)
+
+    ann_search.nearest_embedding_ids(FakeDB(), QUERY, k=5, drawing_version_id=3)
+
+    # Count on the caller's filter only; the exact scan also drops hidden rows.
+    assert calls == [("count", 1), ("exact", 2)]
+
+
+def test_large_filtered_subset_falls_back_to_exact_when_overfetch_is_short(planner):
+    calls = planner(subset_rows=10**9, overfetch_filled=False)
+
+    ann_search.nearest_embedding_ids(FakeDB(), QUERY, k=5, source_types=["note"])
+
+    assert calls == [("count", 1), ("overfetch", ()), ("exact", 1)]
+
+
+def test_fits_exact_scan_uses_caller_supplied_hidden_ids(planner, monkeypatch):
+    calls = planner(subset_rows=10)
+
+    def no_lookup(db):
+        raise AssertionError("hidden_version_ids should not be queried")
+
+    monkeypatch.setattr(ann_search, "hidden_version_ids", no_lookup)
+
+    assert ann_search.fits_exact_scan(FakeDB(), drawing_version_id=3, hidden_ids=())
+    assert ann_search.fits_exact_scan(FakeDB(), drawing_version_id=3, hidden_ids=[7])
+    assert calls == [("count", 1), ("count", 2)]
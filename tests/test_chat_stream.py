@@ -0,0 +1,113 @@
+# tests/test_chat_stream.py
+"""
+/chat/drawing/stream event order and error handling, with retrieval and the
+chat provider stubbed out.
+"""
+
+import json
+from typing import List, Tuple
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.routers import chat as chat_routes
+from app.api.schemas import RetrievedContextItem
+from app.services import chat_drawing
+from app.services.chat_drawing import PreparedChat
+
+STREAM_URL = "/api/v1/chat/drawing/stream"
+
+
+def _prepared() -> PreparedChat:
+    return PreparedChat(
+        drawing_version_id=7,
+        document_id="abc123",
+        contexts=[
+            RetrievedContextItem(
+                chunk_id=1,
+                source_type="note",
+                drawing_version_id=7,
+                matched_text="BREAK ALL SHARP EDGES",
+                similarity_score=0.91,
+            )
+        ],
+        system_prompt="system",
+        user_content="question + context",
+    )
+
+
+def _parse_sse(body: str) -> List[Tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def fake_chat(monkeypatch):
+    async def prepare_chat(db, payload):
+        return _prepared()
+
+    monkeypatch.setattr(chat_routes, "prepare_chat", prepare_chat)
+
+    def install(stream_fn):
+        monkeypatch.setattr(chat_drawing, "_stream_chat_model", stream_fn)
+
+    return install
+
+
+async def _post(api_client) -> Tuple[int, List[Tuple[str, dict]]]:
+    resp = await api_client.post(
+        STREAM_URL, json={"user_message": "deburr?", "drawing_version_id": 7}
+    )
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    return resp.status_code, _parse_sse(resp.text)
+
+
+@pytest.mark.anyio
+async def test_events_arrive_in_order(api_client, fake_chat):
+    async def provider(system_prompt, user_content):
+        for delta in ["Break ", "all ", "edges."]:
+            yield delta
+
+    fake_chat(provider)
+
+    status, events = await _post(api_client)
+
+    assert status == 200
+    assert [name for name, _ in events] == ["contexts", "token", "token", "token", "done"]
+    assert events[0][1]["drawing_version_id"] == 7
+    assert events[0][1]["contexts"][0]["matched_text"] == "BREAK ALL SHARP EDGES"
+    assert [data["text"] for name, data in events if name == "token"] == ["Break ", "all ", "edges."]
+    assert events[-1][1] == {"assistant_reply": "Break all edges."}
+
+
+@pytest.mark.anyio
+async def test_provider_error_ends_stream_with_error_event(api_client, fake_chat):
+    async def provider(system_prompt, user_content):
+        yield "Partial"
+        raise HTTPException(status_code=502, detail="Upstream AI model error: APIConnectionError")
+
+    fake_chat(provider)
+
+    status, events = await _post(api_client)
+
+    assert status == 200
+    assert [name for name, _ in events] == ["contexts", "token", "error"]
+    assert events[-1][1] == {"detail": "Upstream AI model error: APIConnectionError"}
+
+
+@pytest.mark.anyio
+async def test_unexpected_provider_exception_is_reported(api_client, fake_chat):
+    async def provider(system_prompt, user_content):
+        raise RuntimeError("socket closed")
+        yield  # pragma: no cover - makes this an async generator
+
+    fake_chat(provider)
+
+    status, events = await _post(api_client)
+
+    assert status == 200
+    assert [name for name, _ in events] == ["contexts", "error"]
+    assert events[-1][1] == {"detail": "Chat stream error: RuntimeError"}
@@ -0,0 +1,125 @@
+# tests/test_embeddings_ollama.py
+"""
+Ollama embedding transport: batched /api/embed, fallback to per-text
+/api/embeddings on servers without the batch endpoint, and unknown-model
+errors. The Ollama server is stubbed with httpx.MockTransport. Also the
+embed_query cache: stripped cache key and copies handed to callers.
+"""
+
+import json
+from typing import List
+
+import httpx
+import pytest
+
+from app.services import embeddings
+
+
+def _vector(text: str) -> List[float]:
+    return [float(len(text)), float(sum(map(ord, text)) % 997)]
+
+
+class StubOllama:
+    def __init__(self, *, batch_endpoint: bool = True, known_models=("nomic-embed-text",)):
+        self.batch_endpoint = batch_endpoint
+        self.known_models = set(known_models)
+        self.calls: List[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request.url.path)
+        body = json.loads(request.content)
+
+        if request.url.path == "/api/embed":
+            if not self.batch_endpoint:
+                return httpx.Response(404, text="404 page not found")
+            if body["model"] not in self.known_models:
+                return httpx.Response(
+                    404,
+                    json={"error": f'model "{body["model"]}" not found, try pulling it first'},
+                )
+            return httpx.Response(
+                200,
+                json={"model": body["model"], "embeddings": [_vector(t) for t in body["input"]]},
+            )
+
+        if request.url.path == "/api/embeddings":
+            return httpx.Response(200, json={"embedding": _vector(body["prompt"])})
+
+        return httpx.Response(404, text="404 page not found")
+
+
+@pytest.fixture
+def ollama(monkeypatch):
+    def install(stub: StubOllama, *, model: str = "nomic-embed-text", batch_size: int = 2):
+        client = httpx.AsyncClient(
+            base_url="http://ollama.test", transport=httpx.MockTransport(stub)
+        )
+        monkeypatch.setattr(embeddings, "get_ollama_client", lambda: client)
+        monkeypatch.setattr(embeddings.settings, "ollama_base_url", "http://ollama.test")
+        monkeypatch.setattr(embeddings.settings, "ollama_embedding_model", model)
+        monkeypatch.setattr(embeddings.settings, "ollama_embed_batch_size", batch_size)
+        return stub
+
+    monkeypatch.setattr(embeddings, "_ollama_batch_supported", True)
+    monkeypatch.setattr(embeddings, "_ollama_semaphore", None)
+    return install
+
+
+TEXTS = ["A", "BB", "CCC", "DDDD", "EEEEE"]
+
+
+@pytest.mark.anyio
+async def test_batches_texts_through_api_embed(ollama):
+    stub = ollama(StubOllama(), batch_size=2)
+
+    vectors = await embeddings._embed_ollama(TEXTS)
+
+    assert vectors == [_vector(t) for t in TEXTS]
+    assert stub.calls == ["/api/embed"] * 3
+
+
+@pytest.mark.anyio
+async def test_falls_back_to_single_text_endpoint(ollama):
+    stub = ollama(StubOllama(batch_endpoint=False), batch_size=2)
+
+    vectors = await embeddings._embed_ollama(TEXTS)
+
+    assert vectors == [_vector(t) for t in TEXTS]
+    assert stub.calls.count("/api/embeddings") == len(TEXTS)
+    assert embeddings._ollama_batch_supported is False
+
+    # Later calls skip the batch endpoint entirely.
+    stub.calls.clear()
+    assert await embeddings._embed_ollama(["x"]) == [_vector("x")]
+    assert stub.calls == ["/api/embeddings"]
+
+
+@pytest.mark.anyio
+async def test_unknown_model_raises_and_keeps_batching(ollama):
+    ollama(StubOllama(), model="not-pulled")
+
+    with pytest.raises(RuntimeError, match="not found"):
+        await embeddings._embed_ollama(TEXTS)
+
+    assert embeddings._ollama_batch_supported is True
+
+
+@pytest.mark.anyio
+async def test_query_cache_embeds_stripped_text_and_returns_copies(monkeypatch):
+    seen: List[List[str]] = []
+
+    async def fake_embed_texts(texts):
+        seen.append(list(texts))
+        return [_vector(t) for t in texts]
+
+    monkeypatch.setattr(embeddings, "embed_texts", fake_embed_texts)
+    monkeypatch.setattr(embeddings, "_query_cache", embeddings.OrderedDict())
+    monkeypatch.setattr(embeddings.settings, "query_embedding_cache_ttl_seconds", 60)
+    monkeypatch.setattr(embeddings.settings, "query_embedding_cache_size", 8)
+
+    first = await embeddings.embed_query("  bolt hole  ")
+    first.append(-1.0)
+    second = await embeddings.embed_query("bolt hole")
+
+    assert seen == [["bolt hole"]]
+    assert second == _vector("bolt hole")
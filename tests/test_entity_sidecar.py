@@ -0,0 +1,63 @@
+# tests/test_entity_sidecar.py
+"""
+Entity sidecar round trip, staleness check and mapping lifetime.
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.ingestion.dwg_json import iter_dwg_entities
+from app.ingestion.entity_sidecar import open_entity_table, write_entity_sidecar
+
+ENTITIES = [
+    {"index": 0, "type": "LINE", "layer": "0", "handle": "1A", "geometry": {"points": [[0, 0], [1, 1]]}},
+    {"index": 1, "type": "DIMENSION_LINEAR", "layer": "DIM", "handle": "1B",
+     "text": "<> ±0.1", "value": 25.4, "units": "mm"},
+    {"index": 2, "type": "MTEXT", "layer": "NOTES", "handle": "1C",
+     "text": "NOTE: \"BREAK\" ALL {SHARP} EDGES \\P [1]"},
+]
+
+
+@pytest.fixture
+def drawing_json(tmp_path):
+    path = tmp_path / "doc.json"
+    doc = {"schema_version": "1.0", "header": {"INSUNITS": 4}, "entities": ENTITIES}
+    path.write_text(json.dumps(doc, indent=2, ensure_ascii=False), encoding="utf-8")
+    write_entity_sidecar(path)
+    return path
+
+
+def test_round_trip_matches_streaming_parser(drawing_json):
+    with open_entity_table(drawing_json) as table:
+        assert len(table) == len(ENTITIES)
+        assert table.type_counts() == {"LINE": 1, "DIMENSION_LINEAR": 1, "MTEXT": 1}
+        assert table.text(2) == ENTITIES[2]["text"]
+        assert table.handle(1) == "1B"
+        assert float(table.value[1]) == pytest.approx(25.4)
+
+        rows = table.select_types(lambda t: "dim" in t.lower() or "text" in t.lower())
+        assert list(rows) == [1, 2]
+        assert list(table.raw_entities(range(len(table)))) == list(iter_dwg_entities(drawing_json))
+
+
+def test_stale_sidecar_is_ignored(drawing_json):
+    st = drawing_json.stat()
+    os.utime(drawing_json, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert open_entity_table(drawing_json) is None
+
+
+def test_close_refuses_while_a_column_view_is_held(drawing_json):
+    table = open_entity_table(drawing_json)
+    values = table.value  # zero-copy view into the mapping
+    kept = table.value.copy()
+
+    with pytest.raises(BufferError, match="still referenced"):
+        table.close()
+
+    del values
+    table.close()  # succeeds once the view is gone
+    assert kept.tolist() == pytest.approx([np.nan, 25.4, np.nan], nan_ok=True)
@@ -0,0 +1,193 @@
+# tests/test_etl_incremental.py
+"""
+Incremental re-ingest: rows whose handle + content_hash match the base
+version get their embeddings copied forward; changed, new and ambiguous
+(duplicate-handle) rows are embedded again. Bulk helpers, the embedding
+provider and the DB are stubbed.
+"""
+
+import itertools
+from types import SimpleNamespace
+from typing import Dict
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from app.db.models import Dimension, Note
+from app.services import etl_dwg
+
+BASE_VERSION = 1
+NEW_VERSION = 2
+
+
+def _dim(index: int, handle: str, text: str, value: float = 10.0):
+    return SimpleNamespace(
+        index=index, type="DIMENSION_LINEAR", raw_type=0, layer="DIM", handle=handle,
+        owner_handle=None, text=text, value=value, units="mm", geometry=None,
+    )
+
+
+def _note(index: int, handle: str, text: str):
+    return SimpleNamespace(
+        index=index, note_type="general", text=text, layer="NOTES", handle=handle, geometry=None,
+    )
+
+
+def _index(dims=(), notes=()):
+    return SimpleNamespace(dimensions=list(dims), notes=list(notes))
+
+
+class FakeDB:
+    """Answers _rows_by_handle()'s select with the base version's rows."""
+
+    def __init__(self) -> None:
+        self.base: Dict[type, list] = {Dimension: [], Note: []}
+
+    def execute(self, stmt, *args):
+        return list(self.base[stmt.column_descriptions[0]["entity"]])
+
+
+@pytest.fixture
+def etl(monkeypatch):
+    ids = itertools.count(100)
+    calls = SimpleNamespace(forward=[], embedded=[], copied=[])
+
+    def insert_returning_ids(db, model, rows):
+        return [next(ids) for _ in rows]
+
+    def copy_forward(db, *, from_version_id, to_version_id, source_type, id_pairs, model_name):
+        calls.forward.append((source_type, list(id_pairs)))
+        # Every base row has an embedding made with the current model.
+        return [new for (_, new) in id_pairs]
+
+    async def embed_texts(texts):
+        calls.embedded.extend(texts)
+        return [[float(len(t))] for t in texts]
+
+    def copy_embeddings(db, rows):
+        rows = list(rows)
+        calls.copied.extend(rows)
+        return len(rows)
+
+    monkeypatch.setattr(etl_dwg, "bulk_insert_returning_ids", insert_returning_ids)
+    monkeypatch.setattr(etl_dwg, "copy_embeddings_forward", copy_forward)
+    monkeypatch.setattr(etl_dwg, "embed_texts", embed_texts)
+    monkeypatch.setattr(etl_dwg, "copy_embeddings", copy_embeddings)
+    monkeypatch.setattr(etl_dwg, "get_current_embedding_model_name", lambda: "test-model")
+
+    db = FakeDB()
+
+    def ingest_base(index):
+        dim_rows, note_rows = etl_dwg._entity_rows(BASE_VERSION, index)
+        for model, rows in ((Dimension, dim_rows), (Note, note_rows)):
+            db.base[model] = [(next(ids), r["handle"], r["content_hash"]) for r in rows]
+
+    async def ingest(index):
+        dim_rows, note_rows = etl_dwg._entity_rows(NEW_VERSION, index)
+        extracted = etl_dwg._insert_dimensions_and_notes(
+            db=db, dim_rows=dim_rows, note_rows=note_rows, base_version_id=BASE_VERSION
+        )
+        total = await etl_dwg._generate_all_embeddings(
+            db=db,
+            version_id=NEW_VERSION,
+            summary_row=SimpleNamespace(id=9, long_form_description=None, short_description=None),
+            records=extracted.records,
+            unchanged=extracted.unchanged,
+            base_version_id=BASE_VERSION,
+        )
+        return extracted, total
+
+    return db, calls, ingest_base, ingest
+
+
+@pytest.mark.anyio
+async def test_unchanged_rows_are_copied_not_reembedded(etl):
+    db, calls, ingest_base, ingest = etl
+    index = _index([_dim(0, "A1", "<>"), _dim(1, "A2", "R5")], [_note(2, "B1", "BREAK EDGES")])
+    ingest_base(index)
+
+    # Same entities, shuffled in entities[]: json_index is not part of the hash.
+    moved = _index([_dim(5, "A2", "R5"), _dim(6, "A1", "<>")], [_note(7, "B1", "BREAK EDGES")])
+    extracted, total = await ingest(moved)
+
+    assert len(extracted.unchanged) == 3
+    assert [st for (st, _) in calls.forward] == ["dimension", "note"]
+    assert calls.embedded == [] and calls.copied == []
+    assert total == 3
+
+
+@pytest.mark.anyio
+async def test_changed_and_new_handles_are_reembedded(etl):
+    db, calls, ingest_base, ingest = etl
+    ingest_base(_index([_dim(0, "A1", "<>"), _dim(1, "A2", "R5")], [_note(2, "B1", "BREAK EDGES")]))
+    base_a1 = db.base[Dimension][0][0]
+
+    revised = _index(
+        [_dim(0, "A1", "<>"), _dim(1, "A2", "R6"), _dim(2, "A3", "Ø8")],
+        [_note(3, "B1", "BREAK ALL EDGES")],
+    )
+    extracted, total = await ingest(revised)
+
+    assert [(st, old) for (st, old, _) in extracted.unchanged] == [("dimension", base_a1)]
+    assert calls.forward == [("dimension", [(base_a1, extracted.unchanged[0][2])])]
+    assert sorted(calls.embedded) == sorted(["R6= 10.0 mm", "Ø8= 10.0 mm", "BREAK ALL EDGES"])
+    assert {(row[1], row[3]) for row in calls.copied} == {
+        ("dimension", "R6= 10.0 mm"),
+        ("dimension", "Ø8= 10.0 mm"),
+        ("note", "BREAK ALL EDGES"),
+    }
+    assert total == 4
+
+
+@pytest.mark.anyio
+async def test_duplicate_base_handle_falls_back_to_full_insert_and_embed(etl):
+    db, calls, ingest_base, ingest = etl
+    ingest_base(_index(notes=[_note(0, "C1", "TYP"), _note(1, "C1", "TYP"), _note(2, "C2", "SEE DETAIL A")]))
+
+    assert set(etl_dwg._rows_by_handle(db, Note, BASE_VERSION)) == {"C2"}
+
+    extracted, total = await ingest(
+        _index(notes=[_note(0, "C1", "TYP"), _note(1, "C1", "TYP"), _note(2, "C2", "SEE DETAIL A")])
+    )
+
+    # Both C1 rows are inserted and embedded; only C2 is carried forward.
+    assert extracted.num_notes == 3
+    assert [st for (st, _, _) in extracted.unchanged] == ["note"]
+    assert calls.embedded == ["TYP", "TYP"]
+    assert total == 3
+
+
+class RecordingQuery(Query):
+    """Records the statement first() would run instead of running it."""
+
+    def first(self):
+        self.recorded.append(self.statement)
+        return None
+
+
+def test_find_base_version_prefers_same_drawing_then_filename():
+    recorded = []
+
+    def query(*entities):
+        q = RecordingQuery(entities)
+        q.recorded = recorded
+        return q
+
+    db = SimpleNamespace(query=query)
+
+    assert etl_dwg._find_base_version(db, drawing_id=5, source_filename="bracket.dwg") is None
+
+    [stmt] = recorded
+    sql = " ".join(
+        str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})).split()
+    )
+    assert "drawing_versions.is_active = true" in sql
+    assert (
+        "(drawing_versions.drawing_id = 5 OR drawing_versions.source_filename = 'bracket.dwg')"
+        in sql
+    )
+    assert sql.endswith(
+        "ORDER BY drawing_versions.drawing_id = 5 DESC, "
+        "drawing_versions.ingested_at DESC, drawing_versions.id DESC"
+    )
@@ -0,0 +1,75 @@
+# tests/test_ingest_jobs.py
+"""
+Ingest job bookkeeping: claiming past exhausted jobs, and persisting
+pipeline events off the event loop. Sessions are stubbed.
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.schemas import PipelineEvent
+from app.cli import ingest_worker
+from app.services.ingest_jobs import claim_next_ingest_job
+
+
+class QueueDB:
+    """Serves queued jobs oldest-first, like the SKIP LOCKED claim query."""
+
+    def __init__(self, jobs):
+        self.queued = list(jobs)
+        self.commits = 0
+
+    def execute(self, stmt):
+        job = self.queued.pop(0) if self.queued else None
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(first=lambda: job))
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def _job(job_id, attempts):
+    return SimpleNamespace(id=job_id, attempts=attempts, status="queued")
+
+
+def test_claim_skips_past_exhausted_jobs():
+    poisoned, ready = _job(1, attempts=3), _job(2, attempts=0)
+    db = QueueDB([poisoned, ready])
+
+    job = claim_next_ingest_job(db, worker_id="w1", max_attempts=3)
+
+    assert job is ready
+    assert (job.status, job.worker_id, job.attempts) == ("running", "w1", 1)
+    assert poisoned.status == "failed" and "Giving up" in poisoned.message
+
+
+def test_claim_returns_none_only_for_an_empty_queue():
+    db = QueueDB([_job(1, attempts=3)])
+
+    assert claim_next_ingest_job(db, worker_id="w1", max_attempts=3) is None
+    assert db.commits == 1  # the exhausted job was still marked failed
+
+
+@pytest.mark.anyio
+async def test_events_are_persisted_in_order_off_the_event_loop(monkeypatch):
+    writes = []
+
+    def append_job_events(db, job_id, events, *, worker_id):
+        writes.append((threading.current_thread(), job_id, [e.step for e in events]))
+        return True
+
+    monkeypatch.setattr(ingest_worker, "append_job_events", append_job_events)
+    monkeypatch.setattr(ingest_worker, "SessionLocal", lambda: SimpleNamespace(close=lambda: None))
+
+    writer = ingest_worker._JobEventWriter(42, "w1")
+    for step in ("upload", "dwg_to_dxf", "etl"):
+        writer.on_event(PipelineEvent(step=step, message=step))
+    await writer.aclose()
+
+    assert [step for _, _, steps in writes for step in steps] == ["upload", "dwg_to_dxf", "etl"]
+    assert all(job_id == 42 for _, job_id, _ in writes)
+    assert all(thread is not threading.main_thread() for thread, _, _ in writes)
@@ -0,0 +1,181 @@
+# tests/test_summarize_concurrency.py
+"""
+Summaries must not block the event loop: while a (stubbed, deliberately
+slow) model call is in flight, /health and /search/vector are still
+answered promptly. Covers POST /drawings/summarize (sync client in a worker
+thread) and the ETL's async OpenAISummaryProvider.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.routers import search as search_routes
+from app.api.schemas import ChunkSearchResponse
+from app.services import ai_providers, drawing_summarizer
+
+# Generous bound for a loaded CI box; a blocked loop would wait for the
+# whole summary (up to MODEL_TIMEOUT).
+RESPONSIVE_WITHIN = 1.0
+MODEL_TIMEOUT = 10.0
+
+
+class SlowOpenAI:
+    """Stands in for the sync OpenAI client used by summarize_drawing_with_llm."""
+
+    def __init__(self) -> None:
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.files = SimpleNamespace(create=lambda **kw: SimpleNamespace(id="file-test"))
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.entered.set()
+        # Blocks its thread exactly like a long synchronous HTTP call.
+        self.release.wait(MODEL_TIMEOUT)
+        content = json.dumps(
+            {
+                "structured_summary": {
+                    "drawing_id": "doc-1",
+                    "title_block": {"part_name": "BRACKET"},
+                },
+                "long_form_description": "A bracket.",
+            }
+        )
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class SlowAsyncOpenAI:
+    """Stands in for the shared AsyncOpenAI used by OpenAISummaryProvider."""
+
+    def __init__(self) -> None:
+        self.entered = asyncio.Event()
+        self.release = asyncio.Event()
+        self.calls = 0
+        self.responses = SimpleNamespace(create=self._create)
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        self.entered.set()
+        # Awaits like a slow HTTP response; only a blocking caller would stall the loop.
+        await self.release.wait()
+        text = kwargs["input"][0]["content"][0]["text"]
+        if text.startswith("You are CadSentinel. You are given two summaries"):
+            return SimpleNamespace(
+                output_text=json.dumps(
+                    {
+                        "structured_summary": {"title_block": {"part_name": "BRACKET"}},
+                        "long_form_description": "A bracket.",
+                        "short_description": "Bracket.",
+                    }
+                )
+            )
+        return SimpleNamespace(output_text="A bracket with two holes.")
+
+
+@pytest.fixture
+def stub_vector_search(monkeypatch):
+    async def vector_search(db, payload):
+        return ChunkSearchResponse(results=[], total_returned=0, mode="vector")
+
+    monkeypatch.setattr(search_routes, "vector_search_embeddings", vector_search)
+
+
+@pytest.fixture
+def slow_model(monkeypatch, tmp_path, stub_vector_search):
+    client = SlowOpenAI()
+    monkeypatch.setattr(drawing_summarizer, "get_openai_client", lambda: client)
+    monkeypatch.setattr(drawing_summarizer, "get_cached_file_id", lambda sha, provider: None)
+    monkeypatch.setattr(drawing_summarizer, "remember_file_id", lambda *a, **kw: None)
+
+    json_path = tmp_path / "drawing.json"
+    json_path.write_text(json.dumps({"entities": []}), encoding="utf-8")
+    pdf_path = tmp_path / "drawing.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4\n%%EOF\n")
+
+    yield client, {"document_id": "doc-1", "json_path": str(json_path), "pdf_path": str(pdf_path)}
+    client.release.set()
+
+
+async def _timed(coro):
+    t0 = time.perf_counter()
+    resp = await coro
+    return resp, time.perf_counter() - t0
+
+
+async def _assert_responsive(api_client) -> None:
+    health, health_s = await asyncio.wait_for(
+        _timed(api_client.get("/health")), RESPONSIVE_WITHIN
+    )
+    search, search_s = await asyncio.wait_for(
+        _timed(api_client.post("/api/v1/search/vector", json={"query_text": "bracket"})),
+        RESPONSIVE_WITHIN,
+    )
+    assert health_s < RESPONSIVE_WITHIN and search_s < RESPONSIVE_WITHIN
+    assert health.status_code == 200 and health.json() == {"status": "ok"}
+    assert search.status_code == 200 and search.json()["mode"] == "vector"
+
+
+@pytest.mark.anyio
+async def test_health_and_search_served_while_summary_pending(api_client, slow_model):
+    client, payload = slow_model
+
+    summarize = asyncio.create_task(
+        api_client.post("/api/v1/drawings/summarize", json=payload)
+    )
+    assert await asyncio.to_thread(client.entered.wait, MODEL_TIMEOUT), "model was never called"
+
+    await _assert_responsive(api_client)
+    assert not summarize.done()
+
+    client.release.set()
+    resp = await asyncio.wait_for(summarize, MODEL_TIMEOUT)
+    assert resp.status_code == 200
+    assert resp.json()["structured_summary"]["title_block"]["part_name"] == "BRACKET"
+
+
+
+async def _max_loop_lag(stop: asyncio.Event, tick: float = 0.01) -> float:
+    """Longest stall of the event loop seen until stop is set."""
+    worst = 0.0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(tick)
+        worst = max(worst, time.perf_counter() - t0 - tick)
+    return worst
+
+
+@pytest.mark.anyio
+async def test_health_and_search_served_while_provider_summary_pending(
+    api_client, stub_vector_search, monkeypatch, tmp_path
+):
+    client = SlowAsyncOpenAI()
+    monkeypatch.setattr(ai_providers, "get_openai_client", lambda: client)
+    monkeypatch.setattr(ai_providers, "_summary_semaphore", None)
+
+    json_path = tmp_path / "drawing.json"
+    json_path.write_text(json.dumps({"entities": []}), encoding="utf-8")
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(_max_loop_lag(stop))
+    provider = ai_providers.OpenAISummaryProvider(model_name="test-model")
+    summary = asyncio.create_task(
+        provider.generate_summary(document_id="doc-1", pdf_path=None, json_path=json_path)
+    )
+    await asyncio.wait_for(client.entered.wait(), MODEL_TIMEOUT)
+
+    await _assert_responsive(api_client)
+    assert not summary.done()
+
+    client.release.set()
+    result = await asyncio.wait_for(summary, MODEL_TIMEOUT)
+    stop.set()
+    # Nothing in the provider (view building, fusion parsing) stalled the loop.
+    assert await lag < RESPONSIVE_WITHIN
+    assert result["structured_summary"]["title_block"]["part_name"] == "BRACKET"
+    # JSON pass + fusion; no PDF pass without a PDF.
+    assert client.calls == 2